@@ -0,0 +1,116 @@
+# benchmarks/benchmark_arranque.py
+"""
+Benchmark de arranque basado en `python -X importtime`
+
+Mide cuánto tarda en importarse cada punto de entrada (en un proceso nuevo, sin
+cachés de módulos) y lo compara con el presupuesto de presupuesto_arranque.json:
+un tiempo máximo en milisegundos y una lista de módulos pesados que no deben
+cargarse en ese camino. Termina con código 1 si algún escenario se pasa.
+
+    python benchmarks/benchmark_arranque.py                # verificar
+    python benchmarks/benchmark_arranque.py --actualizar   # regenerar presupuestos (medido × margen)
+"""
+import argparse
+import json
+import math
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_PRESUPUESTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "presupuesto_arranque.json")
+
+ESCENARIOS = {
+    'cli': "import main",
+    'validador': "import modelo.validador_modelo",
+    'registro_modelos': "import modelo.registro_modelos",
+    'grilla_valuacion': "import modelo.grilla_valuacion",
+    'servicio_http': "import interfaz.servicio_http",
+    'base_datos': "import datos.database_manager",
+}
+PROHIBIDOS_POR_DEFECTO = ["pandas", "sklearn", "scipy", "matplotlib", "seaborn", "streamlit"]
+
+
+def medir_importacion(sentencia):
+    """Devuelve (milisegundos totales, módulos importados) de un proceso nuevo que ejecuta la sentencia."""
+    proceso = subprocess.run([sys.executable, "-X", "importtime", "-c", sentencia],
+                             cwd=RAIZ, capture_output=True, text=True)
+    if proceso.returncode != 0:
+        raise RuntimeError(f"Falló `{sentencia}`:\n{proceso.stderr[-2000:]}")
+    total_us = 0
+    modulos = set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "self [us]" in linea:
+            continue
+        propio, _, nombre = linea[len("import time:"):].split("|")
+        total_us += int(propio)
+        modulos.add(nombre.strip())
+    return total_us / 1000, modulos
+
+
+def ejecutar(repeticiones=5):
+    resultados = {}
+    for escenario, sentencia in ESCENARIOS.items():
+        mediciones = [medir_importacion(sentencia) for _ in range(repeticiones)]
+        resultados[escenario] = {
+            'ms': round(statistics.median(ms for ms, _ in mediciones), 1),
+            'modulos': mediciones[-1][1]
+        }
+    return resultados
+
+
+def verificar(resultados, presupuesto):
+    fallas = []
+    for escenario, resultado in resultados.items():
+        limite = presupuesto.get(escenario)
+        if limite is None:
+            continue
+        if resultado['ms'] > limite['max_ms']:
+            fallas.append(f"{escenario}: {resultado['ms']} ms > {limite['max_ms']} ms")
+        cargados = sorted(m for m in limite.get('prohibidos', [])
+                          if any(mod == m or mod.startswith(m + ".") for mod in resultado['modulos']))
+        if cargados:
+            fallas.append(f"{escenario}: importa {', '.join(cargados)}")
+    return fallas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de arranque con -X importtime")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--actualizar", action="store_true", help="Reescribe el presupuesto con lo medido")
+    parser.add_argument("--margen", type=float, default=1.5, help="Margen sobre lo medido al actualizar")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.repeticiones)
+    presupuesto = {}
+    if os.path.exists(RUTA_PRESUPUESTO):
+        with open(RUTA_PRESUPUESTO, encoding='utf-8') as archivo:
+            presupuesto = json.load(archivo)
+
+    for escenario, resultado in resultados.items():
+        limite = presupuesto.get(escenario, {}).get('max_ms', '-')
+        print(f"   ⏱️  {escenario:<18} {resultado['ms']:>8.1f} ms  (presupuesto: {limite} ms, "
+              f"{len(resultado['modulos'])} módulos)")
+
+    if args.actualizar:
+        presupuesto = {escenario: {'max_ms': math.ceil(resultado['ms'] * args.margen),
+                                   'prohibidos': presupuesto.get(escenario, {}).get('prohibidos',
+                                                                                    PROHIBIDOS_POR_DEFECTO)}
+                       for escenario, resultado in resultados.items()}
+        with open(RUTA_PRESUPUESTO, 'w', encoding='utf-8') as archivo:
+            json.dump(presupuesto, archivo, indent=2)
+            archivo.write("\n")
+        print(f"   💾 Presupuesto actualizado en {RUTA_PRESUPUESTO}")
+        return 0
+
+    fallas = verificar(resultados, presupuesto)
+    for falla in fallas:
+        print(f"   ❌ {falla}")
+    if not fallas:
+        print("   ✅ Arranque dentro del presupuesto")
+    return 1 if fallas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+# benchmarks/benchmark_rendimiento.py
+"""
+Suite de benchmarks de rendimiento sobre datos sintéticos (datos/generador_datos.py)
+
+Para cada tamaño (10³ … 10⁷ filas con el esquema de la tabla inmuebles) mide:
+
+    entrenar              RegresorLinealMultiple.entrenar
+    predecir              RegresorLinealMultiple.predecir
+    validacion            ValidadorModelo.validacion_train_test
+    db_insertar           DatabaseManager.insertar_lote sobre una base vacía
+    db_leer               DatabaseManager.obtener_inmuebles
+    db_iterar             DatabaseManager.iterar_inmuebles (lectura por bloques)
+    matrices              DatasetInmobiliario.obtener_matrices_entrenamiento
+
+e informa la mediana de tiempo, el throughput (filas/s), el pico de memoria
+(tracemalloc, en una corrida aparte) y el exponente de escalamiento k de
+tiempo ∝ nᵏ. Los resultados se guardan en JSON y se comparan contra una línea
+base; termina con código 1 si algún escenario es más lento que base × tolerancia.
+
+    python benchmarks/benchmark_rendimiento.py                              # comparar con la línea base
+    python benchmarks/benchmark_rendimiento.py --actualizar                 # regenerar la línea base
+    python benchmarks/benchmark_rendimiento.py --tamanos 1e3 1e5 1e7 --guardar resultados.json
+    python benchmarks/benchmark_rendimiento.py --comparar resultados_commit_anterior.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from datos.database_manager import DatabaseManager  # noqa: E402
+from datos.dataset_inmobiliario import DatasetInmobiliario  # noqa: E402
+from datos.generador_datos import generar_inmuebles  # noqa: E402
+from datos.pool_conexiones import cerrar_pool  # noqa: E402
+from modelo.regresor_lineal import RegresorLinealMultiple  # noqa: E402
+from modelo.validador_modelo import ValidadorModelo  # noqa: E402
+
+RUTA_LINEA_BASE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base_rendimiento.json")
+CARACTERISTICAS = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
+TAMANOS_POR_DEFECTO = [1000, 10000, 100000]
+SEMILLA = 2025
+# Por debajo de esto el ruido del reloj y del planificador domina: no se compara
+MINIMO_COMPARABLE_S = 0.002
+
+
+class Contexto:
+    """Datos de un tamaño: DataFrame sintético, matrices, modelo entrenado y bases temporales."""
+
+    def __init__(self, n, directorio):
+        self.n = n
+        self.directorio = directorio
+        self.df = generar_inmuebles(n, semilla=SEMILLA)
+        self.X = self.df[CARACTERISTICAS].to_numpy(dtype=float)
+        self.Y = self.df['precio_usd'].to_numpy(dtype=float)
+        self._modelo = None
+        self._ruta_poblada = None
+        self._bases = 0
+
+    @property
+    def modelo(self):
+        if self._modelo is None:
+            self._modelo = RegresorLinealMultiple()
+            self._modelo.entrenar(self.X, self.Y, verbose=False)
+        return self._modelo
+
+    def base_vacia(self):
+        self._bases += 1
+        return os.path.join(self.directorio, f"vacia_{self.n}_{self._bases}.db")
+
+    @property
+    def ruta_poblada(self):
+        if self._ruta_poblada is None:
+            self._ruta_poblada = os.path.join(self.directorio, f"poblada_{self.n}.db")
+            DatabaseManager(self._ruta_poblada).insertar_lote(self.df, chunk_size=50000)
+        return self._ruta_poblada
+
+
+# Cada escenario recibe el contexto y devuelve (preparar, ejecutar): sólo se cronometra
+# ejecutar(preparar()), así que la preparación (bases vacías, cachés) queda afuera.
+
+def escenario_entrenar(ctx):
+    return (lambda: RegresorLinealMultiple(),
+            lambda modelo: modelo.entrenar(ctx.X, ctx.Y, verbose=False))
+
+
+def escenario_predecir(ctx):
+    modelo = ctx.modelo
+    return (lambda: None, lambda _: modelo.predecir(ctx.X))
+
+
+def escenario_validacion(ctx):
+    validador = ValidadorModelo(ctx.modelo)
+    return (lambda: None, lambda _: validador.validacion_train_test(ctx.X, ctx.Y))
+
+
+def escenario_db_insertar(ctx):
+    def preparar():
+        return DatabaseManager(ctx.base_vacia())
+    return (preparar, lambda db: db.insertar_lote(ctx.df, chunk_size=50000))
+
+
+def escenario_db_leer(ctx):
+    db = DatabaseManager(ctx.ruta_poblada)
+    return (lambda: None, lambda _: db.obtener_inmuebles())
+
+
+def escenario_db_iterar(ctx):
+    db = DatabaseManager(ctx.ruta_poblada)
+    return (lambda: None, lambda _: sum(len(b) for b in db.iterar_inmuebles(CARACTERISTICAS + ['precio_usd'])))
+
+
+def escenario_matrices(ctx):
+    dataset = DatasetInmobiliario(ctx.ruta_poblada)
+    df = dataset.db.obtener_inmuebles()
+
+    def preparar():
+        # Sin la caché de matrices: se mide la conversión DataFrame -> (X, Y)
+        dataset.df = df
+        dataset._matrices = None
+        return dataset
+    return (preparar, lambda ds: ds.obtener_matrices_entrenamiento())
+
+
+ESCENARIOS = {
+    'entrenar': (escenario_entrenar, False),
+    'predecir': (escenario_predecir, False),
+    'validacion': (escenario_validacion, False),
+    'db_insertar': (escenario_db_insertar, True),
+    'db_leer': (escenario_db_leer, True),
+    'db_iterar': (escenario_db_iterar, True),
+    'matrices': (escenario_matrices, True),
+}
+
+
+def medir(preparar, ejecutar, repeticiones, medir_memoria=True):
+    """Mediana de segundos sobre `repeticiones` corridas y pico de memoria (MB) de una corrida extra."""
+    tiempos = []
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        for _ in range(repeticiones):
+            argumento = preparar()
+            inicio = time.perf_counter()
+            ejecutar(argumento)
+            tiempos.append(time.perf_counter() - inicio)
+        pico_mb = None
+        if medir_memoria:
+            argumento = preparar()
+            tracemalloc.start()
+            try:
+                ejecutar(argumento)
+                pico_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            finally:
+                tracemalloc.stop()
+    return statistics.median(tiempos), pico_mb
+
+
+def exponente_escalamiento(puntos):
+    """k de tiempo ∝ nᵏ por mínimos cuadrados en escala log-log (None con menos de 2 tamaños)."""
+    puntos = [(n, s) for n, s in puntos if s > 0]
+    if len(puntos) < 2:
+        return None
+    n, s = np.log(np.array(puntos, dtype=float)).T
+    return round(float(np.polyfit(n, s, 1)[0]), 2)
+
+
+def entorno():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+    }
+
+
+def ejecutar(tamanos, escenarios, repeticiones=3, max_filas_db=10 ** 6, medir_memoria=True):
+    resultados = {nombre: {} for nombre in escenarios}
+    directorio = tempfile.mkdtemp(prefix="benchmark_inmuebles_")
+    try:
+        for n in tamanos:
+            print(f"   📦 n = {n:,}")
+            ctx = Contexto(n, directorio)
+            for nombre in escenarios:
+                constructor, usa_db = ESCENARIOS[nombre]
+                if usa_db and n > max_filas_db:
+                    continue
+                segundos, pico_mb = medir(*constructor(ctx), repeticiones, medir_memoria)
+                resultados[nombre][str(n)] = {
+                    'segundos': round(segundos, 6),
+                    'filas_por_segundo': round(n / segundos) if segundos > 0 else None,
+                    'pico_mb': round(pico_mb, 2) if pico_mb is not None else None,
+                }
+                memoria = f"{pico_mb:>9.1f} MB" if pico_mb is not None else ""
+                print(f"      ⏱️  {nombre:<12} {segundos * 1000:>11.2f} ms  {n / segundos:>14,.0f} filas/s  {memoria}")
+            del ctx
+    finally:
+        for archivo in os.listdir(directorio):
+            if archivo.endswith(".db"):
+                cerrar_pool(os.path.join(directorio, archivo))
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    escalamiento = {nombre: exponente_escalamiento([(int(n), r['segundos']) for n, r in por_tamano.items()])
+                    for nombre, por_tamano in resultados.items()}
+    return {'entorno': entorno(), 'repeticiones': repeticiones,
+            'resultados': resultados, 'escalamiento': escalamiento}
+
+
+def comparar(actual, base, tolerancia):
+    """Regresiones de tiempo: escenarios y tamaños presentes en ambos donde actual > base × tolerancia."""
+    regresiones = []
+    for nombre, por_tamano in actual['resultados'].items():
+        for n, resultado in por_tamano.items():
+            referencia = base.get('resultados', {}).get(nombre, {}).get(n)
+            if referencia is None or referencia['segundos'] < MINIMO_COMPARABLE_S:
+                continue
+            razon = resultado['segundos'] / referencia['segundos']
+            if razon > tolerancia:
+                regresiones.append(f"{nombre} (n={int(n):,}): {resultado['segundos'] * 1000:.2f} ms vs "
+                                   f"{referencia['segundos'] * 1000:.2f} ms base (×{razon:.2f})")
+    return regresiones
+
+
+def _guardar(resultados, ruta):
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+        archivo.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de entrenamiento, predicción, base de datos y matrices")
+    parser.add_argument("--tamanos", type=float, nargs="+", default=TAMANOS_POR_DEFECTO,
+                        help="Cantidades de filas (p. ej. 1e3 1e5 1e7)")
+    parser.add_argument("--escenarios", nargs="+", choices=list(ESCENARIOS), default=list(ESCENARIOS))
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--max-filas-db", type=float, default=1e6,
+                        help="Tamaño máximo para los escenarios que escriben en SQLite")
+    parser.add_argument("--sin-memoria", action="store_true", help="No medir el pico de memoria")
+    parser.add_argument("--guardar", help="Guarda los resultados en este JSON")
+    parser.add_argument("--comparar", default=RUTA_LINEA_BASE, help="JSON de referencia (por defecto, la línea base)")
+    parser.add_argument("--tolerancia", type=float, default=1.5, help="Razón actual/base a partir de la cual se falla")
+    parser.add_argument("--actualizar", action="store_true", help="Reescribe la línea base con lo medido")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar([int(n) for n in args.tamanos], args.escenarios, args.repeticiones,
+                          int(args.max_filas_db), not args.sin_memoria)
+
+    print("   📈 Escalamiento (tiempo ∝ nᵏ):")
+    for nombre, k in resultados['escalamiento'].items():
+        if k is not None:
+            print(f"      {nombre:<12} k = {k}")
+
+    if args.guardar:
+        _guardar(resultados, args.guardar)
+        print(f"   💾 Resultados guardados en {args.guardar}")
+    if args.actualizar:
+        _guardar(resultados, RUTA_LINEA_BASE)
+        print(f"   💾 Línea base actualizada en {RUTA_LINEA_BASE}")
+        return 0
+
+    if not os.path.exists(args.comparar):
+        print(f"   ℹ️  No existe {args.comparar}; nada para comparar")
+        return 0
+    with open(args.comparar, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    regresiones = comparar(resultados, base, args.tolerancia)
+    for regresion in regresiones:
+        print(f"   ❌ {regresion}")
+    if not regresiones:
+        print(f"   ✅ Sin regresiones respecto de {os.path.basename(args.comparar)} "
+              f"(commit {base.get('entorno', {}).get('commit')})")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,33 @@
 # datos/database_manager.py
 import sqlite3
-import pandas as pd
+import numpy as np
 import os
+import uuid
+# pandas se importa dentro de los métodos que lo usan: la huella de datos y
+# la lectura por cursor (lo que necesitan los scripts de servicio) no lo cargan
+
+COLUMNAS_INMUEBLE = ['id', 'm2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad',
+                     'precio_usd', 'fecha_actualizacion', 'activo']
+# Columnas por las que se puede ordenar y paginar; cada una tiene un índice (activo, columna, id)
+COLUMNAS_ORDEN = ['id', 'precio_usd', 'm2']
+# Columnas que registra el log de cambios, con sufijo _anterior / _nuevo
+COLUMNAS_CAMBIO = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad', 'precio_usd',
+                   'fecha_actualizacion', 'activo']
+# A partir de este tamaño de bloque insertar_lote registra las altas en el log con un solo INSERT ... SELECT
+MINIMO_LOG_CONJUNTO = 500
+
+try:
+    from pool_conexiones import obtener_pool, cerrar_pool
+except ImportError:
+    from .pool_conexiones import obtener_pool, cerrar_pool
+
+try:
+    from utils.instrumentacion import medir, registrar_error
+except ImportError:
+    # Ejecutado como script desde datos/: la raíz del proyecto no está en sys.path
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.instrumentacion import medir, registrar_error
 
 class DatabaseManager:
     def __init__(self, db_path="inmuebles_cordoba.db"):
@@ -9,55 +35,135 @@ class DatabaseManager:
         
         if os.path.exists(db_path):
             try:
-                conn = sqlite3.connect(db_path)
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='inmuebles'")
-                tabla_existe = cursor.fetchone()
+                with self.conexion() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='inmuebles'")
+                    tabla_existe = cursor.fetchone()
+                    cantidad_registros = 0
+                    if tabla_existe:
+                        cursor.execute("SELECT COUNT(*) FROM inmuebles WHERE activo = 1")
+                        cantidad_registros = cursor.fetchone()[0]
                 
-                if tabla_existe:
-                    cursor.execute("SELECT COUNT(*) FROM inmuebles WHERE activo = 1")
-                    cantidad_registros = cursor.fetchone()[0]
-                    conn.close()
-                    
-                    if cantidad_registros == 0:
-                        os.remove(db_path)
-                    else:
-                        self._crear_tabla()
-                        return
-                else:
-                    os.remove(db_path)
+                if tabla_existe and cantidad_registros > 0:
+                    self._crear_tabla()
+                    return
+                self._eliminar_archivo_db()
                     
             except sqlite3.Error:
-                os.remove(db_path)
+                self._eliminar_archivo_db()
             except Exception:
-                if os.path.exists(db_path):
-                    os.remove(db_path)
+                self._eliminar_archivo_db()
         
         self._crear_tabla()
     
+    def conexion(self):
+        """Conexión prestada por el pool compartido del proceso (usar con `with`)."""
+        return obtener_pool(self.db_path).conexion()
+    
+    def _eliminar_archivo_db(self):
+        # Cerrar las conexiones del pool antes de borrar el archivo y sus anexos WAL
+        cerrar_pool(self.db_path)
+        for sufijo in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + sufijo):
+                os.remove(self.db_path + sufijo)
+    
     def _crear_tabla(self):
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS inmuebles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    m2 REAL NOT NULL,
-                    habitaciones INTEGER NOT NULL,
-                    antiguedad INTEGER NOT NULL,
-                    zona_categoria INTEGER NOT NULL,
-                    tipo_propiedad INTEGER NOT NULL,
-                    precio_usd REAL NOT NULL,
-                    fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    activo BOOLEAN DEFAULT 1
-                )
-            ''')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_inmuebles_activo ON inmuebles(activo)')
-            conn.commit()
-            conn.close()
+            with self.conexion() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS inmuebles (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        m2 REAL NOT NULL,
+                        habitaciones INTEGER NOT NULL,
+                        antiguedad INTEGER NOT NULL,
+                        zona_categoria INTEGER NOT NULL,
+                        tipo_propiedad INTEGER NOT NULL,
+                        precio_usd REAL NOT NULL,
+                        fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        activo BOOLEAN DEFAULT 1
+                    )
+                ''')
+                # Sólo lo usaba la huella anterior (MAX(fecha_actualizacion)); ahora no sirve a ninguna lectura
+                cursor.execute('DROP INDEX IF EXISTS idx_inmuebles_fecha')
+                # Índices compuestos para la paginación por clave (keyset): el filtro de igualdad
+                # va primero y la columna de orden + id al final, así cada página es un rango del índice
+                cursor.execute('DROP INDEX IF EXISTS idx_inmuebles_activo')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_inmuebles_activo_id ON inmuebles(activo, id)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_inmuebles_activo_precio '
+                               'ON inmuebles(activo, precio_usd, id)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_inmuebles_activo_m2 ON inmuebles(activo, m2, id)')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_inmuebles_zona_tipo_precio '
+                               'ON inmuebles(activo, zona_categoria, tipo_propiedad, precio_usd, id)')
+                # Identidad de esta base: distingue dos bases con el mismo largo de log (ver obtener_huella_datos).
+                # La clave 'log_conjunto' sólo existe dentro de una carga masiva (ver _insertar_con_log_conjunto)
+                cursor.execute('CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT NOT NULL)')
+                cursor.execute("INSERT OR IGNORE INTO meta (clave, valor) VALUES ('identidad', ?)", (uuid.uuid4().hex,))
+                self._crear_log_cambios(cursor)
         except Exception as e:
             print(f"Error creando tabla: {e}")
+            registrar_error('db', '_crear_tabla', e)
+    
+    def _crear_log_cambios(self, cursor):
+        """Log de cambios (append-only) alimentado por triggers: toda escritura sobre
+        inmuebles, venga de donde venga, queda registrada con sus valores antes y después."""
+        anteriores = ', '.join(f"{c}_anterior" for c in COLUMNAS_CAMBIO)
+        nuevos = ', '.join(f"{c}_nuevo" for c in COLUMNAS_CAMBIO)
+        definiciones = ', '.join(f"{c}_anterior, {c}_nuevo" for c in COLUMNAS_CAMBIO)
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS cambios_inmuebles (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id_inmueble INTEGER NOT NULL,
+                operacion TEXT NOT NULL,
+                {definiciones}
+            )
+        ''')
+        valores_old = ', '.join(f"OLD.{c}" for c in COLUMNAS_CAMBIO)
+        valores_new = ', '.join(f"NEW.{c}" for c in COLUMNAS_CAMBIO)
+        # Migración única: bases creadas antes de la condición WHEN del trigger de altas
+        definicion = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' "
+                                    "AND name = 'trg_inmuebles_insert'").fetchone()
+        if definicion is not None and 'log_conjunto' not in definicion[0]:
+            cursor.execute('DROP TRIGGER trg_inmuebles_insert')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_inmuebles_insert AFTER INSERT ON inmuebles
+            WHEN NOT EXISTS (SELECT 1 FROM meta WHERE clave = 'log_conjunto') BEGIN
+                INSERT INTO cambios_inmuebles (id_inmueble, operacion, {nuevos})
+                VALUES (NEW.id, 'I', {valores_new});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_inmuebles_update AFTER UPDATE ON inmuebles BEGIN
+                INSERT INTO cambios_inmuebles (id_inmueble, operacion, {anteriores}, {nuevos})
+                VALUES (NEW.id, 'U', {valores_old}, {valores_new});
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_inmuebles_delete AFTER DELETE ON inmuebles BEGIN
+                INSERT INTO cambios_inmuebles (id_inmueble, operacion, {anteriores})
+                VALUES (OLD.id, 'D', {valores_old});
+            END
+        ''')
+    
+    def _insertar_con_log_conjunto(self, conn, query, filas):
+        """executemany de un bloque registrando las altas en el log con un solo INSERT ... SELECT.
+        
+        El trigger de altas cuesta más que el propio INSERT en cargas masivas. Sin tocar el
+        esquema: la fila meta 'log_conjunto' desactiva su condición WHEN mientras dura la
+        transacción, y se borra antes del commit. Con el lock de escritura tomado (BEGIN
+        IMMEDIATE) ningún otro escritor la ve; si algo falla, el rollback la descarta.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        id_previo = conn.execute("SELECT COALESCE(MAX(id), 0) FROM inmuebles").fetchone()[0]
+        conn.execute("INSERT INTO meta (clave, valor) VALUES ('log_conjunto', '1')")
+        conn.executemany(query, filas)
+        conn.execute("DELETE FROM meta WHERE clave = 'log_conjunto'")
+        conn.execute(f'''
+            INSERT INTO cambios_inmuebles (id_inmueble, operacion, {', '.join(f"{c}_nuevo" for c in COLUMNAS_CAMBIO)})
+            SELECT id, 'I', {', '.join(COLUMNAS_CAMBIO)} FROM inmuebles WHERE id > ? ORDER BY id
+        ''', (id_previo,))
     
+    @medir('db_consulta', operacion='insertar_inmueble')
     def insertar_inmueble(self, m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd):
         try:
             m2 = float(m2)
@@ -67,40 +173,342 @@ class DatabaseManager:
             tipo_propiedad = int(tipo_propiedad)
             precio_usd = float(precio_usd)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO inmuebles 
-                (m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd))
-            conn.commit()
-            conn.close()
+            with self.conexion() as conn:
+                conn.execute('''
+                    INSERT INTO inmuebles 
+                    (m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd))
             return True
         except Exception as e:
             print(f"Error insertando inmueble: {e}")
+            registrar_error('db', 'insertar_inmueble', e)
             return False
     
+    def _lotes_dataframe(self, datos, chunk_size):
+        # Acepta un DataFrame, un iterable de DataFrames (p. ej. read_csv con chunksize)
+        # o un iterable de filas (dicts o tuplas en el orden de las columnas)
+        import pandas as pd
+        
+        columnas = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad', 'precio_usd']
+        if isinstance(datos, pd.DataFrame):
+            for inicio in range(0, len(datos), chunk_size):
+                yield datos.iloc[inicio:inicio + chunk_size]
+            return
+        
+        offset = 0
+        filas = []
+        for elemento in datos:
+            if isinstance(elemento, pd.DataFrame):
+                for inicio in range(0, len(elemento), chunk_size):
+                    yield elemento.iloc[inicio:inicio + chunk_size]
+                continue
+            filas.append(elemento)
+            if len(filas) == chunk_size:
+                yield self._filas_a_dataframe(filas, columnas, offset)
+                offset += len(filas)
+                filas = []
+        if filas:
+            yield self._filas_a_dataframe(filas, columnas, offset)
+    
+    def _filas_a_dataframe(self, filas, columnas, offset):
+        import pandas as pd
+        
+        df = pd.DataFrame([fila if isinstance(fila, dict) else dict(zip(columnas, fila)) for fila in filas])
+        df.index = range(offset, offset + len(filas))
+        return df
+    
+    @medir('db_consulta', operacion='insertar_lote')
+    def insertar_lote(self, datos, chunk_size=10000):
+        """Inserta muchas propiedades con executemany, en una transacción por bloque.
+        
+        Las filas inválidas (o rechazadas por SQLite) se informan en 'fallidos'
+        con su índice y motivo, sin abortar el resto del lote.
+        """
+        from utils.validaciones import validar_lote_inmuebles
+        
+        resultado = {'insertados': 0, 'fallidos': [], 'total': 0}
+        query = '''
+            INSERT INTO inmuebles 
+            (m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''
+        for lote in self._lotes_dataframe(datos, chunk_size):
+            resultado['total'] += len(lote)
+            try:
+                convertido, motivos = validar_lote_inmuebles(lote)
+            except ValueError as e:
+                resultado['fallidos'].extend({'indice': indice, 'motivo': str(e)} for indice in lote.index)
+                continue
+            
+            invalidas = motivos.notna()
+            resultado['fallidos'].extend(
+                {'indice': indice, 'motivo': motivo} for indice, motivo in motivos[invalidas].items()
+            )
+            validas = convertido[~invalidas]
+            if len(validas) == 0:
+                continue
+            
+            filas = list(zip(
+                validas['m2'].astype(float).tolist(),
+                validas['habitaciones'].astype(int).tolist(),
+                validas['antiguedad'].astype(int).tolist(),
+                validas['zona_categoria'].astype(int).tolist(),
+                validas['tipo_propiedad'].astype(int).tolist(),
+                validas['precio_usd'].astype(float).tolist()
+            ))
+            try:
+                with self.conexion() as conn:
+                    if len(filas) >= MINIMO_LOG_CONJUNTO:
+                        self._insertar_con_log_conjunto(conn, query, filas)
+                    else:
+                        conn.executemany(query, filas)
+                resultado['insertados'] += len(filas)
+            except sqlite3.Error:
+                # El bloque se revirtió completo: se reintenta fila por fila para aislar los errores
+                with self.conexion() as conn:
+                    for indice, fila in zip(validas.index, filas):
+                        try:
+                            conn.execute(query, fila)
+                            resultado['insertados'] += 1
+                        except sqlite3.Error as e:
+                            resultado['fallidos'].append({'indice': indice, 'motivo': str(e)})
+        
+        return resultado
+    
+    @medir('db_consulta', operacion='importar_archivo')
+    def importar_archivo(self, ruta, chunk_size=50000):
+        """Carga un export CSV o Parquet del feed de propiedades con insertar_lote."""
+        import pandas as pd
+        
+        extension = os.path.splitext(ruta)[1].lower()
+        if extension == ".csv":
+            lotes = pd.read_csv(ruta, chunksize=chunk_size)
+        elif extension in (".parquet", ".pq"):
+            try:
+                import pyarrow.parquet as pq
+                lotes = (batch.to_pandas() for batch in pq.ParquetFile(ruta).iter_batches(batch_size=chunk_size))
+            except ImportError:
+                lotes = [pd.read_parquet(ruta)]
+        else:
+            raise ValueError(f"Formato no soportado: {extension} (usar .csv o .parquet)")
+        return self.insertar_lote(lotes, chunk_size=chunk_size)
+    
+    @medir('db_consulta', operacion='existe_inmueble')
+    def existe_inmueble(self, id_inmueble, solo_activos=False):
+        """Búsqueda puntual por clave primaria (no lee la tabla)."""
+        query = "SELECT 1 FROM inmuebles WHERE id = ?" + (" AND activo = 1" if solo_activos else "")
+        with self.conexion() as conn:
+            return conn.execute(query, (int(id_inmueble),)).fetchone() is not None
+    
+    @medir('db_consulta', operacion='obtener_inmueble')
+    def obtener_inmueble(self, id_inmueble):
+        """Una propiedad como diccionario, o None si no existe."""
+        with self.conexion() as conn:
+            fila = conn.execute(f"SELECT {', '.join(COLUMNAS_INMUEBLE)} FROM inmuebles WHERE id = ?",
+                                (int(id_inmueble),)).fetchone()
+        return dict(zip(COLUMNAS_INMUEBLE, fila)) if fila is not None else None
+    
+    @medir('db_consulta', operacion='ultimo_cambio')
+    def ultimo_cambio(self):
+        """Número de secuencia del último cambio registrado (0 si no hay)."""
+        with self.conexion() as conn:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM cambios_inmuebles").fetchone()[0]
+    
+    @medir('db_consulta', operacion='obtener_cambios')
+    def obtener_cambios(self, desde_seq=0, limite=None):
+        """Cambios con seq > desde_seq, en orden, como lista de diccionarios."""
+        columnas = ['seq', 'id_inmueble', 'operacion'] + [f"{c}_{sufijo}" for c in COLUMNAS_CAMBIO
+                                                         for sufijo in ('anterior', 'nuevo')]
+        query = f"SELECT {', '.join(columnas)} FROM cambios_inmuebles WHERE seq > ? ORDER BY seq"
+        parametros = [int(desde_seq)]
+        if limite is not None:
+            query += " LIMIT ?"
+            parametros.append(int(limite))
+        with self.conexion() as conn:
+            return [dict(zip(columnas, fila)) for fila in conn.execute(query, parametros)]
+    
+    @medir('db_consulta', operacion='purgar_cambios')
+    def purgar_cambios(self, hasta_seq):
+        """Compacta el log borrando los cambios ya aplicados por todos los consumidores."""
+        with self.conexion() as conn:
+            return conn.execute("DELETE FROM cambios_inmuebles WHERE seq <= ?", (int(hasta_seq),)).rowcount
+    
+    @medir('db_consulta', operacion='obtener_inmuebles_con_marca')
+    def obtener_inmuebles_con_marca(self, solo_activos=True):
+        """(DataFrame, seq) leídos en la misma transacción: el DataFrame refleja exactamente
+        los cambios hasta seq, así que un refresco posterior parte de ahí."""
+        import pandas as pd
+        
+        # ORDER BY id: con los índices compuestos el planificador podría recorrer otro índice y
+        # devolver las filas en otro orden; (activo, id) sirve el orden sin ordenar en memoria
+        query = ("SELECT * FROM inmuebles WHERE activo = 1" if solo_activos else "SELECT * FROM inmuebles") + " ORDER BY id"
+        try:
+            with self.conexion() as conn:
+                conn.execute("BEGIN")
+                seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM cambios_inmuebles").fetchone()[0]
+                df = pd.read_sql_query(query, conn)
+            return df, seq
+        except Exception as e:
+            print(f"Error obteniendo inmuebles: {e}")
+            registrar_error('db', 'obtener_inmuebles_con_marca', e)
+            return pd.DataFrame(), 0
+    
+    @medir('db_consulta', operacion='obtener_inmuebles')
     def obtener_inmuebles(self, solo_activos=True):
+        import pandas as pd
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            query = "SELECT * FROM inmuebles WHERE activo = 1" if solo_activos else "SELECT * FROM inmuebles"
-            df = pd.read_sql_query(query, conn)
-            conn.close()
+            query = ("SELECT * FROM inmuebles WHERE activo = 1" if solo_activos else "SELECT * FROM inmuebles") + " ORDER BY id"
+            with self.conexion() as conn:
+                df = pd.read_sql_query(query, conn)
             return df
         except Exception as e:
             print(f"Error obteniendo inmuebles: {e}")
+            registrar_error('db', 'obtener_inmuebles', e)
             return pd.DataFrame()
     
+    def _condiciones_filtro(self, filtros, solo_activos):
+        """Cláusula WHERE parametrizada para zona, tipo y rangos de precio y m²."""
+        filtros = filtros or {}
+        condiciones, parametros = [], []
+        if solo_activos:
+            condiciones.append("activo = 1")
+        for columna, clave in (('zona_categoria', 'zonas'), ('tipo_propiedad', 'tipos')):
+            valores = filtros.get(clave)
+            if valores:
+                valores = [int(v) for v in valores]
+                condiciones.append(f"{columna} IN ({', '.join('?' * len(valores))})")
+                parametros.extend(valores)
+        for columna, minimo, maximo in (('precio_usd', 'precio_min', 'precio_max'), ('m2', 'm2_min', 'm2_max')):
+            if filtros.get(minimo) is not None:
+                condiciones.append(f"{columna} >= ?")
+                parametros.append(float(filtros[minimo]))
+            if filtros.get(maximo) is not None:
+                condiciones.append(f"{columna} <= ?")
+                parametros.append(float(filtros[maximo]))
+        return condiciones, parametros
+    
+    @medir('db_consulta', operacion='contar_inmuebles')
+    def contar_inmuebles(self, filtros=None, solo_activos=True):
+        condiciones, parametros = self._condiciones_filtro(filtros, solo_activos)
+        query = "SELECT COUNT(*) FROM inmuebles"
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        try:
+            with self.conexion() as conn:
+                return conn.execute(query, parametros).fetchone()[0]
+        except Exception as e:
+            print(f"Error contando inmuebles: {e}")
+            registrar_error('db', 'contar_inmuebles', e)
+            return 0
+    
+    @medir('db_consulta', operacion='obtener_pagina')
+    def obtener_pagina(self, filtros=None, orden='id', descendente=False, tamano_pagina=50,
+                       despues_de=None, solo_activos=True):
+        """
+        Página de propiedades con paginación por clave (keyset) en lugar de OFFSET
+        
+        Cada página continúa desde la última fila de la anterior con
+        (orden, id) > (valor, id) sobre un índice compuesto, así que el costo no
+        depende de cuántas páginas se recorrieron ni del tamaño de la tabla.
+        
+        Args:
+            filtros: dict opcional con zonas, tipos, precio_min, precio_max, m2_min, m2_max
+            orden: columna de COLUMNAS_ORDEN
+            despues_de: cursor (valor, id) devuelto como 'siguiente' por la página anterior
+        
+        Returns:
+            Diccionario con 'filas' (DataFrame), 'siguiente' (cursor o None) y 'hay_mas'
+        """
+        import pandas as pd
+        
+        if orden not in COLUMNAS_ORDEN:
+            raise ValueError(f"Orden no permitido: {orden}. Opciones: {', '.join(COLUMNAS_ORDEN)}")
+        
+        condiciones, parametros = self._condiciones_filtro(filtros, solo_activos)
+        comparador = '<' if descendente else '>'
+        if despues_de is not None:
+            if orden == 'id':
+                condiciones.append(f"id {comparador} ?")
+                parametros.append(despues_de[1])
+            else:
+                condiciones.append(f"({orden}, id) {comparador} (?, ?)")
+                parametros.extend(despues_de)
+        
+        direccion = 'DESC' if descendente else 'ASC'
+        query = f"SELECT {', '.join(COLUMNAS_INMUEBLE)} FROM inmuebles"
+        if condiciones:
+            query += " WHERE " + " AND ".join(condiciones)
+        query += f" ORDER BY {orden} {direccion}" + (f", id {direccion}" if orden != 'id' else "")
+        query += " LIMIT ?"
+        # Una fila de más indica si existe una página siguiente
+        parametros.append(int(tamano_pagina) + 1)
+        
+        try:
+            with self.conexion() as conn:
+                filas = conn.execute(query, parametros).fetchall()
+        except Exception as e:
+            print(f"Error obteniendo página de inmuebles: {e}")
+            registrar_error('db', 'obtener_pagina', e)
+            filas = []
+        
+        hay_mas = len(filas) > tamano_pagina
+        df = pd.DataFrame(filas[:tamano_pagina], columns=COLUMNAS_INMUEBLE)
+        siguiente = None
+        if hay_mas:
+            ultima = filas[tamano_pagina - 1]
+            siguiente = (ultima[COLUMNAS_INMUEBLE.index(orden)], ultima[0])
+        return {'filas': df, 'siguiente': siguiente, 'hay_mas': hay_mas}
+    
+    @medir('db_consulta', operacion='iterar_inmuebles')
+    def iterar_inmuebles(self, columnas, tamano_chunk=50000, solo_activos=True):
+        """Recorre la tabla con un cursor y entrega bloques numpy de a lo sumo tamano_chunk filas."""
+        columnas_validas = {'id', 'm2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad', 'precio_usd'}
+        if any(col not in columnas_validas for col in columnas):
+            raise ValueError(f"Columnas no permitidas: {columnas}")
+        
+        query = f"SELECT {', '.join(columnas)} FROM inmuebles"
+        if solo_activos:
+            query += " WHERE activo = 1"
+        query += " ORDER BY id"
+        
+        with self.conexion() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query)
+            while True:
+                filas = cursor.fetchmany(tamano_chunk)
+                if not filas:
+                    break
+                yield np.array(filas, dtype=float)
+    
+    @medir('db_consulta', operacion='obtener_huella_datos')
+    def obtener_huella_datos(self):
+        """Huella barata de la versión de los datos: (identidad de la base, último seq del log).
+        
+        La identidad es un UUID que se guarda en la tabla meta al crear el esquema, así que
+        dos bases distintas (o una recreada desde cero) nunca comparten huella. Toda
+        escritura en inmuebles pasa por los triggers del log, así que para la versión
+        alcanza con el último seq (búsqueda O(log n) en la clave primaria, sin recorrer
+        inmuebles). Si el log se vació entero, sqlite_sequence conserva el último seq asignado.
+        """
+        try:
+            with self.conexion() as conn:
+                return tuple(conn.execute('''
+                    SELECT (SELECT valor FROM meta WHERE clave = 'identidad'),
+                           COALESCE((SELECT MAX(seq) FROM cambios_inmuebles),
+                                    (SELECT seq FROM sqlite_sequence WHERE name = 'cambios_inmuebles'), 0)
+                ''').fetchone())
+        except Exception as e:
+            print(f"Error obteniendo huella de datos: {e}")
+            registrar_error('db', 'obtener_huella_datos', e)
+            return None
+    
     def poblar_datos_iniciales(self, dataset):
         df_existente = self.obtener_inmuebles()
         if len(df_existente) == 0:
-            exitos = 0
-            for _, fila in dataset.iterrows():
-                if self.insertar_inmueble(fila['m2'], fila['habitaciones'], fila['antiguedad'],
-                                        fila['zona_categoria'], fila['tipo_propiedad'], fila['precio_usd']):
-                    exitos += 1
-            print(f"Se insertaron {exitos}/{len(dataset)} registros iniciales")
+            resultado = self.insertar_lote(dataset)
+            print(f"Se insertaron {resultado['insertados']}/{len(dataset)} registros iniciales")
 
 if __name__ == "__main__":
     db = DatabaseManager()
@@ -1,17 +1,23 @@
 # datos/dataset_inmobiliario.py
 import pandas as pd
 import numpy as np
-import sqlite3
 
 try:
     from database_manager import DatabaseManager
 except ImportError:
     from .database_manager import DatabaseManager
+# Después de database_manager: ejecutado como script, éste ya agregó la raíz del proyecto a sys.path
+from utils.instrumentacion import medir, registrar_error
 
 class DatasetInmobiliario:
     def __init__(self, db_path="inmuebles_cordoba.db"):
         self.db = DatabaseManager(db_path)
         self.df = None
+        self._matrices = None  # (df de origen, X, Y) para no rearmar las matrices en cada rerun
+        # Último cambio del log ya reflejado en self.df (ver refrescar_cambios)
+        self.ultimo_cambio = 0
+        # Resumen del refresco hecho por la última escritura (agregar/actualizar/eliminar_propiedad)
+        self.ultimo_refresco = None
         
         self.categorias_zona = {
             1: "Centro - Alta demanda",
@@ -26,11 +32,13 @@ class DatasetInmobiliario:
             2: "Departamento"
         }
     
+    @medir('dataset_consulta', operacion='crear_dataset')
     def crear_dataset(self, usar_base_datos=True):
         if usar_base_datos:
-            df_db = self.db.obtener_inmuebles()
+            df_db, seq = self.db.obtener_inmuebles_con_marca()
             if len(df_db) > 0:
                 self.df = df_db
+                self.ultimo_cambio = seq
                 return self.df
             else:
                 return self.cargar_datos_ejemplo()
@@ -50,28 +58,130 @@ class DatasetInmobiliario:
         
         df_ejemplo = pd.DataFrame(data)
         self.db.poblar_datos_iniciales(df_ejemplo)
-        self.df = self.db.obtener_inmuebles()
+        self.df, self.ultimo_cambio = self.db.obtener_inmuebles_con_marca()
         return self.df
     
+    @medir('dataset_consulta', operacion='obtener_matrices_entrenamiento')
     def obtener_matrices_entrenamiento(self):
         if self.df is None or len(self.df) == 0:
             self.crear_dataset()
         
+        if self._matrices is not None and self._matrices[0] is self.df:
+            return self._matrices[1], self._matrices[2]
+        
         caracteristicas = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
-        X = self.df[caracteristicas].values
-        Y = self.df['precio_usd'].values
+        X = self.df[caracteristicas].to_numpy(dtype=float)
+        Y = self.df['precio_usd'].to_numpy(dtype=float)
+        # Se comparten entre llamadas: de solo lectura para que nadie las modifique por error
+        X.flags.writeable = False
+        Y.flags.writeable = False
+        self._matrices = (self.df, X, Y)
         return X, Y
     
-    def agregar_propiedad(self, m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd):
+    @medir('dataset_consulta', operacion='iterar_matrices_entrenamiento')
+    def iterar_matrices_entrenamiento(self, tamano_chunk=50000):
+        """Versión por lotes de obtener_matrices_entrenamiento: lee la tabla con un cursor
+        y entrega (X, Y) de a un bloque, sin pasar por un DataFrame completo."""
+        caracteristicas = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
+        for bloque in self.db.iterar_inmuebles(caracteristicas + ['precio_usd'], tamano_chunk):
+            yield bloque[:, :-1], bloque[:, -1]
+    
+    @medir('dataset_consulta', operacion='entrenar_streaming')
+    def entrenar_streaming(self, modelo, tamano_chunk=50000, calcular_mae=True, verbose=False):
+        """Entrena el modelo directamente desde SQLite con memoria O(tamano_chunk·p)."""
+        exito = modelo.entrenar_por_lotes(self.iterar_matrices_entrenamiento(tamano_chunk), verbose=verbose)
+        if exito and calcular_mae:
+            modelo.recalcular_mae_por_lotes(self.iterar_matrices_entrenamiento(tamano_chunk))
+        return exito
+    
+    @medir('dataset_consulta', operacion='refrescar_cambios')
+    def refrescar_cambios(self, modelo=None, proporcion_recarga=0.25):
+        """
+        Aplica los cambios del log posteriores a self.ultimo_cambio
+        
+        Al DataFrame en memoria: sólo las filas tocadas (o una recarga completa si
+        cambió más de proporcion_recarga del total). Al modelo: se retiran los valores
+        anteriores de cada fila activa modificada y se agregan los nuevos, con
+        actualizaciones de rango k sobre sus estadísticas suficientes, sin reentrenar.
+        
+        Returns:
+            Diccionario con la cantidad de cambios aplicados, filas agregadas / retiradas
+            del modelo y si el DataFrame se recargó completo
+        """
+        cambios = self.db.obtener_cambios(self.ultimo_cambio)
+        resumen = {'cambios': len(cambios), 'agregadas': 0, 'retiradas': 0, 'recarga_completa': False,
+                   'modelo_actualizado': modelo is not None}
+        if not cambios:
+            return resumen
+        
+        if cambios[0]['seq'] != self.ultimo_cambio + 1:
+            # Parte del log se purgó antes de aplicarse: los deltas no alcanzan
+            self.df, self.ultimo_cambio = self.db.obtener_inmuebles_con_marca()
+            resumen.update(recarga_completa=True, modelo_actualizado=False)
+            return resumen
+        
+        columnas = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad', 'precio_usd']
+        if modelo is not None and modelo.estadisticas is None:
+            resumen['modelo_actualizado'] = False
+        elif modelo is not None:
+            agregar, retirar = [], []
+            for cambio in cambios:
+                antes = [cambio[f"{c}_anterior"] for c in columnas] if cambio['activo_anterior'] == 1 else None
+                despues = [cambio[f"{c}_nuevo"] for c in columnas] if cambio['activo_nuevo'] == 1 else None
+                if antes == despues:
+                    continue  # p. ej. sólo cambió la fecha
+                if antes is not None:
+                    retirar.append(antes)
+                if despues is not None:
+                    agregar.append(despues)
+            # Primero las altas: así el modelo nunca pasa por un conjunto vacío intermedio
+            correcto = True
+            if agregar:
+                agregar = np.array(agregar, dtype=float)
+                correcto = modelo.actualizar(agregar[:, :-1], agregar[:, -1])
+            if retirar and correcto:
+                retirar = np.array(retirar, dtype=float)
+                correcto = modelo.retirar(retirar[:, :-1], retirar[:, -1])
+            resumen['modelo_actualizado'] = bool(correcto)
+            resumen['agregadas'], resumen['retiradas'] = len(agregar), len(retirar)
+        
+        if self.df is None or len(cambios) > proporcion_recarga * max(len(self.df), 1):
+            self.df, self.ultimo_cambio = self.db.obtener_inmuebles_con_marca()
+            resumen['recarga_completa'] = True
+            return resumen
+        
+        # Estado final de cada id tocado (el último cambio manda)
+        finales = {}
+        for cambio in cambios:
+            finales[cambio['id_inmueble']] = cambio
+        restantes = self.df[~self.df['id'].isin(list(finales))]
+        nuevas = pd.DataFrame(
+            [dict({'id': id_inmueble}, **{c: cambio[f"{c}_nuevo"] for c in columnas + ['fecha_actualizacion', 'activo']})
+             for id_inmueble, cambio in finales.items() if cambio['activo_nuevo'] == 1],
+            columns=self.df.columns
+        )
+        if len(nuevas) > 0:
+            df = pd.concat([restantes, nuevas.astype(self.df.dtypes.to_dict())], ignore_index=True)
+            if len(restantes) > 0 and nuevas['id'].min() < restantes['id'].max():
+                df = df.sort_values('id', kind='stable', ignore_index=True)
+        else:
+            df = restantes.reset_index(drop=True)
+        self.df = df
+        self.ultimo_cambio = cambios[-1]['seq']
+        return resumen
+    
+    @medir('dataset_consulta', operacion='agregar_propiedad')
+    def agregar_propiedad(self, m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd, modelo=None):
         success = self.db.insertar_inmueble(m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd)
         if success:
-            self.df = self.db.obtener_inmuebles()
+            # Sólo la fila nueva: DataFrame y modelo (O(p²)) se actualizan desde el log de cambios
+            self.ultimo_refresco = self.refrescar_cambios(modelo if modelo is not None and modelo.entrenado else None)
         return success
     
-    def actualizar_propiedad(self, id_inmueble, **kwargs):
+    @medir('dataset_consulta', operacion='actualizar_propiedad')
+    def actualizar_propiedad(self, id_inmueble, modelo=None, **kwargs):
         try:
-            df_existente = self.db.obtener_inmuebles()
-            if id_inmueble not in df_existente['id'].values:
+            if not self.db.existe_inmueble(id_inmueble):
                 return False
             
             campos_permitidos = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad', 'precio_usd', 'activo']
@@ -86,53 +196,56 @@ class DatasetInmobiliario:
             if not set_clause:
                 return False
             
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
+            # Marca de tiempo con milisegundos: el log de cambios guarda cuándo se editó cada fila
+            set_clause.append("fecha_actualizacion = strftime('%Y-%m-%d %H:%M:%f', 'now')")
             query = f"UPDATE inmuebles SET {', '.join(set_clause)} WHERE id = ?"
             valores.append(id_inmueble)
-            cursor.execute(query, valores)
-            conn.commit()
-            conn.close()
+            with self.db.conexion() as conn:
+                conn.execute(query, valores)
             
-            self.df = self.db.obtener_inmuebles()
+            self.ultimo_refresco = self.refrescar_cambios(modelo if modelo is not None and modelo.entrenado else None)
             return True
             
         except Exception as e:
             print(f"Error actualizando propiedad: {e}")
+            registrar_error('dataset', 'actualizar_propiedad', e)
             return False
     
-    def eliminar_propiedad(self, id_inmueble):
+    @medir('dataset_consulta', operacion='eliminar_propiedad')
+    def eliminar_propiedad(self, id_inmueble, modelo=None):
         try:
-            df_existente = self.db.obtener_inmuebles()
-            if id_inmueble not in df_existente['id'].values:
+            if not self.db.existe_inmueble(id_inmueble):
                 return False
             
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute("UPDATE inmuebles SET activo = 0 WHERE id = ?", (id_inmueble,))
-            conn.commit()
-            conn.close()
+            with self.db.conexion() as conn:
+                conn.execute("UPDATE inmuebles SET activo = 0, fecha_actualizacion = strftime('%Y-%m-%d %H:%M:%f', 'now') "
+                             "WHERE id = ?", (id_inmueble,))
             
-            self.df = self.db.obtener_inmuebles()
+            self.ultimo_refresco = self.refrescar_cambios(modelo if modelo is not None and modelo.entrenado else None)
             return True
             
         except Exception as e:
             print(f"Error eliminando propiedad: {e}")
+            registrar_error('dataset', 'eliminar_propiedad', e)
             return False
     
+    @medir('dataset_consulta', operacion='limpiar_base_datos')
     def limpiar_base_datos(self):
         try:
-            conn = sqlite3.connect(self.db.db_path)
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM inmuebles")
-            conn.commit()
-            conn.close()
+            with self.db.conexion() as conn:
+                conn.execute("DELETE FROM inmuebles")
+                # Nadie necesita reproducir un vaciado fila por fila: se compacta el log
+                ultimo = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM cambios_inmuebles").fetchone()[0]
+                conn.execute("DELETE FROM cambios_inmuebles")
             self.df = pd.DataFrame()
+            self.ultimo_cambio = ultimo
             return True
         except Exception as e:
             print(f"Error limpiando base de datos: {e}")
+            registrar_error('dataset', 'limpiar_base_datos', e)
             return False
     
+    @medir('dataset_consulta', operacion='obtener_estadisticas')
     def obtener_estadisticas(self):
         if self.df is None or len(self.df) == 0:
             return {"error": "Dataset vacío"}
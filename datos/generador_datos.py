@@ -1,9 +1,26 @@
+import argparse
+import os
 import random
 from typing import List, Dict
 
+import numpy as np
+
+COLUMNAS_GENERADAS = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad', 'precio_usd']
+# Precio de referencia por m² (USD) de cada zona_categoria, en línea con los datos de ejemplo
+PRECIO_M2_ZONA = {1: 3800.0, 2: 3200.0, 3: 2900.0, 4: 2400.0, 5: 2050.0}
+PROBABILIDAD_ZONA = {1: 0.15, 2: 0.20, 3: 0.30, 4: 0.20, 5: 0.15}
+# Proporción de departamentos (tipo 2) en cada zona: más en el centro, casi nada en la periferia
+PROPORCION_DEPARTAMENTOS = {1: 0.60, 2: 0.50, 3: 0.30, 4: 0.15, 5: 0.10}
+# Multiplicador del precio por m² según tipo_propiedad
+FACTOR_TIPO = {1: 1.0, 2: 1.08}
+# Mediana de m2 según tipo_propiedad (distribución log-normal)
+M2_MEDIANO_TIPO = {1: 160.0, 2: 75.0}
+
 def generar_dataset_propiedades(n: int = 30) -> List[Dict]:
     """
-    Genera un dataset sintético de propiedades inmobiliarias
+    Genera un dataset sintético de propiedades inmobiliarias (formato anterior:
+    metros_cuadrados, ubicacion, banios). Para datos con el esquema de la tabla
+    inmuebles usar GeneradorInmuebles.
     
     Args:
         n: Número de propiedades a generar
@@ -57,8 +74,190 @@ def generar_dataset_propiedades(n: int = 30) -> List[Dict]:
     
     return dataset
 
+class GeneradorInmuebles:
+    """
+    Generador sintético vectorizado con el esquema de la tabla inmuebles
+    
+    Cada propiedad se arma así: zona según probabilidad_zona; tipo según la
+    proporción de departamentos de su zona; m2 log-normal alrededor de la mediana
+    del tipo; habitaciones según m2; antigüedad exponencial. El precio es
+    
+        m2 · precio_m2_zona · factor_tipo · (1 - depreciacion·antigüedad)
+           · (1 + prima_habitacion·(habitaciones - esperadas)) · ruido log-normal
+    
+    redondeado a `redondeo` USD. Todo se calcula por bloques con NumPy: generar
+    decenas de millones de filas no pasa nunca por un bucle de Python por fila.
+    Con la misma semilla y el mismo tamaño de lote se obtienen las mismas filas.
+    """
+    
+    def __init__(self, semilla=None, precio_m2_zona=None, probabilidad_zona=None,
+                 proporcion_departamentos=None, factor_tipo=None, m2_mediano_tipo=None,
+                 dispersion_m2=0.35, antiguedad_media=15.0, antiguedad_maxima=80,
+                 depreciacion_anual=0.006, prima_habitacion=0.03, ruido=0.12, redondeo=1000):
+        self.semilla = semilla
+        self.precio_m2_zona = dict(precio_m2_zona or PRECIO_M2_ZONA)
+        self.probabilidad_zona = dict(probabilidad_zona or PROBABILIDAD_ZONA)
+        self.proporcion_departamentos = dict(proporcion_departamentos or PROPORCION_DEPARTAMENTOS)
+        self.factor_tipo = dict(factor_tipo or FACTOR_TIPO)
+        self.m2_mediano_tipo = dict(m2_mediano_tipo or M2_MEDIANO_TIPO)
+        self.dispersion_m2 = dispersion_m2
+        self.antiguedad_media = antiguedad_media
+        self.antiguedad_maxima = antiguedad_maxima
+        self.depreciacion_anual = depreciacion_anual
+        self.prima_habitacion = prima_habitacion
+        self.ruido = ruido
+        self.redondeo = redondeo
+        
+        zonas = sorted(self.probabilidad_zona)
+        if zonas != sorted(self.precio_m2_zona):
+            raise ValueError("probabilidad_zona y precio_m2_zona deben tener las mismas zonas")
+        probabilidades = np.array([self.probabilidad_zona[z] for z in zonas], dtype=float)
+        if (probabilidades < 0).any() or probabilidades.sum() <= 0:
+            raise ValueError("Las probabilidades de zona deben ser no negativas y sumar más de 0")
+        # Tablas indexadas por posición de zona / tipo para evitar diccionarios en el camino vectorizado
+        self._zonas = np.array(zonas, dtype=np.int64)
+        self._acumulada_zona = np.cumsum(probabilidades / probabilidades.sum())
+        self._precio_m2 = np.array([self.precio_m2_zona[z] for z in zonas], dtype=float)
+        self._departamentos = np.array([self.proporcion_departamentos.get(z, 0.0) for z in zonas], dtype=float)
+        self._factor_tipo = np.array([self.factor_tipo[1], self.factor_tipo[2]], dtype=float)
+        self._log_m2_tipo = np.log([self.m2_mediano_tipo[1], self.m2_mediano_tipo[2]])
+    
+    def _bloque(self, rng, n):
+        import pandas as pd
+        
+        posicion_zona = np.minimum(np.searchsorted(self._acumulada_zona, rng.random(n), side='right'),
+                                   len(self._zonas) - 1)
+        es_departamento = rng.random(n) < self._departamentos[posicion_zona]
+        tipo = es_departamento.astype(np.int64) + 1
+        
+        m2 = np.exp(self._log_m2_tipo[tipo - 1] + self.dispersion_m2 * rng.standard_normal(n))
+        m2 = np.clip(m2, 25.0, 1000.0).round(1)
+        esperadas = m2 / 50.0
+        habitaciones = np.clip(np.rint(esperadas + 0.6 * rng.standard_normal(n)), 1, 10).astype(np.int64)
+        antiguedad = np.minimum(rng.exponential(self.antiguedad_media, n), self.antiguedad_maxima).astype(np.int64)
+        
+        precio = m2 * self._precio_m2[posicion_zona] * self._factor_tipo[tipo - 1]
+        precio *= np.maximum(1.0 - self.depreciacion_anual * antiguedad, 0.4)
+        precio *= 1.0 + self.prima_habitacion * (habitaciones - esperadas)
+        precio *= np.exp(self.ruido * rng.standard_normal(n))
+        if self.redondeo:
+            precio = np.maximum(np.rint(precio / self.redondeo), 1) * self.redondeo
+        return pd.DataFrame({
+            'm2': m2,
+            'habitaciones': habitaciones,
+            'antiguedad': antiguedad,
+            'zona_categoria': self._zonas[posicion_zona],
+            'tipo_propiedad': tipo,
+            'precio_usd': precio
+        }, columns=COLUMNAS_GENERADAS)
+    
+    def generar_lotes(self, n, tamano_lote=100000):
+        """Entrega n filas en DataFrames de a lo sumo tamano_lote (memoria O(tamano_lote))."""
+        n = int(n)
+        lotes = -(-n // tamano_lote) if n > 0 else 0
+        # Un flujo aleatorio independiente por lote, derivado de la semilla
+        for i, semilla_lote in enumerate(np.random.SeedSequence(self.semilla).spawn(lotes)):
+            inicio = i * tamano_lote
+            tamano = min(tamano_lote, n - inicio)
+            bloque = self._bloque(np.random.default_rng(semilla_lote), tamano)
+            bloque.index = range(inicio, inicio + tamano)
+            yield bloque
+    
+    def generar(self, n):
+        """Las n filas en un solo DataFrame."""
+        import pandas as pd
+        
+        lotes = list(self.generar_lotes(n, tamano_lote=max(int(n), 1)))
+        return lotes[0] if lotes else pd.DataFrame(columns=COLUMNAS_GENERADAS)
+    
+    def escribir_base_datos(self, db, n, tamano_lote=100000):
+        """
+        Genera e inserta n filas en la tabla inmuebles por lotes (insertar_lote)
+        
+        Args:
+            db: DatabaseManager o ruta del archivo SQLite
+            
+        Returns:
+            Resultado de insertar_lote: insertados, fallidos y total
+        """
+        if isinstance(db, str):
+            try:
+                from database_manager import DatabaseManager
+            except ImportError:
+                from .database_manager import DatabaseManager
+            db = DatabaseManager(db)
+        return db.insertar_lote(self.generar_lotes(n, tamano_lote), chunk_size=tamano_lote)
+    
+    def escribir_csv(self, ruta, n, tamano_lote=100000):
+        filas = 0
+        for i, bloque in enumerate(self.generar_lotes(n, tamano_lote)):
+            bloque.to_csv(ruta, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            filas += len(bloque)
+        return filas
+    
+    def escribir_parquet(self, ruta, n, tamano_lote=100000):
+        """Un row group por lote (requiere pyarrow)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("escribir_parquet requiere pyarrow (pip install pyarrow)")
+        filas = 0
+        escritor = None
+        try:
+            for bloque in self.generar_lotes(n, tamano_lote):
+                tabla = pa.Table.from_pandas(bloque, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(ruta, tabla.schema)
+                escritor.write_table(tabla)
+                filas += len(bloque)
+        finally:
+            if escritor is not None:
+                escritor.close()
+        return filas
+    
+    def escribir(self, destino, n, tamano_lote=100000):
+        """Escribe según la extensión del destino: .db/.sqlite, .csv o .parquet."""
+        extension = os.path.splitext(destino)[1].lower()
+        if extension in (".db", ".sqlite", ".sqlite3"):
+            return self.escribir_base_datos(destino, n, tamano_lote)['insertados']
+        if extension == ".csv":
+            return self.escribir_csv(destino, n, tamano_lote)
+        if extension in (".parquet", ".pq"):
+            return self.escribir_parquet(destino, n, tamano_lote)
+        raise ValueError(f"Formato no soportado: {extension} (usar .db, .csv o .parquet)")
+
+
+def generar_inmuebles(n: int, semilla=None):
+    """
+    Genera n propiedades con el esquema de la tabla inmuebles (GeneradorInmuebles con la configuración por defecto)
+    
+    Args:
+        n: Número de propiedades
+        semilla: Semilla del generador (mismo valor, mismas filas)
+        
+    Returns:
+        DataFrame con m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad, precio_usd
+    """
+    return GeneradorInmuebles(semilla=semilla).generar(n)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera propiedades sintéticas con el esquema de inmuebles")
+    parser.add_argument("destino", help="Archivo .db, .csv o .parquet")
+    parser.add_argument("--filas", type=float, default=1e6, help="Cantidad de filas (admite 1e7)")
+    parser.add_argument("--semilla", type=int, default=None)
+    parser.add_argument("--tamano-lote", type=int, default=100000)
+    parser.add_argument("--ruido", type=float, default=0.12, help="Desvío del ruido log-normal del precio")
+    args = parser.parse_args(argv)
+    
+    import time
+    inicio = time.perf_counter()
+    generador = GeneradorInmuebles(semilla=args.semilla, ruido=args.ruido)
+    filas = generador.escribir(args.destino, int(args.filas), args.tamano_lote)
+    segundos = time.perf_counter() - inicio
+    print(f"✅ {filas:,} propiedades escritas en {args.destino} en {segundos:.1f} s ({filas / segundos:,.0f} filas/s)")
+
+
 if __name__ == "__main__":
-    # Test del generador
-    propiedades = generar_dataset_propiedades(5)
-    for prop in propiedades:
-        print(f"{prop['metros_cuadrados']} m² - ${prop['precio']:,.0f} - {prop['ubicacion']}")
\ No newline at end of file
+    main()
@@ -0,0 +1,126 @@
+# datos/pool_conexiones.py
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# WAL permite lectores concurrentes mientras hay una escritura en curso;
+# synchronous=NORMAL es seguro en WAL y evita un fsync por commit.
+PRAGMAS_POR_DEFECTO = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,        # 64 MB de caché de páginas por conexión
+    'mmap_size': 268435456,      # 256 MB mapeados en memoria
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000
+}
+
+
+class PoolConexiones:
+    """Pool thread-safe de conexiones SQLite persistentes.
+
+    Cada conexión mantiene su caché de sentencias preparadas (cached_statements),
+    así que las consultas repetidas no se vuelven a compilar mientras la conexión
+    siga viva en el pool.
+    """
+
+    def __init__(self, db_path, tamano_maximo=8, pragmas=None, cached_statements=256, timeout=30):
+        self.db_path = db_path
+        self.tamano_maximo = tamano_maximo
+        self.pragmas = dict(PRAGMAS_POR_DEFECTO, **(pragmas or {}))
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._libres = queue.LifoQueue()
+        self._todas = []
+        self._lock = threading.Lock()
+        self.cerrado = False
+
+    def _nueva_conexion(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for nombre, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {nombre} = {valor}")
+        return conn
+
+    def _tomar(self):
+        if self.cerrado:
+            raise sqlite3.ProgrammingError("El pool de conexiones está cerrado")
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._todas) < self.tamano_maximo:
+                conn = self._nueva_conexion()
+                self._todas.append(conn)
+                return conn
+
+        try:
+            return self._libres.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"Sin conexiones libres tras {self.timeout}s (máximo {self.tamano_maximo})")
+
+    def _devolver(self, conn):
+        # Bajo el lock: cerrar() no puede vaciar la cola entre el chequeo y el put
+        with self._lock:
+            if not self.cerrado:
+                self._libres.put(conn)
+                return
+            self._todas.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def conexion(self):
+        """Presta una conexión; hace commit al salir o rollback si hubo una excepción."""
+        conn = self._tomar()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._devolver(conn)
+
+    def cerrar(self):
+        """Cierra las conexiones libres; las prestadas se cierran cuando se devuelven."""
+        with self._lock:
+            self.cerrado = True
+            libres = []
+            while True:
+                try:
+                    libres.append(self._libres.get_nowait())
+                except queue.Empty:
+                    break
+            cerradas = {id(conn) for conn in libres}
+            self._todas = [conn for conn in self._todas if id(conn) not in cerradas]
+        for conn in libres:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def obtener_pool(db_path, **kwargs):
+    """Devuelve el pool compartido del proceso para db_path (lo crea la primera vez)."""
+    clave = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None or pool.cerrado:
+            pool = PoolConexiones(db_path, **kwargs)
+            _pools[clave] = pool
+        return pool
+
+
+def cerrar_pool(db_path):
+    clave = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.pop(clave, None)
+    if pool is not None:
+        pool.cerrar()
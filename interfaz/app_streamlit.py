@@ -4,14 +4,18 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from datos.dataset_inmobiliario import DatasetInmobiliario
-from modelo.regresor_lineal import RegresorLinealMultiple
-from modelo.validador_modelo import ValidadorModelo
-from modelo.servicios_modelo import (preparar_entrada_prediccion, 
-                                   obtener_metricas_modelo, 
-                                   obtener_coeficientes)
+from modelo.servicios_modelo import (obtener_metricas_modelo, 
+                                   obtener_coeficientes,
+                                   obtener_diagnosticos,
+                                   obtener_diagnosticos_influencia,
+                                   predecir_con_grilla,
+                                   intervalo_prediccion)
+from interfaz.cache_modelo import CacheModeloCompartido
+from datos.database_manager import COLUMNAS_ORDEN
+from modelo.registro_modelos import RegistroModelos
+from modelo.grilla_valuacion import firma_modelo
+from utils.visualizador import VisualizadorResultados
+from utils.instrumentacion import span, perfilar, volcar_metricas
 
 # Configuración de la página
 st.set_page_config(
@@ -48,20 +52,20 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def obtener_cache_modelo():
+    """Caché de modelo único por proceso, compartido entre todas las sesiones"""
+    return CacheModeloCompartido(registro=RegistroModelos())
+
+@st.cache_resource(show_spinner=False)
+def obtener_visualizador():
+    """Gráficos renderizados una vez por versión del modelo, compartidos entre sesiones"""
+    return VisualizadorResultados()
+
 def inicializar_modelo():
-    """Inicializa y entrena el modelo usando las clases POO"""
+    """Obtiene el modelo entrenado vigente; solo reentrena si cambiaron los datos"""
     try:
-        dataset = DatasetInmobiliario()
-        df = dataset.crear_dataset()
-        X, Y = dataset.obtener_matrices_entrenamiento()
-        
-        modelo = RegresorLinealMultiple()
-        modelo.entrenar(X, Y, verbose=False)
-        
-        validador = ValidadorModelo(modelo)
-        validador.validacion_train_test(X, Y)
-        
-        return modelo, dataset, df, validador
+        return obtener_cache_modelo().obtener()
     except Exception as e:
         st.error(f"Error al inicializar el modelo: {e}")
         return None, None, None, None
@@ -88,8 +92,8 @@ def mostrar_pagina_calculadora(modelo, dataset):
     
     if st.button("🎯 Calcular Valuación", type="primary", use_container_width=True):
         try:
-            X_pred = preparar_entrada_prediccion(m2, habitaciones, antiguedad, zona, tipo_propiedad)
-            precio_predicho = modelo.predecir(X_pred)[0]
+            # Consulta O(1) a la grilla precalculada del modelo vigente
+            precio_predicho = predecir_con_grilla(modelo, m2, habitaciones, antiguedad, zona, tipo_propiedad)
             
             # Mostrar resultado
             st.markdown("---")
@@ -106,6 +110,11 @@ def mostrar_pagina_calculadora(modelo, dataset):
                 metricas = obtener_metricas_modelo(modelo, X, Y)
                 st.metric("🎯 Precisión del Modelo", f"{metricas['precision_porcentaje']:.1f}%")
             
+            # Rango de precio para una propiedad concreta (intervalo de predicción del 95%)
+            rango = intervalo_prediccion(modelo, m2, habitaciones, antiguedad, zona, tipo_propiedad)
+            if rango is not None:
+                st.caption(f"📏 Rango estimado (95%): ${max(rango[0], 0):,.0f} – ${rango[1]:,.0f} USD")
+            
             st.markdown('</div>', unsafe_allow_html=True)
             
         except Exception as e:
@@ -116,8 +125,9 @@ def mostrar_pagina_analisis(modelo, dataset, df):
     st.header("📊 Análisis del Modelo Predictivo")
     
     X, Y = dataset.obtener_matrices_entrenamiento()
-    metricas = obtener_metricas_modelo(modelo, X, Y)
-    coefs = obtener_coeficientes(modelo, dataset)
+    diagnosticos = obtener_diagnosticos(modelo, X, Y)
+    metricas = diagnosticos['metricas']
+    coefs = diagnosticos['coeficientes']
     
     # Métricas principales
     col_met1, col_met2, col_met3, col_met4 = st.columns(4)
@@ -130,36 +140,103 @@ def mostrar_pagina_analisis(modelo, dataset, df):
     st.subheader("📈 Visualizaciones del Modelo")
     tab1, tab2, tab3 = st.tabs(["🎯 Predicciones vs Reales", "📊 Importancia de Variables", "📉 Análisis de Errores"])
     
+    # Imágenes memorizadas por modelo (firma + versión) y cantidad de filas: un rerun no redibuja
+    visualizador = obtener_visualizador()
+    clave = (firma_modelo(modelo), modelo.version, len(Y))
+    Y_pred = diagnosticos['predicciones']
+    
     with tab1:
-        Y_pred = modelo.predecir(X)
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.scatter(Y, Y_pred, alpha=0.6, s=50)
-        ax.plot([Y.min(), Y.max()], [Y.min(), Y.max()], 'r--', lw=2)
-        ax.set_xlabel('Precio Real (USD)'); ax.set_ylabel('Precio Predicho (USD)')
-        ax.set_title(f'Validación: Real vs Predicho (R² = {metricas["R²"]:.4f})')
-        ax.grid(True, alpha=0.3)
-        st.pyplot(fig)
+        st.image(visualizador.grafico_real_vs_predicho(Y, Y_pred, metricas['R²'], clave=clave + ('real_vs_predicho',)))
     
     with tab2:
-        variables = list(coefs.keys())[1:]
-        importancias = [abs(coefs[var]) for var in variables]
-        fig, ax = plt.subplots(figsize=(10, 6))
-        y_pos = np.arange(len(variables))
-        bars = ax.barh(y_pos, importancias)
-        ax.set_yticks(y_pos); ax.set_yticklabels(variables)
-        ax.set_xlabel('Importancia (Valor Absoluto del Coeficiente)')
-        ax.set_title('Importancia Relativa de las Variables')
-        st.pyplot(fig)
+        st.image(visualizador.grafico_importancia_variables(list(coefs.values()), list(coefs.keys()),
+                                                            clave=clave + ('importancia',)))
     
     with tab3:
-        residuos = Y - Y_pred
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.scatter(Y_pred, residuos, alpha=0.6, s=50)
-        ax.axhline(y=0, color='red', linestyle='--', linewidth=2)
-        ax.set_xlabel('Precio Predicho (USD)'); ax.set_ylabel('Residuos (USD)')
-        ax.set_title('Análisis de Residuos')
-        ax.grid(True, alpha=0.3)
-        st.pyplot(fig)
+        residuos = diagnosticos['residuos']
+        st.image(visualizador.grafico_residuos(Y_pred, residuos, clave=clave + ('residuos',)))
+        
+        # Leave-one-out e influencia en forma cerrada (matriz sombrero, sin reentrenar)
+        influencia = obtener_diagnosticos_influencia(modelo, X, Y)
+        col_loo1, col_loo2, col_loo3 = st.columns(3)
+        with col_loo1: st.metric("R² Leave-One-Out", f"{influencia['r2_prediccion']:.4f}")
+        with col_loo2: st.metric("MAE Leave-One-Out", f"${influencia['mae_loo']:,.0f} USD")
+        with col_loo3: st.metric("Propiedades influyentes", f"{len(influencia['indices_influyentes'])}")
+        
+        if len(influencia['indices_influyentes']) > 0:
+            st.markdown(f"**🔎 Propiedades con mayor influencia (Cook > {influencia['umbral_cook']:.3f})**")
+            indices = influencia['indices_influyentes'][:10]
+            df_influyentes = df.iloc[indices][['id', 'm2', 'habitaciones', 'antiguedad', 'zona_categoria', 'precio_usd']].copy()
+            df_influyentes['apalancamiento'] = influencia['apalancamiento'][indices].round(3)
+            df_influyentes['distancia_cook'] = influencia['distancia_cook'][indices].round(3)
+            df_influyentes['residuo_loo'] = influencia['residuos_loo'][indices].round(0)
+            st.dataframe(df_influyentes, use_container_width=True)
+
+def _formatear_pagina(df, dataset):
+    """Etiquetas y precios de la página visible, con operaciones por columna (sin apply fila a fila)"""
+    pagina = df[['id', 'm2', 'habitaciones', 'antiguedad']].copy()
+    pagina['zona'] = df['zona_categoria'].map(dataset.categorias_zona)
+    pagina['tipo'] = df['tipo_propiedad'].map(dataset.tipos_propiedad)
+    enteros = df['precio_usd'].round().astype('int64').astype(str)
+    pagina['precio_usd'] = '$' + enteros.str.replace(r'\B(?=(\d{3})+(?!\d))', ',', regex=True)
+    return pagina
+
+def _mostrar_tabla_paginada(dataset, clave):
+    """Tabla de propiedades filtrada y ordenada en SQLite, de a una página por vez (paginación por clave)"""
+    nombres_orden = {'id': 'ID', 'precio_usd': 'Precio', 'm2': 'Metros cuadrados'}
+    with st.expander("🔎 Filtros y orden"):
+        col_f1, col_f2, col_f3 = st.columns(3)
+        with col_f1:
+            zonas = st.multiselect("Zonas", options=list(dataset.categorias_zona.keys()),
+                                   format_func=lambda x: dataset.categorias_zona[x], key=f"{clave}_zonas")
+            tipos = st.multiselect("Tipos", options=list(dataset.tipos_propiedad.keys()),
+                                   format_func=lambda x: dataset.tipos_propiedad[x], key=f"{clave}_tipos")
+        with col_f2:
+            precio_min = st.number_input("Precio mínimo (USD)", min_value=0, value=0, step=10000, key=f"{clave}_pmin")
+            precio_max = st.number_input("Precio máximo (USD, 0 = sin límite)", min_value=0, value=0, step=10000,
+                                         key=f"{clave}_pmax")
+            m2_min = st.number_input("m² mínimo", min_value=0, value=0, step=10, key=f"{clave}_m2min")
+            m2_max = st.number_input("m² máximo (0 = sin límite)", min_value=0, value=0, step=10, key=f"{clave}_m2max")
+        with col_f3:
+            orden = st.selectbox("Ordenar por", COLUMNAS_ORDEN, format_func=lambda x: nombres_orden[x],
+                                 key=f"{clave}_orden")
+            descendente = st.checkbox("Descendente", key=f"{clave}_desc")
+            tamano_pagina = st.selectbox("Filas por página", [25, 50, 100, 200], index=1, key=f"{clave}_tamano")
+    
+    filtros = {
+        'zonas': zonas,
+        'tipos': tipos,
+        'precio_min': precio_min or None,
+        'precio_max': precio_max or None,
+        'm2_min': m2_min or None,
+        'm2_max': m2_max or None
+    }
+    
+    # Pila de cursores (valor, id) por página; se reinicia cuando cambian filtros u orden
+    firma = (tuple(zonas), tuple(tipos), precio_min, precio_max, m2_min, m2_max, orden, descendente, tamano_pagina)
+    estado = st.session_state.get(f"{clave}_paginacion")
+    if estado is None or estado['firma'] != firma:
+        estado = {'firma': firma, 'cursores': [None]}
+        st.session_state[f"{clave}_paginacion"] = estado
+    
+    pagina = dataset.db.obtener_pagina(filtros, orden, descendente, tamano_pagina, estado['cursores'][-1])
+    total = dataset.db.contar_inmuebles(filtros)
+    if total == 0:
+        st.warning("No hay propiedades que cumplan los filtros")
+        return
+    
+    st.caption(f"Página {len(estado['cursores'])} de {-(-total // tamano_pagina)} · {total} propiedades")
+    st.dataframe(_formatear_pagina(pagina['filas'], dataset), use_container_width=True, hide_index=True)
+    
+    col_anterior, col_siguiente = st.columns(2)
+    with col_anterior:
+        if st.button("◀ Anterior", key=f"{clave}_anterior", disabled=len(estado['cursores']) == 1):
+            estado['cursores'].pop()
+            st.rerun()
+    with col_siguiente:
+        if st.button("Siguiente ▶", key=f"{clave}_siguiente", disabled=not pagina['hay_mas']):
+            estado['cursores'].append(pagina['siguiente'])
+            st.rerun()
 
 def mostrar_pagina_dataset(modelo, dataset, df, validador):
     """Página 3: Dataset y validación"""
@@ -167,11 +244,7 @@ def mostrar_pagina_dataset(modelo, dataset, df, validador):
     
     # Mostrar dataset
     st.subheader("🏠 Dataset de Propiedades de Córdoba")
-    df_display = df.copy()
-    df_display['zona_categoria'] = df_display['zona_categoria'].map(dataset.categorias_zona)
-    df_display['tipo_propiedad'] = df_display['tipo_propiedad'].map(dataset.tipos_propiedad)
-    df_display['precio_usd'] = df_display['precio_usd'].apply(lambda x: f"${x:,.0f}")
-    st.dataframe(df_display, use_container_width=True)
+    _mostrar_tabla_paginada(dataset, "dataset")
     
     # Estadísticas
     st.subheader("📊 Estadísticas Descriptivas")
@@ -186,28 +259,27 @@ def mostrar_pagina_dataset(modelo, dataset, df, validador):
     st.text(validador.obtener_resumen_validacion())
 
 def mostrar_pagina_gestion_datos(dataset):
-    """Página 4: Gestión de datos"""
+    """Página 4: Gestión de datos (las escrituras pasan por el caché compartido)"""
     st.header("🗃️ Gestión de Base de Datos")
     
-    df_db = dataset.db.obtener_inmuebles()
+    total_propiedades = dataset.db.contar_inmuebles()
     
     # Estado de la base de datos
-    if len(df_db) == 0:
+    if total_propiedades == 0:
         st.info("🎯 **Sistema listo** - Se cargarán automáticamente datos de ejemplo")
     else:
-        st.success(f"✅ **Base de datos activa** - {len(df_db)} propiedades cargadas")
+        st.success(f"✅ **Base de datos activa** - {total_propiedades} propiedades cargadas")
     
     # Botones de administración
     col_admin1, col_admin2, col_admin3 = st.columns(3)
     with col_admin1:
         if st.button("🔄 Recargar datos de ejemplo"):
-            dataset.limpiar_base_datos()
-            dataset.cargar_datos_ejemplo()
+            obtener_cache_modelo().limpiar_datos(recargar_ejemplo=True)
             st.success("✅ Datos de ejemplo recargados")
             st.rerun()
     with col_admin2:
         if st.button("🗑️ Limpiar base de datos", type="secondary"):
-            dataset.limpiar_base_datos()
+            obtener_cache_modelo().limpiar_datos()
             st.success("✅ Base de datos limpiada")
             st.rerun()
     
@@ -216,12 +288,8 @@ def mostrar_pagina_gestion_datos(dataset):
     
     with tab1:
         st.subheader("Base de Datos Actual")
-        if len(df_db) > 0:
-            df_display = df_db.copy()
-            df_display['zona'] = df_display['zona_categoria'].map(dataset.categorias_zona)
-            df_display['tipo'] = df_display['tipo_propiedad'].map(dataset.tipos_propiedad)
-            df_display['precio_usd'] = df_display['precio_usd'].apply(lambda x: f"${x:,.0f}")
-            st.dataframe(df_display[['id', 'm2', 'habitaciones', 'antiguedad', 'zona', 'tipo', 'precio_usd']])
+        if total_propiedades > 0:
+            _mostrar_tabla_paginada(dataset, "gestion")
         else:
             st.warning("No hay propiedades en la base de datos")
     
@@ -241,7 +309,8 @@ def mostrar_pagina_gestion_datos(dataset):
                 precio_nuevo = st.number_input("Precio (USD)", min_value=10000, max_value=1000000, value=150000)
             
             if st.form_submit_button("💾 Guardar Propiedad"):
-                dataset.agregar_propiedad(m2_nuevo, habitaciones_nuevo, antiguedad_nuevo, zona_nuevo, tipo_nuevo, precio_nuevo)
+                obtener_cache_modelo().aplicar_cambio('agregar_propiedad', m2_nuevo, habitaciones_nuevo, antiguedad_nuevo,
+                                                      zona_nuevo, tipo_nuevo, precio_nuevo)
                 st.success("✅ Propiedad agregada exitosamente!")
                 st.rerun()
 
@@ -285,6 +354,19 @@ def mostrar_pagina_tecnica(modelo, dataset):
         for var, valor in list(coefs.items())[3:]:
             st.write(f"**{var}**: {valor:,.0f}")
     
+    inferencia = modelo.obtener_inferencia_coeficientes()
+    if 'error' not in inferencia:
+        with st.expander("📐 Errores estándar e intervalos de confianza (95%)"):
+            tabla = pd.DataFrame(inferencia).T.rename(columns={
+                'coeficiente': 'β', 'error_estandar': 'Error estándar', 't': 't',
+                'inferior': 'IC 95% inferior', 'superior': 'IC 95% superior'})
+            st.dataframe(tabla, use_container_width=True)
+    
+    info_solver = modelo.obtener_info_solver()
+    if info_solver['solver_usado']:
+        st.caption(f"Solver: {info_solver['solver_usado']} (solicitado: {info_solver['solver_solicitado']}) · "
+                   f"Número de condición de XᵀX: {info_solver['numero_condicion']:.2e}")
+    
     # Métricas
     st.subheader("🎯 Métricas de Evaluación")
     metricas = obtener_metricas_modelo(modelo, X, Y)
@@ -298,26 +380,17 @@ def main():
     st.markdown('<h1 class="main-header">🏠 Sistema de Valuación Inmobiliaria</h1>', unsafe_allow_html=True)
     st.markdown("### 📍 Córdoba Capital - Modelo Predictivo con Álgebra Lineal")
     
-    # Inicializar modelo (solo una vez)
-    if 'modelo' not in st.session_state:
-        with st.spinner("🤖 Cargando modelo de inteligencia artificial..."):
-            modelo, dataset, df, validador = inicializar_modelo()
-            if modelo:
-                st.session_state.modelo = modelo
-                st.session_state.dataset = dataset
-                st.session_state.df = df
-                st.session_state.validador = validador
-                st.success("✅ Modelo cargado exitosamente!")
-    
-    if 'modelo' not in st.session_state:
+    # Modelo compartido entre sesiones (se reentrena solo si cambió la huella de los datos)
+    with st.spinner("🤖 Cargando modelo de inteligencia artificial..."):
+        modelo, dataset, df, validador = inicializar_modelo()
+    
+    if not modelo:
         st.error("No se pudo cargar el modelo. Por favor, verifica los archivos.")
         return
     
-    # Obtener datos del estado de sesión
-    modelo = st.session_state.modelo
-    dataset = st.session_state.dataset
-    df = st.session_state.df
-    validador = st.session_state.validador
+    if 'modelo_cargado' not in st.session_state:
+        st.session_state.modelo_cargado = True
+        st.success("✅ Modelo cargado exitosamente!")
     
     # Sidebar - Navegación
     st.sidebar.title("🧭 Navegación")
@@ -326,17 +399,32 @@ def main():
         "🗃️ Gestión de Datos", "ℹ️ Información Técnica"
     ])
     
-    # Navegación entre páginas
-    if pagina == "🔮 Calculadora de Precios":
-        mostrar_pagina_calculadora(modelo, dataset)
-    elif pagina == "📊 Análisis del Modelo":
-        mostrar_pagina_analisis(modelo, dataset, df)
-    elif pagina == "📈 Dataset y Validación":
-        mostrar_pagina_dataset(modelo, dataset, df, validador)
-    elif pagina == "🗃️ Gestión de Datos":
-        mostrar_pagina_gestion_datos(dataset)
-    else:  # Información Técnica
-        mostrar_pagina_tecnica(modelo, dataset)
+    # Cada render queda medido; con ?perfil=cprofile (o tracemalloc) en la URL se perfila esta ejecución
+    modos_perfil = set(st.query_params.get("perfil", "").split(","))
+    nombre_pagina = pagina.split(" ", 1)[1]
+    with span("pagina_render", pagina=nombre_pagina), \
+            perfilar("pagina_render", cprofile="cprofile" in modos_perfil or None,
+                     memoria="tracemalloc" in modos_perfil or None) as perfil:
+        # Navegación entre páginas
+        if pagina == "🔮 Calculadora de Precios":
+            mostrar_pagina_calculadora(modelo, dataset)
+        elif pagina == "📊 Análisis del Modelo":
+            mostrar_pagina_analisis(modelo, dataset, df)
+        elif pagina == "📈 Dataset y Validación":
+            mostrar_pagina_dataset(modelo, dataset, df, validador)
+        elif pagina == "🗃️ Gestión de Datos":
+            mostrar_pagina_gestion_datos(dataset)
+        else:  # Información Técnica
+            mostrar_pagina_tecnica(modelo, dataset)
+    volcar_metricas()
+    
+    if perfil:
+        with st.expander("⏱️ Perfil de esta ejecución"):
+            if 'memoria_pico_kb' in perfil:
+                st.write(f"**Pico de memoria:** {perfil['memoria_pico_kb']:,.1f} KB")
+                st.code("\n".join(perfil['memoria_top']))
+            if 'cprofile' in perfil:
+                st.code(perfil['cprofile'])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,167 @@
+# interfaz/cache_modelo.py
+import copy
+import threading
+from datos.database_manager import DatabaseManager
+from datos.dataset_inmobiliario import DatasetInmobiliario
+from modelo.regresor_lineal import RegresorLinealMultiple
+from modelo.validador_modelo import ValidadorModelo
+
+
+class CacheModeloCompartido:
+    """Modelo entrenado compartido por todas las sesiones del proceso.
+
+    La entrada se indexa con la huella de los datos (último seq del log de cambios
+    cambios_inmuebles): mientras no cambie, todas las sesiones reutilizan el mismo
+    modelo, dataset y validación; si cambia, el siguiente acceso aplica los deltas
+    del log al dataset y al modelo y sólo reentrena una vez si eso no es posible.
+
+    Las sesiones leen la entrada sin tomar el lock: los deltas nunca se aplican sobre
+    la entrada publicada sino sobre copias (_copia_de_trabajo), que reemplazan a
+    self.entrada en una sola asignación. Un lector ve la entrada vieja o la nueva
+    completa, nunca un modelo a medio actualizar.
+    """
+
+    def __init__(self, db_path="inmuebles_cordoba.db", registro=None):
+        self.db_path = db_path
+        # RegistroModelos opcional: si está, se carga el artefacto vigente en lugar de reentrenar
+        self.registro = registro
+        self.db = None
+        self.huella = None
+        self.entrada = None  # (modelo, dataset, df, validador)
+        self.entrenamientos = 0
+        self.refrescos = 0
+        self._lock = threading.Lock()
+
+    def _huella_actual(self):
+        if self.db is None:
+            self.db = DatabaseManager(self.db_path)
+        return self.db.obtener_huella_datos()
+
+    def _construir(self):
+        dataset = DatasetInmobiliario(self.db_path)
+        df = dataset.crear_dataset()
+        X, Y = dataset.obtener_matrices_entrenamiento()
+
+        def entrenar():
+            modelo = RegresorLinealMultiple()
+            if not modelo.entrenar(X, Y, verbose=False):
+                raise RuntimeError("El entrenamiento del modelo falló")
+            validador = ValidadorModelo(modelo)
+            return modelo, validador.validacion_train_test(X, Y)
+
+        if self.registro is None:
+            modelo, validacion = entrenar()
+        else:
+            modelo = self.registro.obtener_o_entrenar(dataset.db.obtener_huella_datos(), entrenar, self.db_path)
+            validacion = modelo.metadatos_artefacto.get('validacion') if hasattr(modelo, 'metadatos_artefacto') else None
+
+        validador = ValidadorModelo(modelo)
+        if validacion:
+            validador.resultados.append(validacion)
+        return modelo, dataset, df, validador
+
+    def obtener(self):
+        """Devuelve (modelo, dataset, df, validador) vigentes para la huella actual de los datos."""
+        huella = self._huella_actual()
+        if self.entrada is not None and huella == self.huella:
+            return self.entrada
+
+        with self._lock:
+            # Otra sesión pudo haber reentrenado o escrito mientras se esperaba el lock
+            huella = self._huella_actual()
+            if self.entrada is not None and huella == self.huella:
+                return self.entrada
+            if self.entrada is not None and self._refrescar():
+                self.refrescos += 1
+            else:
+                self.entrada = self._construir()
+                self.entrenamientos += 1
+                # La carga de datos de ejemplo puede cambiar la huella durante la construcción
+                self.huella = self._huella_actual()
+            return self.entrada
+
+    def _refrescar(self):
+        """Aplica los cambios pendientes del log a la entrada actual; False si hay que reentrenar.
+
+        Se llama siempre con self._lock tomado."""
+        if self._modelo_actualizable() is None:
+            return False  # Una versión fijada se sirve tal cual, sin ajustarla a los datos nuevos
+        modelo, dataset, validador = self._copia_de_trabajo()
+        try:
+            resumen = dataset.refrescar_cambios(modelo)
+        except Exception as e:
+            print(f"Error aplicando cambios incrementales: {e}")
+            return False
+        if not resumen['modelo_actualizado'] or dataset.df is None or len(dataset.df) == 0:
+            return False
+        self.entrada = (modelo, dataset, dataset.df, validador)
+        self.huella = self._huella_actual()
+        return True
+
+    def _copia_de_trabajo(self):
+        """Copias de modelo, dataset y validador de la entrada publicada, para aplicarles deltas.
+
+        El modelo copia sus estadísticas suficientes (EstadisticasSuficientes.copiar); el
+        dataset basta con una copia superficial porque refrescar_cambios reasigna df en
+        lugar de modificarlo."""
+        modelo, dataset, _, validador = self.entrada
+        modelo = modelo.copiar()
+        copia_validador = ValidadorModelo(modelo)
+        copia_validador.resultados = list(validador.resultados)
+        return modelo, copy.copy(dataset), copia_validador
+
+    def _modelo_actualizable(self):
+        """Modelo compartido si se le pueden aplicar deltas; None con una versión fijada."""
+        if self.registro is not None and self.registro.version_fijada() is not None:
+            return None
+        modelo = self.entrada[0]
+        return modelo if modelo.entrenado else None
+
+    def aplicar_cambio(self, operacion, *args, **kwargs):
+        """
+        Escribe en la base a través del dataset compartido y ajusta el modelo, todo bajo el lock
+
+        operacion es 'agregar_propiedad', 'actualizar_propiedad' o 'eliminar_propiedad' de
+        DatasetInmobiliario. Ninguna otra sesión puede refrescar la entrada entre la escritura
+        y la actualización del modelo, así que cada delta del log se aplica una sola vez; la
+        escritura y los deltas van sobre copias que se publican juntas al terminar.
+
+        Returns:
+            El resultado de la operación del dataset (True si la escritura se hizo)
+        """
+        if operacion not in ('agregar_propiedad', 'actualizar_propiedad', 'eliminar_propiedad'):
+            raise ValueError(f"Operación desconocida: {operacion}")
+        with self._lock:
+            if self.entrada is None:
+                self.entrada = self._construir()
+                self.entrenamientos += 1
+            modelo, dataset, validador = self._copia_de_trabajo()
+            actualizable = modelo if self._modelo_actualizable() is not None else None
+            dataset.ultimo_refresco = None
+            exito = getattr(dataset, operacion)(*args, modelo=actualizable, **kwargs)
+            resumen = dataset.ultimo_refresco
+            if resumen is not None and (actualizable is None or not resumen['modelo_actualizado']
+                                        or dataset.df is None or len(dataset.df) == 0):
+                # El modelo no refleja la escritura: el próximo obtener() lo reconstruye
+                self.entrada = None
+                self.huella = None
+            elif exito:
+                self.entrada = (modelo, dataset, dataset.df, validador)
+                self.huella = self._huella_actual()
+            return exito
+
+    def limpiar_datos(self, recargar_ejemplo=False):
+        """Vacía la base (y opcionalmente recarga los datos de ejemplo) e invalida la entrada, bajo el lock."""
+        with self._lock:
+            dataset = self.entrada[1] if self.entrada is not None else DatasetInmobiliario(self.db_path)
+            exito = dataset.limpiar_base_datos()
+            if exito and recargar_ejemplo:
+                dataset.cargar_datos_ejemplo()
+            self.entrada = None
+            self.huella = None
+            return exito
+
+    def invalidar(self):
+        with self._lock:
+            self.entrada = None
+            self.huella = None
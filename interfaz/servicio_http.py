@@ -0,0 +1,340 @@
+# interfaz/servicio_http.py
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+import numpy as np
+from modelo.servicios_modelo import validar_datos_entrada
+from utils.instrumentacion import Histograma, registro, perfilar
+
+CAMPOS_PROPIEDAD = ('m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad')
+# Límites superiores de los buckets de latencia en milisegundos (el último es +inf)
+LIMITES_LATENCIA_MS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+LIMITES_TAMANO_LOTE = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+RUTAS_CONOCIDAS = ('/valuar', '/valuar/lote', '/salud', '/metricas', '/metricas/prometheus')
+MOTIVOS_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class AgrupadorPredicciones:
+    """
+    Junta solicitudes individuales concurrentes en micro-lotes
+
+    La primera solicitud abre un lote; se agregan las que lleguen hasta completar
+    max_lote filas o hasta que pasen max_espera_ms. El lote se valúa con un solo
+    producto matriz-vector (modelo.predecir) y cada solicitud recibe su precio.
+    """
+
+    def __init__(self, modelo, max_lote=256, max_espera_ms=2.0):
+        self.modelo = modelo
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000
+        self.cola = None
+        self.tarea = None
+        self.tamanos_lote = Histograma(LIMITES_TAMANO_LOTE)
+        self.latencia_lote = Histograma(LIMITES_LATENCIA_MS)
+
+    def iniciar(self):
+        if self.tarea is None:
+            self.cola = asyncio.Queue()
+            self.tarea = asyncio.get_running_loop().create_task(self._procesar())
+
+    async def detener(self):
+        if self.tarea is not None:
+            self.tarea.cancel()
+            try:
+                await self.tarea
+            except asyncio.CancelledError:
+                pass
+            self.tarea = None
+
+    async def predecir(self, fila):
+        self.iniciar()
+        futuro = asyncio.get_running_loop().create_future()
+        self.cola.put_nowait((fila, futuro))
+        return await futuro
+
+    async def _procesar(self):
+        bucle = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self.cola.get()]
+            limite = bucle.time() + self.max_espera
+            while len(pendientes) < self.max_lote:
+                # Primero lo que ya está encolado, sin ceder el control
+                if not self.cola.empty():
+                    pendientes.append(self.cola.get_nowait())
+                    continue
+                restante = limite - bucle.time()
+                if restante <= 0:
+                    break
+                try:
+                    pendientes.append(await asyncio.wait_for(self.cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            inicio = time.perf_counter()
+            try:
+                precios = self.modelo.predecir(np.array([fila for fila, _ in pendientes], dtype=float))
+                for (_, futuro), precio in zip(pendientes, precios):
+                    if not futuro.done():
+                        futuro.set_result(float(precio))
+            except Exception as e:
+                for _, futuro in pendientes:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+            self.latencia_lote.observar((time.perf_counter() - inicio) * 1000)
+            self.tamanos_lote.observar(len(pendientes))
+
+
+def _leer_propiedad(datos):
+    """Convierte el JSON de una propiedad en una fila (lista) o devuelve la lista de errores."""
+    if not isinstance(datos, dict):
+        return None, ["Se esperaba un objeto JSON con las características de la propiedad"]
+    faltantes = [campo for campo in CAMPOS_PROPIEDAD if campo not in datos]
+    if faltantes:
+        return None, [f"Faltan campos: {', '.join(faltantes)}"]
+    try:
+        fila = [float(datos[campo]) for campo in CAMPOS_PROPIEDAD]
+    except (TypeError, ValueError):
+        return None, ["Todos los campos deben ser numéricos"]
+    errores = validar_datos_entrada(*fila)
+    return (None, errores) if errores else (fila, [])
+
+
+def _respuesta_precio(fila, precio):
+    return {'precio_estimado_usd': round(precio, 2), 'precio_m2_usd': round(precio / fila[0], 2)}
+
+
+class ServicioValuacion:
+    """
+    Endpoint HTTP/JSON de valuación sobre un modelo ya entrenado
+
+    POST /valuar        {"m2": 120, "habitaciones": 3, "antiguedad": 10, "zona_categoria": 2, "tipo_propiedad": 1}
+    POST /valuar/lote   {"propiedades": [{...}, {...}]}
+    GET  /salud
+    GET  /metricas      histogramas de latencia (ms) y de tamaño de micro-lote
+    GET  /metricas/prometheus   métricas de todo el proceso en formato de texto de Prometheus
+
+    Con ?perfil=cprofile (o tracemalloc, o ambos separados por coma) la respuesta JSON
+    agrega '_perfil' con el perfil de esa solicitud.
+    """
+
+    def __init__(self, modelo, max_lote=256, max_espera_ms=2.0, max_propiedades_lote=10000):
+        self.modelo = modelo
+        self.agrupador = AgrupadorPredicciones(modelo, max_lote, max_espera_ms)
+        self.max_propiedades_lote = max_propiedades_lote
+        self.latencias = {'/valuar': Histograma(LIMITES_LATENCIA_MS),
+                          '/valuar/lote': Histograma(LIMITES_LATENCIA_MS)}
+        self.errores = 0
+        self.servidor = None
+
+    async def manejar_solicitud(self, metodo, ruta, cuerpo=b"", perfil=None):
+        """
+        Atiende una solicitud ya parseada. Devuelve (código HTTP, respuesta): un diccionario,
+        o texto plano en /metricas/prometheus.
+        """
+        modos = set(perfil.split(',')) if perfil else set()
+        inicio = time.perf_counter()
+        with perfilar(f"http{ruta.replace('/', '_')}", cprofile='cprofile' in modos or None,
+                      memoria='tracemalloc' in modos or None) as resultado_perfil:
+            try:
+                codigo, respuesta = await self._despachar(metodo, ruta, cuerpo)
+            except Exception as e:
+                codigo, respuesta = 500, {'error': str(e)}
+        duracion = time.perf_counter() - inicio
+        if codigo != 200:
+            self.errores += 1
+        if ruta in self.latencias:
+            self.latencias[ruta].observar(duracion * 1000)
+        # Rutas fuera de la API se agrupan para no crear una serie por cada URL desconocida
+        etiqueta_ruta = ruta if ruta in RUTAS_CONOCIDAS else 'otra'
+        registro.observar('http_solicitud_segundos', duracion, ruta=etiqueta_ruta)
+        registro.incrementar('http_respuestas_total', ruta=etiqueta_ruta, codigo=codigo)
+        if resultado_perfil and isinstance(respuesta, dict):
+            respuesta['_perfil'] = resultado_perfil
+        return codigo, respuesta
+
+    async def _despachar(self, metodo, ruta, cuerpo):
+        if ruta == '/salud':
+            return 200, {'estado': 'ok', 'modelo_entrenado': bool(self.modelo.entrenado),
+                         'version_modelo': getattr(self.modelo, 'version', None)}
+        if ruta == '/metricas':
+            return 200, self.obtener_metricas()
+        if ruta == '/metricas/prometheus':
+            return 200, registro.exportar_prometheus()
+        if ruta not in ('/valuar', '/valuar/lote'):
+            return 404, {'error': f'Ruta desconocida: {ruta}'}
+        if metodo != 'POST':
+            return 405, {'error': 'Usar POST'}
+
+        try:
+            datos = json.loads(cuerpo or b"null")
+        except ValueError:
+            return 400, {'error': 'JSON inválido'}
+
+        if ruta == '/valuar':
+            fila, errores = _leer_propiedad(datos)
+            if errores:
+                return 400, {'error': '; '.join(errores)}
+            return 200, _respuesta_precio(fila, await self.agrupador.predecir(fila))
+
+        # Un lote explícito ya viene agrupado: se valúa directamente en una sola multiplicación
+        propiedades = datos.get('propiedades') if isinstance(datos, dict) else None
+        if not isinstance(propiedades, list):
+            return 400, {'error': 'Se esperaba {"propiedades": [...]}'}
+        if len(propiedades) > self.max_propiedades_lote:
+            return 413, {'error': f'Máximo {self.max_propiedades_lote} propiedades por solicitud'}
+        filas, resultados = [], []
+        for datos_propiedad in propiedades:
+            fila, errores = _leer_propiedad(datos_propiedad)
+            resultados.append({'error': '; '.join(errores)} if errores else None)
+            if fila is not None:
+                filas.append(fila)
+        precios = self.modelo.predecir(np.array(filas, dtype=float)) if filas else []
+        j = 0
+        for i, resultado in enumerate(resultados):
+            if resultado is None:
+                resultados[i] = _respuesta_precio(filas[j], float(precios[j]))
+                j += 1
+        return 200, {'resultados': resultados}
+
+    def obtener_metricas(self):
+        return {
+            'latencia_ms': {ruta: h.resumen() for ruta, h in self.latencias.items()},
+            'lote_calculo_ms': self.agrupador.latencia_lote.resumen(),
+            'tamano_lote': self.agrupador.tamanos_lote.resumen(),
+            'errores': self.errores
+        }
+
+    async def _atender_conexion(self, lector, escritor):
+        """HTTP/1.1 mínimo con keep-alive: línea de pedido, encabezados y cuerpo por Content-Length."""
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                partes = linea.decode('latin-1').split()
+                if len(partes) < 2:
+                    break
+                metodo, ruta, _, consulta = partes[0].upper(), *partes[1].partition('?')
+                perfil = parse_qs(consulta).get('perfil', [None])[0]
+                encabezados = {}
+                while True:
+                    encabezado = await lector.readline()
+                    if encabezado in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = encabezado.decode('latin-1').partition(':')
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                largo = int(encabezados.get('content-length', 0) or 0)
+                if largo > 16 * 1024 * 1024:
+                    codigo, respuesta = 413, {'error': 'Cuerpo demasiado grande'}
+                else:
+                    cuerpo = await lector.readexactly(largo) if largo else b""
+                    codigo, respuesta = await self.manejar_solicitud(metodo, ruta, cuerpo, perfil)
+
+                if isinstance(respuesta, str):
+                    contenido, tipo = respuesta.encode('utf-8'), "text/plain; version=0.0.4; charset=utf-8"
+                else:
+                    contenido, tipo = json.dumps(respuesta, ensure_ascii=False).encode('utf-8'), "application/json; charset=utf-8"
+                cerrar = encabezados.get('connection', '').lower() == 'close' or codigo == 413
+                escritor.write(
+                    f"HTTP/1.1 {codigo} {MOTIVOS_HTTP.get(codigo, '')}\r\n"
+                    f"Content-Type: {tipo}\r\n"
+                    f"Content-Length: {len(contenido)}\r\n"
+                    f"Connection: {'close' if cerrar else 'keep-alive'}\r\n\r\n".encode('latin-1') + contenido)
+                await escritor.drain()
+                if cerrar:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def iniciar(self, host="127.0.0.1", puerto=8080):
+        self.agrupador.iniciar()
+        self.servidor = await asyncio.start_server(self._atender_conexion, host, puerto)
+        return self.servidor
+
+    async def detener(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+            self.servidor = None
+        await self.agrupador.detener()
+
+    async def servir(self, host="127.0.0.1", puerto=8080):
+        servidor = await self.iniciar(host, puerto)
+        print(f"🚀 Servicio de valuación escuchando en http://{host}:{puerto}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await self.detener()
+
+
+class ClienteLocal:
+    """Cliente stub: llama al servicio en el mismo proceso, sin sockets (para pruebas locales)."""
+
+    def __init__(self, servicio):
+        self.servicio = servicio
+
+    async def valuar(self, **propiedad):
+        return await self.servicio.manejar_solicitud('POST', '/valuar', json.dumps(propiedad).encode('utf-8'))
+
+    async def valuar_lote(self, propiedades):
+        cuerpo = json.dumps({'propiedades': propiedades}).encode('utf-8')
+        return await self.servicio.manejar_solicitud('POST', '/valuar/lote', cuerpo)
+
+    async def metricas(self):
+        return await self.servicio.manejar_solicitud('GET', '/metricas')
+
+
+class ClienteHTTP:
+    """Cliente HTTP/1.1 mínimo sobre una conexión keep-alive (para pruebas de carga locales)."""
+
+    def __init__(self, host="127.0.0.1", puerto=8080):
+        self.host = host
+        self.puerto = puerto
+        self.lector = None
+        self.escritor = None
+
+    async def conectar(self):
+        self.lector, self.escritor = await asyncio.open_connection(self.host, self.puerto)
+        return self
+
+    async def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.close()
+            await self.escritor.wait_closed()
+            self.escritor = None
+
+    async def solicitar(self, metodo, ruta, datos=None):
+        if self.escritor is None:
+            await self.conectar()
+        cuerpo = json.dumps(datos).encode('utf-8') if datos is not None else b""
+        self.escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: {self.host}\r\n"
+                            f"Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n\r\n"
+                            .encode('latin-1') + cuerpo)
+        await self.escritor.drain()
+        codigo = int((await self.lector.readline()).split()[1])
+        largo = 0
+        tipo = 'application/json'
+        while True:
+            encabezado = await self.lector.readline()
+            if encabezado in (b"\r\n", b""):
+                break
+            nombre, _, valor = encabezado.decode('latin-1').partition(':')
+            nombre = nombre.strip().lower()
+            if nombre == 'content-length':
+                largo = int(valor)
+            elif nombre == 'content-type':
+                tipo = valor.strip().lower()
+        cuerpo = await self.lector.readexactly(largo)
+        # /metricas/prometheus responde text/plain: se devuelve el texto tal cual
+        if tipo.startswith('application/json'):
+            return codigo, json.loads(cuerpo)
+        return codigo, cuerpo.decode('utf-8')
+
+    async def valuar(self, **propiedad):
+        return await self.solicitar('POST', '/valuar', propiedad)
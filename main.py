@@ -31,12 +31,20 @@ ABP Álgebra Lineal - Regresión Lineal Múltiple
 🌟 PROYECTO ESTRELLA - Arquitectura POO Completa
 """
 
-from datos.dataset_inmobiliario import DatasetInmobiliario
-from modelo.regresor_lineal import RegresorLinealMultiple
-from modelo.validador_modelo import ValidadorModelo
+import argparse
+import sys
+
+# Los módulos del sistema se importan dentro de cada comando: `modelos listar`,
+# `servir` o `--help` no pagan la carga de pandas ni del stack de entrenamiento
 
 def demostrar_sistema_completo():
     """DEMOSTRACIÓN DEL SISTEMA POO COMPLETO"""
+    from datos.dataset_inmobiliario import DatasetInmobiliario
+    from modelo.regresor_lineal import RegresorLinealMultiple
+    from modelo.validador_modelo import ValidadorModelo
+    from modelo.pipeline_caracteristicas import PipelineCaracteristicas
+    from modelo.modelo_segmentado import ModeloSegmentado
+    
     print("🌟" * 60)
     print("🏠 SISTEMA DE VALUACIÓN INMOBILIARIA - VERSIÓN DEFINITIVA")
     print("🌟" * 60)
@@ -80,6 +88,27 @@ def demostrar_sistema_completo():
     print(f"   📊 R² en prueba: {resultado['r2_prueba']:.4f}")
     print(f"   💰 Error MAE en prueba: ${resultado['mae_prueba']:,.0f} USD")
     
+    resultado_cv = validador.validacion_k_fold(X, Y, k=5)
+    if 'error' not in resultado_cv:
+        print(f"   🔁 Validación cruzada 5-fold: R² = {resultado_cv['media']['r2_prueba']:.4f} "
+              f"± {resultado_cv['desvio']['r2_prueba']:.4f}")
+    
+    # Mismo modelo con zona y tipo en one-hot e interacciones m2×zona / m2×tipo
+    modelo_categorico = RegresorLinealMultiple(pipeline=PipelineCaracteristicas(grado_polinomio=1))
+    if modelo_categorico.entrenar(X, Y, verbose=False):
+        resultado_cat = ValidadorModelo(modelo_categorico).validacion_k_fold(X, Y, k=5)
+        if 'error' not in resultado_cat:
+            print(f"   🧩 Con one-hot e interacciones ({len(modelo_categorico.coeficientes) - 1} variables): "
+                  f"R² 5-fold = {resultado_cat['media']['r2_prueba']:.4f}")
+    
+    # Un regresor por (zona, tipo); los segmentos con pocas filas usan el modelo global
+    modelo_segmentado = ModeloSegmentado()
+    resultado_seg = ValidadorModelo(modelo_segmentado).validacion_train_test(X, Y)
+    if 'error' not in resultado_seg and modelo_segmentado.entrenar(X, Y, verbose=False):
+        propios = len(modelo_segmentado.modelos)
+        print(f"   🗂️ Segmentado por zona y tipo ({propios} de {len(modelo_segmentado.tamanos)} segmentos "
+              f"con modelo propio): R² en prueba = {resultado_seg['r2_prueba']:.4f}")
+    
     # 5. DEMOSTRACIÓN DE PREDICCIONES
     print("\n🔮 5. DEMOSTRACIÓN DE PREDICCIONES EN TIEMPO REAL:")
     
@@ -137,5 +166,186 @@ def demostrar_sistema_completo():
     print("   • ✅ Análisis estadísticos avanzados")
     print("\n🌟 ¡PROYECTO ESTRELLA - LISTO PARA BRILLAR! 🌟")
 
+def obtener_modelo_servicio(db_path="inmuebles_cordoba.db", directorio_registro="modelos_registrados"):
+    """Carga el modelo vigente del registro; solo entrena (por lotes) si los datos cambiaron"""
+    from datos.database_manager import DatabaseManager
+    from modelo.registro_modelos import RegistroModelos
+    
+    db = DatabaseManager(db_path)
+    
+    def entrenar():
+        from datos.dataset_inmobiliario import DatasetInmobiliario
+        from modelo.regresor_lineal import RegresorLinealMultiple
+        
+        modelo = RegresorLinealMultiple()
+        if not DatasetInmobiliario(db_path).entrenar_streaming(modelo):
+            return None, None
+        return modelo, None
+    
+    return RegistroModelos(directorio_registro).obtener_o_entrenar(db.obtener_huella_datos(), entrenar, db_path)
+
+def valuar_cartera(ruta_entrada, ruta_salida, tamano_bloque=100000, db_path="inmuebles_cordoba.db",
+                   directorio_registro="modelos_registrados", nivel_intervalo=None):
+    """VALUACIÓN MASIVA DE UNA CARTERA (CSV/Parquet)"""
+    from modelo.valuacion_lote import valuar_archivo
+    
+    print("🏠 VALUACIÓN MASIVA DE CARTERA")
+    modelo = obtener_modelo_servicio(db_path, directorio_registro)
+    if modelo is None or not modelo.entrenado:
+        print("   ❌ Error en el entrenamiento del modelo")
+        return 1
+    
+    resumen = valuar_archivo(modelo, ruta_entrada, ruta_salida, tamano_bloque=tamano_bloque,
+                             nivel_intervalo=nivel_intervalo)
+    if 'error' in resumen:
+        print(f"   ❌ {resumen['error']}")
+        return 1
+    print(f"   ✅ Procesadas: {resumen['procesadas']:,} | Valuadas: {resumen['valuadas']:,} | "
+          f"Rechazadas: {resumen['rechazadas']:,}")
+    print(f"   💾 Resultados en: {ruta_salida}")
+    return 0
+
+def administrar_modelos(accion, version=None, directorio_registro="modelos_registrados"):
+    """ADMINISTRACIÓN DEL REGISTRO DE MODELOS (listar / fijar / desfijar / rollback)"""
+    from modelo.registro_modelos import RegistroModelos
+    
+    registro = RegistroModelos(directorio_registro)
+    try:
+        if accion == "fijar":
+            print(f"   📌 Versión fijada: v{registro.fijar(version):04d}")
+        elif accion == "desfijar":
+            registro.desfijar()
+            print("   ✅ Se sirve la última versión registrada")
+        elif accion == "rollback":
+            print(f"   ⏪ Versión fijada: v{registro.rollback():04d}")
+    except ValueError as e:
+        print(f"   ❌ {e}")
+        return 1
+    
+    versiones = registro.listar_versiones()
+    if not versiones:
+        print("   ℹ️ No hay modelos registrados")
+    for v in versiones:
+        marca = "📌" if v['fijada'] else ("✅" if v['vigente'] else "  ")
+        print(f"   {marca} v{v['version']:04d}  {v['fecha']}  R²={v['r2']:.4f}  solver={v['solver']}")
+    return 0
+
+def servir_valuaciones(host="127.0.0.1", puerto=8080, max_lote=256, max_espera_ms=2.0,
+                       db_path="inmuebles_cordoba.db", directorio_registro="modelos_registrados"):
+    """SERVICIO HTTP/JSON DE VALUACIÓN CON MICRO-LOTES"""
+    import asyncio
+    from interfaz.servicio_http import ServicioValuacion
+    
+    modelo = obtener_modelo_servicio(db_path, directorio_registro)
+    if modelo is None or not modelo.entrenado:
+        print("   ❌ Error en el entrenamiento del modelo")
+        return 1
+    
+    servicio = ServicioValuacion(modelo, max_lote=max_lote, max_espera_ms=max_espera_ms)
+    try:
+        asyncio.run(servicio.servir(host, puerto))
+    except KeyboardInterrupt:
+        print("\n   👋 Servicio detenido")
+    return 0
+
+def bootstrap_modelo(replicas=1000, n_procesos=None, semilla=42, nivel=0.95, ruta_salida=None,
+                     db_path="inmuebles_cordoba.db"):
+    """BOOTSTRAP DE COEFICIENTES Y MÉTRICAS (pensado para correr como tarea nocturna)"""
+    import json
+    import time
+    from datos.dataset_inmobiliario import DatasetInmobiliario
+    from modelo.regresor_lineal import RegresorLinealMultiple
+    from modelo.validador_modelo import ValidadorModelo
+    
+    print(f"🎲 BOOTSTRAP DEL MODELO ({replicas} réplicas)")
+    X, Y = DatasetInmobiliario(db_path).obtener_matrices_entrenamiento()
+    modelo = RegresorLinealMultiple()
+    if not modelo.entrenar(X, Y, verbose=False):
+        print("   ❌ Error en el entrenamiento del modelo")
+        return 1
+    
+    inicio = time.perf_counter()
+    resultado = ValidadorModelo(modelo).validacion_bootstrap(X, Y, replicas=replicas, nivel=nivel,
+                                                             semilla=semilla, n_procesos=n_procesos)
+    if 'error' in resultado:
+        print(f"   ❌ {resultado['error']}")
+        return 1
+    duracion = time.perf_counter() - inicio
+    
+    print(f"   ✅ {replicas} réplicas sobre {len(Y):,} filas en {duracion:.1f} s")
+    for nombre, resumen in resultado['coeficientes'].items():
+        print(f"   {nombre}: {resumen['media']:,.4f} ± {resumen['desvio']:,.4f} "
+              f"[{resumen['inferior']:,.4f}, {resumen['superior']:,.4f}]")
+    for nombre in ('r2_fuera_bolsa', 'mae_fuera_bolsa'):
+        resumen = resultado['metricas'][nombre]
+        print(f"   📊 {nombre}: {resumen['media']:,.4f} [{resumen['inferior']:,.4f}, {resumen['superior']:,.4f}]")
+    
+    if ruta_salida:
+        salida = {clave: valor for clave, valor in resultado.items() if not clave.startswith('distribucion_')}
+        salida['filas'] = len(Y)
+        salida['duracion_s'] = round(duracion, 2)
+        salida['distribucion_coeficientes'] = resultado['distribucion_coeficientes'].tolist()
+        salida['distribucion_metricas'] = {clave: valores.tolist()
+                                           for clave, valores in resultado['distribucion_metricas'].items()}
+        with open(ruta_salida, 'w', encoding='utf-8') as archivo:
+            json.dump(salida, archivo, ensure_ascii=False, indent=2)
+        print(f"   💾 Resultados en: {ruta_salida}")
+    return 0
+
+def parsear_argumentos(argv=None):
+    parser = argparse.ArgumentParser(description="Sistema de Valuación Inmobiliaria")
+    subcomandos = parser.add_subparsers(dest="comando")
+    
+    parser_valuar = subcomandos.add_parser("valuar", help="Valúa una cartera completa desde CSV o Parquet")
+    parser_valuar.add_argument("entrada", help="Archivo .csv o .parquet con m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad")
+    parser_valuar.add_argument("salida", help="Archivo .csv o .parquet de salida")
+    parser_valuar.add_argument("--tamano-bloque", type=int, default=100000, help="Filas por bloque (default: 100000)")
+    parser_valuar.add_argument("--db", default="inmuebles_cordoba.db", help="Base de datos de entrenamiento")
+    parser_valuar.add_argument("--registro", default="modelos_registrados", help="Directorio del registro de modelos")
+    parser_valuar.add_argument("--intervalo", type=float, default=None, metavar="NIVEL",
+                               help="Agrega precio mínimo y máximo al nivel indicado (p. ej. 0.95)")
+    
+    parser_modelos = subcomandos.add_parser("modelos", help="Administra el registro de modelos entrenados")
+    parser_modelos.add_argument("accion", choices=["listar", "fijar", "desfijar", "rollback"])
+    parser_modelos.add_argument("version", type=int, nargs="?", help="Versión a fijar")
+    parser_modelos.add_argument("--registro", default="modelos_registrados", help="Directorio del registro de modelos")
+    
+    parser_servir = subcomandos.add_parser("servir", help="Levanta el servicio HTTP/JSON de valuación")
+    parser_servir.add_argument("--host", default="127.0.0.1")
+    parser_servir.add_argument("--puerto", type=int, default=8080)
+    parser_servir.add_argument("--max-lote", type=int, default=256, help="Máximo de solicitudes por micro-lote")
+    parser_servir.add_argument("--max-espera-ms", type=float, default=2.0, help="Espera máxima para completar un micro-lote")
+    parser_servir.add_argument("--db", default="inmuebles_cordoba.db", help="Base de datos de entrenamiento")
+    parser_servir.add_argument("--registro", default="modelos_registrados", help="Directorio del registro de modelos")
+    
+    parser_bootstrap = subcomandos.add_parser("bootstrap", help="Distribución bootstrap de coeficientes y métricas")
+    parser_bootstrap.add_argument("--replicas", type=int, default=1000, help="Cantidad de remuestreos (default: 1000)")
+    parser_bootstrap.add_argument("--procesos", type=int, default=None, help="Procesos en paralelo (default: 1)")
+    parser_bootstrap.add_argument("--semilla", type=int, default=42)
+    parser_bootstrap.add_argument("--nivel", type=float, default=0.95, help="Nivel de los intervalos percentil")
+    parser_bootstrap.add_argument("--salida", default=None, help="Archivo .json donde guardar el resultado")
+    parser_bootstrap.add_argument("--db", default="inmuebles_cordoba.db", help="Base de datos de entrenamiento")
+    
+    return parser.parse_args(argv)
+
+def _ejecutar(args):
+    if args.comando == "valuar":
+        return valuar_cartera(args.entrada, args.salida, args.tamano_bloque, args.db, args.registro, args.intervalo)
+    if args.comando == "modelos":
+        if args.accion == "fijar" and args.version is None:
+            print("   ❌ Indicar la versión a fijar")
+            return 1
+        return administrar_modelos(args.accion, args.version, args.registro)
+    if args.comando == "servir":
+        return servir_valuaciones(args.host, args.puerto, args.max_lote, args.max_espera_ms, args.db, args.registro)
+    if args.comando == "bootstrap":
+        return bootstrap_modelo(args.replicas, args.procesos, args.semilla, args.nivel, args.salida, args.db)
+    demostrar_sistema_completo()
+    return 0
+
 if __name__ == "__main__":
-    demostrar_sistema_completo()
\ No newline at end of file
+    from utils.instrumentacion import volcar_metricas
+    codigo = _ejecutar(parsear_argumentos())
+    # Con VALUACION_METRICAS_ARCHIVO definido, los tiempos de la corrida quedan en formato Prometheus
+    volcar_metricas()
+    sys.exit(codigo)
@@ -0,0 +1,183 @@
+# modelo/bootstrap.py
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .estadisticas_suficientes import EstadisticasSuficientes
+from .resolutores import resolver_ecuaciones_normales
+from .regularizacion import resolver_regularizado
+
+# Tope de elementos de la matriz de pesos (réplicas × filas) que se arma de una vez
+MAX_ELEMENTOS_PESOS = 5 * 10 ** 6
+# Hasta este tamaño (filas × columnas) Z se calcula una vez y se conserva; si no, por bloques de filas
+MAX_ELEMENTOS_PRODUCTOS = 3 * 10 ** 7
+
+METRICAS_BOOTSTRAP = ('r2', 'rmse', 'mae', 'r2_fuera_bolsa', 'rmse_fuera_bolsa', 'mae_fuera_bolsa')
+
+# Datos de cada proceso del pool: se envían una sola vez con el inicializador
+_DATOS_TRABAJADOR = {}
+
+
+def productos_por_fila(diseno, Y):
+    """
+    Z (filas, q) = [triángulo superior de xᵢxᵢᵀ | xᵢ·yᵢ | yᵢ | yᵢ²]
+
+    Para un vector de pesos w, w @ Z da de una vez XᵀWX, XᵀWY, ΣwY y ΣwY²;
+    para un bloque de réplicas, pesos @ Z es un único producto matricial.
+    """
+    fila, columna = np.triu_indices(diseno.shape[1])
+    return np.column_stack([diseno[:, fila] * diseno[:, columna], diseno * Y[:, None], Y, Y * Y])
+
+
+def _estadisticas_desde_sumas(sumas, p, n):
+    """Reconstruye EstadisticasSuficientes a partir de una fila de pesos @ Z."""
+    fila, columna = np.triu_indices(p)
+    t = len(fila)
+    stats = EstadisticasSuficientes(p)
+    stats.XTX[fila, columna] = sumas[:t]
+    stats.XTX[columna, fila] = sumas[:t]
+    stats.XTY = sumas[t:t + p].copy()
+    stats.suma_y = float(sumas[t + p])
+    stats.suma_y2 = float(sumas[t + p + 1])
+    stats.n = n
+    return stats
+
+
+def _resolver(stats, configuracion):
+    if configuracion.get('penalizacion') is not None and configuracion.get('lambda_reg', 0) > 0:
+        return resolver_regularizado(stats, configuracion['penalizacion'],
+                                     configuracion['lambda_reg'], configuracion.get('l1_ratio', 0.5))
+    return resolver_ecuaciones_normales(stats.XTX, stats.XTY, configuracion.get('solver', 'auto'))[0]
+
+
+def _columnas_productos(p):
+    return p * (p + 1) // 2 + p + 2
+
+
+def _preparar_productos(diseno, Y):
+    """Z completa si entra en MAX_ELEMENTOS_PRODUCTOS; None para calcularla por bloques."""
+    if len(diseno) * _columnas_productos(diseno.shape[1]) <= MAX_ELEMENTOS_PRODUCTOS:
+        return productos_por_fila(diseno, Y)
+    return None
+
+
+def _sumas_ponderadas(diseno, Y, pesos, Z=None):
+    """pesos @ Z, con Z precalculada o recorriendo las filas por bloques para no materializarla."""
+    if Z is not None:
+        return pesos @ Z
+    filas_bloque = max(1, MAX_ELEMENTOS_PRODUCTOS // (10 * _columnas_productos(diseno.shape[1])))
+    sumas = 0
+    for desde in range(0, len(diseno), filas_bloque):
+        hasta = min(desde + filas_bloque, len(diseno))
+        sumas = sumas + pesos[:, desde:hasta] @ productos_por_fila(diseno[desde:hasta], Y[desde:hasta])
+    return sumas
+
+
+def _ejecutar_replicas(diseno, Y, semillas, configuracion, Z=None):
+    """
+    Coeficientes y métricas de las réplicas indicadas (una SeedSequence por réplica)
+
+    Cada réplica es un vector de conteos multinomiales w (cuántas veces sale cada fila
+    al remuestrear n con reposición): las estadísticas de la réplica son w @ Z y las
+    de las filas fuera de la bolsa (w = 0), indicadora @ Z; nunca se arma la matriz
+    remuestreada.
+    """
+    n, p = diseno.shape
+    replicas_bloque = max(1, MAX_ELEMENTOS_PESOS // n)
+    coeficientes = np.zeros((len(semillas), p))
+    metricas = {nombre: np.zeros(len(semillas)) for nombre in METRICAS_BOOTSTRAP}
+
+    for inicio in range(0, len(semillas), replicas_bloque):
+        bloque = semillas[inicio:inicio + replicas_bloque]
+        m = len(bloque)
+        pesos = np.empty((m, n))
+        for j, semilla in enumerate(bloque):
+            pesos[j] = np.bincount(np.random.default_rng(semilla).integers(0, n, n), minlength=n)
+        fuera = (pesos == 0).astype(float)
+        sumas = _sumas_ponderadas(diseno, Y, pesos, Z)
+        sumas_fuera = _sumas_ponderadas(diseno, Y, fuera, Z)
+
+        tamano_fuera = fuera.sum(axis=1)
+        for j in range(m):
+            stats = _estadisticas_desde_sumas(sumas[j], p, n)
+            beta = _resolver(stats, configuracion)
+            coeficientes[inicio + j] = beta
+            dentro = stats.metricas(beta)
+            metricas['r2'][inicio + j] = dentro['r2']
+            metricas['rmse'][inicio + j] = dentro['rmse']
+            if tamano_fuera[j] > 0:
+                stats_fuera = _estadisticas_desde_sumas(sumas_fuera[j], p, int(tamano_fuera[j]))
+                afuera = stats_fuera.metricas(beta)
+                metricas['r2_fuera_bolsa'][inicio + j] = afuera['r2']
+                metricas['rmse_fuera_bolsa'][inicio + j] = afuera['rmse']
+
+        # El MAE no sale de sumas: residuos de todas las filas para el bloque de réplicas
+        errores = np.abs(Y[None, :] - coeficientes[inicio:inicio + m] @ diseno.T)
+        metricas['mae'][inicio:inicio + m] = np.einsum('ij,ij->i', pesos, errores) / n
+        metricas['mae_fuera_bolsa'][inicio:inicio + m] = (np.einsum('ij,ij->i', fuera, errores)
+                                                         / np.maximum(tamano_fuera, 1))
+    return coeficientes, metricas
+
+
+def _inicializar_trabajador(diseno, Y, configuracion):
+    _DATOS_TRABAJADOR['diseno'] = diseno
+    _DATOS_TRABAJADOR['Y'] = Y
+    _DATOS_TRABAJADOR['configuracion'] = configuracion
+    _DATOS_TRABAJADOR['Z'] = _preparar_productos(diseno, Y)
+
+
+def _replicas_trabajador(semillas):
+    return _ejecutar_replicas(_DATOS_TRABAJADOR['diseno'], _DATOS_TRABAJADOR['Y'], semillas,
+                              _DATOS_TRABAJADOR['configuracion'], _DATOS_TRABAJADOR['Z'])
+
+
+def resumir_distribucion(valores, nivel=0.95):
+    """Media, desvío (error estándar bootstrap) e intervalo percentil al nivel dado."""
+    valores = np.asarray(valores, dtype=float)
+    alfa = (1 - nivel) / 2
+    inferior, superior = np.quantile(valores, [alfa, 1 - alfa])
+    return {
+        'media': float(valores.mean()),
+        'desvio': float(valores.std(ddof=1)) if len(valores) > 1 else 0.0,
+        'inferior': float(inferior),
+        'superior': float(superior)
+    }
+
+
+def bootstrap_estadisticas(diseno, Y, replicas=1000, semilla=42, n_procesos=None, solver="auto",
+                           penalizacion=None, lambda_reg=0.0, l1_ratio=0.5):
+    """
+    Bootstrap de filas sobre estadísticas suficientes ponderadas
+
+    Cada réplica recibe su propia SeedSequence (SeedSequence(semilla).spawn(replicas)),
+    así que el resultado es el mismo con cualquier n_procesos y reparto de réplicas.
+    Con n_procesos > 1 los bloques de réplicas se reparten en un pool de procesos; el
+    diseño y Y viajan una sola vez a cada proceso.
+
+    Args:
+        diseno: Matriz de diseño densa con intercepto (n, p)
+
+    Returns:
+        (coeficientes (replicas, p), {métrica: arreglo (replicas,)})
+    """
+    diseno = np.ascontiguousarray(diseno, dtype=float)
+    Y = np.ascontiguousarray(Y, dtype=float).ravel()
+    if len(diseno) != len(Y):
+        raise ValueError("X e Y deben tener la misma cantidad de filas")
+    if replicas < 2:
+        raise ValueError("Se necesitan al menos 2 réplicas")
+
+    configuracion = {'solver': solver, 'penalizacion': penalizacion, 'lambda_reg': lambda_reg,
+                     'l1_ratio': l1_ratio}
+    semillas = np.random.SeedSequence(semilla).spawn(replicas)
+
+    if not (n_procesos and n_procesos > 1):
+        return _ejecutar_replicas(diseno, Y, semillas, configuracion, _preparar_productos(diseno, Y))
+
+    # Varias tareas por proceso para repartir bien la carga
+    tareas = [list(tarea) for tarea in np.array_split(np.array(semillas, dtype=object), 4 * n_procesos)
+              if len(tarea)]
+    with ProcessPoolExecutor(max_workers=n_procesos, initializer=_inicializar_trabajador,
+                             initargs=(diseno, Y, configuracion)) as pool:
+        salidas = list(pool.map(_replicas_trabajador, tareas))
+    coeficientes = np.vstack([coef for coef, _ in salidas])
+    metricas = {nombre: np.concatenate([m[nombre] for _, m in salidas]) for nombre in METRICAS_BOOTSTRAP}
+    return coeficientes, metricas
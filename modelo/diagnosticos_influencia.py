@@ -0,0 +1,89 @@
+# modelo/diagnosticos_influencia.py
+import numpy as np
+from .inferencia import factor_inverso
+
+
+def calcular_diagnosticos_influencia(X, Y, modelo=None, tamano_bloque=100000):
+    """
+    Diagnósticos de leave-one-out e influencia en una sola pasada, sin reajustes
+
+    Usa la diagonal de la matriz sombrero H = X(XᵀX)⁻¹Xᵀ, calculada por bloques
+    como hᵢ = ||L⁻¹xᵢ||² (L = Cholesky de XᵀX), en O(n·p²):
+        residuo LOO      eᵢ / (1 - hᵢ)
+        PRESS            Σ (eᵢ / (1 - hᵢ))²
+        Cook             eᵢ²·hᵢ / (p·s²·(1 - hᵢ)²)
+
+    Args:
+        X, Y: Matrices de entrenamiento (sin columna de intercepto)
+        modelo: RegresorLinealMultiple entrenado con esas filas (reutiliza XᵀX, β y su
+                pipeline de características; el diseño se expande bloque a bloque)
+
+    Returns:
+        Diccionario con arreglos por fila (apalancamiento, residuos, residuos_loo,
+        distancia_cook, residuos_estandarizados) y resúmenes (press, r2_prediccion, ...)
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float).ravel()
+    n = len(Y)
+    if getattr(modelo, 'pipeline', None) is not None:
+        X_con_intercepto = modelo.pipeline.transformar(X)
+        disenar = lambda inicio, fin: modelo.pipeline.transformar(X[inicio:fin]).a_densa()
+    else:
+        X_con_intercepto = np.column_stack([np.ones(n), X])
+        disenar = lambda inicio, fin: X_con_intercepto[inicio:fin]
+    p = X_con_intercepto.shape[1]
+
+    stats = getattr(modelo, 'estadisticas', None)
+    if stats is not None and stats.p == p and stats.n == n:
+        XTX = stats.XTX
+        beta = modelo.coeficientes
+    elif isinstance(X_con_intercepto, np.ndarray):
+        XTX = X_con_intercepto.T @ X_con_intercepto
+        beta = np.linalg.lstsq(X_con_intercepto, Y, rcond=None)[0]
+    else:
+        XTX = X_con_intercepto.gram()
+        beta = np.linalg.lstsq(XTX, X_con_intercepto.transpuesta_por(Y), rcond=None)[0]
+
+    factor, _ = factor_inverso(XTX)
+    apalancamiento = np.empty(n)
+    for inicio in range(0, n, tamano_bloque):
+        bloque = disenar(inicio, inicio + tamano_bloque)
+        apalancamiento[inicio:inicio + len(bloque)] = np.sum((bloque @ factor.T) ** 2, axis=1)
+    apalancamiento = np.clip(apalancamiento, 0.0, 1.0)
+
+    residuos = Y - X_con_intercepto @ beta
+    rango = int(round(apalancamiento.sum()))  # traza(H) = rango de X
+    gl = max(n - rango, 1)
+    s2 = float(residuos @ residuos) / gl
+
+    # Puntos con hᵢ ≈ 1 determinan su propio ajuste: su residuo LOO no está definido
+    uno_menos_h = 1 - apalancamiento
+    definido = uno_menos_h > 1e-10
+    residuos_loo = np.full(n, np.nan)
+    residuos_loo[definido] = residuos[definido] / uno_menos_h[definido]
+    distancia_cook = np.full(n, np.nan)
+    distancia_cook[definido] = (residuos[definido] ** 2 * apalancamiento[definido]
+                                / (rango * s2 * uno_menos_h[definido] ** 2)) if s2 > 0 else 0.0
+    residuos_estandarizados = np.full(n, np.nan)
+    residuos_estandarizados[definido] = residuos[definido] / np.sqrt(s2 * uno_menos_h[definido]) if s2 > 0 else 0.0
+
+    press = float(np.nansum(residuos_loo ** 2))
+    ss_tot = float(np.sum((Y - Y.mean()) ** 2))
+    umbral_cook = 4 / n
+    umbral_apalancamiento = 2 * rango / n
+    orden = np.argsort(-np.nan_to_num(distancia_cook, nan=np.inf))
+
+    return {
+        'apalancamiento': apalancamiento,
+        'residuos': residuos,
+        'residuos_loo': residuos_loo,
+        'distancia_cook': distancia_cook,
+        'residuos_estandarizados': residuos_estandarizados,
+        'press': press,
+        'r2_prediccion': max(0.0, 1 - press / ss_tot) if ss_tot > 0 else 0.0,
+        'mae_loo': float(np.nanmean(np.abs(residuos_loo))),
+        'rmse_loo': float(np.sqrt(press / max(int(definido.sum()), 1))),
+        'umbral_cook': umbral_cook,
+        'umbral_apalancamiento': umbral_apalancamiento,
+        'indices_influyentes': orden[np.nan_to_num(distancia_cook[orden], nan=np.inf) > umbral_cook]
+    }
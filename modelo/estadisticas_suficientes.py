@@ -0,0 +1,108 @@
+# modelo/estadisticas_suficientes.py
+import numpy as np
+from .pipeline_caracteristicas import MatrizDisenoCompacta
+
+
+class EstadisticasSuficientes:
+    """Acumula XᵀX, XᵀY, ΣY, ΣY² y n de una matriz de diseño (con intercepto).
+
+    Con estas sumas alcanza para resolver las ecuaciones normales y calcular
+    R², MSE y RMSE sin volver a recorrer las filas ya procesadas.
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self.XTX = np.zeros((p, p))
+        self.XTY = np.zeros(p)
+        self.suma_y = 0.0
+        self.suma_y2 = 0.0
+        self.n = 0
+
+    @classmethod
+    def desde_datos(cls, X_con_intercepto, Y):
+        stats = cls(X_con_intercepto.shape[1])
+        stats.agregar(X_con_intercepto, Y)
+        return stats
+
+    def agregar(self, X_con_intercepto, Y, signo=1):
+        """Actualización de rango k: suma (o resta, con signo=-1) las filas dadas.
+
+        X_con_intercepto puede ser un arreglo o una MatrizDisenoCompacta (one-hot sin expandir).
+        """
+        Y = np.asarray(Y, dtype=float).ravel()
+        if not isinstance(X_con_intercepto, MatrizDisenoCompacta):
+            X_con_intercepto = np.asarray(X_con_intercepto, dtype=float)
+            if X_con_intercepto.ndim == 1:
+                X_con_intercepto = X_con_intercepto.reshape(1, -1)
+        if X_con_intercepto.shape[1] != self.p:
+            raise ValueError(f"Se esperaban {self.p} columnas y llegaron {X_con_intercepto.shape[1]}")
+        if len(X_con_intercepto) != len(Y):
+            raise ValueError("X e Y deben tener la misma cantidad de filas")
+
+        if isinstance(X_con_intercepto, MatrizDisenoCompacta):
+            self.XTX += signo * X_con_intercepto.gram()
+            self.XTY += signo * X_con_intercepto.transpuesta_por(Y)
+        else:
+            XT = X_con_intercepto.T
+            self.XTX += signo * (XT @ X_con_intercepto)
+            self.XTY += signo * (XT @ Y)
+        self.suma_y += signo * float(Y.sum())
+        self.suma_y2 += signo * float(Y @ Y)
+        self.n += signo * len(Y)
+        return self
+
+    def retirar(self, X_con_intercepto, Y):
+        return self.agregar(X_con_intercepto, Y, signo=-1)
+
+    def copiar(self):
+        copia = EstadisticasSuficientes(self.p)
+        copia.XTX = self.XTX.copy()
+        copia.XTY = self.XTY.copy()
+        copia.suma_y = self.suma_y
+        copia.suma_y2 = self.suma_y2
+        copia.n = self.n
+        return copia
+
+    def __add__(self, otra):
+        suma = self.copiar()
+        suma.XTX += otra.XTX
+        suma.XTY += otra.XTY
+        suma.suma_y += otra.suma_y
+        suma.suma_y2 += otra.suma_y2
+        suma.n += otra.n
+        return suma
+
+    def __sub__(self, otra):
+        resta = self.copiar()
+        resta.XTX -= otra.XTX
+        resta.XTY -= otra.XTY
+        resta.suma_y -= otra.suma_y
+        resta.suma_y2 -= otra.suma_y2
+        resta.n -= otra.n
+        return resta
+
+    def suma_cuadrados_residuos(self, coeficientes):
+        # ||Y - Xβ||² = ΣY² - 2βᵀXᵀY + βᵀXᵀXβ
+        beta = np.asarray(coeficientes, dtype=float)
+        ss_res = self.suma_y2 - 2 * beta @ self.XTY + beta @ self.XTX @ beta
+        return max(float(ss_res), 0.0)
+
+    def suma_cuadrados_total(self):
+        if self.n <= 0:
+            return 0.0
+        return max(self.suma_y2 - self.suma_y ** 2 / self.n, 0.0)
+
+    def metricas(self, coeficientes):
+        """R², MSE y RMSE de los coeficientes dados sobre las filas acumuladas."""
+        if self.n <= 0:
+            return {'r2': 0.0, 'mse': 0.0, 'rmse': 0.0}
+
+        ss_res = self.suma_cuadrados_residuos(coeficientes)
+        ss_tot = self.suma_cuadrados_total()
+        mse = ss_res / self.n
+        r2 = 1 - (ss_res / ss_tot) if ss_tot > 0 else 0
+        return {
+            'r2': max(0, min(r2, 1)),
+            'mse': mse,
+            'rmse': np.sqrt(mse)
+        }
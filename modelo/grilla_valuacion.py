@@ -0,0 +1,124 @@
+# modelo/grilla_valuacion.py
+# Sólo depende de numpy: un proceso que sirve la calculadora puede cargar la grilla
+# sin importar pandas, el regresor ni el resto del stack de entrenamiento.
+import hashlib
+import json
+import numpy as np
+
+FORMATO_GRILLA = 1
+# Rangos de la calculadora: (nombre, mínimo, máximo), todos con paso 1
+RANGOS_GRILLA = (
+    ('m2', 50, 500),
+    ('habitaciones', 1, 5),
+    ('antiguedad', 0, 50),
+    ('zona_categoria', 1, 5),
+    ('tipo_propiedad', 1, 2),
+)
+
+
+def firma_modelo(modelo):
+    """Identifica los coeficientes (y el pipeline) de un modelo; cambia con cada reentrenamiento."""
+    pipeline = getattr(modelo, 'pipeline', None)
+    contenido = np.asarray(modelo.coeficientes, dtype=float).tobytes()
+    if pipeline is not None:
+        contenido += json.dumps(pipeline.configuracion(), sort_keys=True).encode('utf-8')
+    return hashlib.sha1(contenido).hexdigest()
+
+
+class GrillaValuacion:
+    """
+    Tabla precalculada de valuaciones para todas las combinaciones de la calculadora
+
+    tabla[m2 - 50, habitaciones - 1, antiguedad, zona - 1, tipo - 1] en float32:
+    451 × 5 × 51 × 5 × 2 ≈ 1,15 millones de precios (≈ 4,6 MB). Cada consulta es un
+    acceso por índice; un m2 no entero se interpola linealmente entre los dos m2 vecinos.
+    """
+
+    def __init__(self, tabla, firma=None, version_modelo=None):
+        self.tabla = tabla
+        self.firma = firma
+        self.version_modelo = version_modelo
+        self.minimos = np.array([minimo for _, minimo, _ in RANGOS_GRILLA])
+        self.maximos = np.array([maximo for _, _, maximo in RANGOS_GRILLA])
+
+    @classmethod
+    def construir(cls, modelo):
+        """Evalúa el modelo sobre toda la grilla, un bloque (zona, tipo) por vez."""
+        if not modelo.entrenado:
+            raise ValueError("Solo se puede construir la grilla de un modelo entrenado")
+
+        ejes = [np.arange(minimo, maximo + 1, dtype=float) for _, minimo, maximo in RANGOS_GRILLA]
+        m2, habitaciones, antiguedad = np.meshgrid(*ejes[:3], indexing='ij')
+        forma_bloque = m2.shape
+        tabla = np.empty(tuple(len(eje) for eje in ejes), dtype=np.float32)
+        for i, zona in enumerate(ejes[3]):
+            for j, tipo in enumerate(ejes[4]):
+                X = np.column_stack([m2.ravel(), habitaciones.ravel(), antiguedad.ravel(),
+                                     np.full(m2.size, zona), np.full(m2.size, tipo)])
+                tabla[:, :, :, i, j] = modelo.predecir(X).reshape(forma_bloque)
+        return cls(tabla, firma_modelo(modelo), getattr(modelo, 'version', None))
+
+    def vigente_para(self, modelo):
+        return self.firma == firma_modelo(modelo)
+
+    def consultar(self, m2, habitaciones, antiguedad, zona, tipo_propiedad):
+        """Precio estimado o None si la consulta cae fuera de la grilla (el llamador predice con el modelo)."""
+        # Camino escalar en Python puro: evita crear arreglos para una sola consulta
+        valores = (m2, habitaciones, antiguedad, zona, tipo_propiedad)
+        for k, (valor, (_, minimo, maximo)) in enumerate(zip(valores, RANGOS_GRILLA)):
+            if not minimo <= valor <= maximo or (k > 0 and valor != int(valor)):
+                return None
+        resto = tuple(int(valor) - minimo for valor, (_, minimo, _) in zip(valores[1:], RANGOS_GRILLA[1:]))
+        desplazamiento = m2 - RANGOS_GRILLA[0][1]
+        inferior = min(int(desplazamiento), self.tabla.shape[0] - 1)
+        precio = float(self.tabla[(inferior,) + resto])
+        fraccion = desplazamiento - inferior
+        if fraccion > 0:
+            precio += fraccion * (float(self.tabla[(inferior + 1,) + resto]) - precio)
+        return precio
+
+    def consultar_lote(self, X):
+        """
+        Args:
+            X: Matriz (n, 5) con m2, habitaciones, antiguedad, zona_categoria, tipo_propiedad
+
+        Returns:
+            Arreglo float64 con NaN en las filas fuera de la grilla
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        resultado = np.full(len(X), np.nan)
+
+        discretas = X[:, 1:]
+        dentro = ((X >= self.minimos) & (X <= self.maximos)).all(axis=1)
+        dentro &= (discretas == np.round(discretas)).all(axis=1)
+        if not dentro.any():
+            return resultado
+
+        Xd = X[dentro]
+        desplazamiento = Xd[:, 0] - self.minimos[0]
+        inferior = np.minimum(np.floor(desplazamiento).astype(np.intp), self.tabla.shape[0] - 1)
+        superior = np.minimum(inferior + 1, self.tabla.shape[0] - 1)
+        fraccion = desplazamiento - inferior
+        resto = tuple((Xd[:, k] - self.minimos[k]).astype(np.intp) for k in range(1, 5))
+
+        precio_inferior = self.tabla[(inferior,) + resto].astype(float)
+        precio_superior = self.tabla[(superior,) + resto].astype(float)
+        resultado[dentro] = precio_inferior + fraccion * (precio_superior - precio_inferior)
+        return resultado
+
+    def guardar(self, ruta):
+        metadatos = {'formato': FORMATO_GRILLA, 'firma': self.firma, 'version_modelo': self.version_modelo,
+                     'rangos': [list(r) for r in RANGOS_GRILLA]}
+        np.savez(ruta, tabla=self.tabla, metadatos=np.array(json.dumps(metadatos)))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with np.load(ruta, allow_pickle=False) as datos:
+            metadatos = json.loads(str(datos['metadatos']))
+            if metadatos.get('formato') != FORMATO_GRILLA:
+                raise ValueError(f"Formato de grilla no soportado: {metadatos.get('formato')}")
+            if [tuple(r) for r in metadatos['rangos']] != list(RANGOS_GRILLA):
+                raise ValueError("La grilla guardada usa rangos distintos a los actuales")
+            return cls(datos['tabla'], metadatos['firma'], metadatos['version_modelo'])
@@ -0,0 +1,102 @@
+# modelo/inferencia.py
+import math
+from statistics import NormalDist
+import numpy as np
+
+
+def cuantil_t(probabilidad, gl):
+    """
+    Cuantil de la t de Student con gl grados de libertad
+
+    Usa scipy si está instalado; si no, fórmulas exactas para gl = 1, 2 y la
+    expansión de Cornish-Fisher sobre el cuantil normal (error relativo menor al 1 %
+    desde gl = 3 y al 0,1 % desde gl = 5; despreciable con los cientos de grados de
+    libertad de un dataset real).
+    """
+    try:
+        from scipy import stats
+        return float(stats.t.ppf(probabilidad, gl))
+    except ImportError:
+        pass
+    if gl == 1:
+        return math.tan(math.pi * (probabilidad - 0.5))
+    if gl == 2:
+        return (2 * probabilidad - 1) / math.sqrt(2 * probabilidad * (1 - probabilidad))
+    z = NormalDist().inv_cdf(probabilidad)
+    return (z
+            + (z ** 3 + z) / (4 * gl)
+            + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * gl ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * gl ** 3)
+            + (79 * z ** 9 + 776 * z ** 7 + 1482 * z ** 5 - 1920 * z ** 3 - 945 * z) / (92160 * gl ** 4))
+
+
+def factor_inverso(XTX, factorizacion=None):
+    """
+    Factor A (p, p) con AᵀA = (XᵀX)⁻¹ y el rango de XᵀX
+
+    Reutiliza la factorización del ajuste (ver resolutores.resolver_con_factorizacion):
+    con ('cholesky', L, escala), D·XᵀX·D = L·Lᵀ y A = L⁻¹·D; con ('qr', R), A = R⁻ᵀ.
+    Con ('svd',) el ajuste ya consideró XᵀX singular o mal condicionada y A = S^-½·Uᵀ
+    de su SVD (AᵀA es entonces la pseudoinversa). Sin factorización (modelo cargado
+    de disco) se intenta el Cholesky equilibrado y, si falla, la SVD.
+    Con A, xᵀ(XᵀX)⁻¹x = ||A·x||².
+    """
+    from .resolutores import factorizar_cholesky
+
+    p = len(XTX)
+    if factorizacion is None:
+        try:
+            L, escala, _ = factorizar_cholesky(XTX)
+            factorizacion = ("cholesky", L, escala)
+        except np.linalg.LinAlgError:
+            factorizacion = ("svd",)
+    if factorizacion[0] == "cholesky":
+        _, L, escala = factorizacion
+        return np.linalg.solve(L, np.diag(escala)), p
+    if factorizacion[0] == "qr":
+        R = factorizacion[1]
+        return np.linalg.solve(R.T, np.eye(p)), p
+    U, S, _ = np.linalg.svd(XTX, hermitian=True)
+    tolerancia = S.max() * p * np.finfo(float).eps
+    positivos = S > tolerancia
+    inv_raiz = np.where(positivos, 1 / np.sqrt(np.where(positivos, S, 1)), 0)
+    return inv_raiz[:, None] * U.T, int(positivos.sum())
+
+
+class InferenciaMinimosCuadrados:
+    """
+    Inferencia clásica de mínimos cuadrados a partir de las estadísticas suficientes
+
+        s²          = ||Y - Xβ||² / (n - rango)
+        Cov(β)      = s²·(XᵀX)⁻¹ = s²·AᵀA
+        Var(x·β)    = s²·||A·x||²            (intervalo de confianza de la media)
+        Var(y - x·β) = s²·(1 + ||A·x||²)     (intervalo de predicción de una propiedad)
+
+    El factor A sale de la factorización que ya hizo el solver (una inversión
+    triangular); después cada intervalo cuesta un producto matricial por bloque de
+    filas, igual que la predicción puntual.
+    """
+
+    def __init__(self, stats, coeficientes, factorizacion=None):
+        self.coeficientes = np.asarray(coeficientes, dtype=float)
+        self.factor, self.rango = factor_inverso(stats.XTX, factorizacion)
+        self.n = stats.n
+        self.gl = max(self.n - self.rango, 1)
+        self.s2 = stats.suma_cuadrados_residuos(self.coeficientes) / self.gl
+        self.covarianza = self.s2 * (self.factor.T @ self.factor)
+
+    def errores_estandar(self):
+        return np.sqrt(np.clip(np.diag(self.covarianza), 0, None))
+
+    def apalancamiento(self, diseno, incluye_intercepto=True):
+        """
+        ||A·xᵢ||² para cada fila de un bloque de diseño denso
+
+        Con incluye_intercepto=False el bloque son las columnas crudas sin la de unos:
+        se suma la primera columna de A en lugar de copiar el bloque para agregarla.
+        """
+        if incluye_intercepto:
+            proyeccion = diseno @ self.factor.T
+        else:
+            proyeccion = diseno @ self.factor[:, 1:].T + self.factor[:, 0]
+        return np.einsum('ij,ij->i', proyeccion, proyeccion)
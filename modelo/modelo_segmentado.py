@@ -0,0 +1,211 @@
+# modelo/modelo_segmentado.py
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from .regresor_lineal import RegresorLinealMultiple
+from .pipeline_caracteristicas import COLUMNAS_ENTRADA, PipelineCaracteristicas
+from utils.instrumentacion import medir, registrar_error
+
+CLAVE_POR_DEFECTO = ('zona_categoria', 'tipo_propiedad')
+
+
+def _entrenar_segmento(clave, X, Y, configuracion):
+    """Ajusta el regresor de un segmento (función de módulo para poder enviarla al pool de procesos)."""
+    modelo = RegresorLinealMultiple(**configuracion)
+    if not modelo.entrenar(X, Y, verbose=False):
+        return clave, None
+    return clave, modelo
+
+
+class ModeloSegmentado:
+    """
+    Un RegresorLinealMultiple por segmento de mercado más un modelo global de respaldo
+
+    Los datos se parten por (zona_categoria, tipo_propiedad) o por la clave que se
+    indique: una tupla de columnas de COLUMNAS_ENTRADA o una función X -> etiqueta
+    por fila. Los segmentos con menos de minimo_filas filas (por defecto, 10 por
+    coeficiente del modelo de segmento) usan el modelo global. Con n_procesos > 1
+    los segmentos se entrenan en un pool de procesos.
+
+    Dentro de un segmento las columnas de la clave son constantes, colineales con el
+    intercepto: los modelos de segmento no las usan. Sin pipeline se quitan de X;
+    con pipeline, cada segmento usa una copia cuyas categorías de la clave tienen un
+    único nivel (el del segmento), así que no generan columnas one-hot ni interacciones.
+
+    predecir agrupa las filas por segmento y hace una sola predicción vectorizada
+    por grupo, con el modelo del segmento o el global si el segmento no tiene uno.
+    """
+
+    def __init__(self, clave=CLAVE_POR_DEFECTO, minimo_filas=None, n_procesos=None,
+                 solver="auto", penalizacion=None, lambda_reg=0.0, l1_ratio=0.5, pipeline=None):
+        if not callable(clave):
+            clave = tuple(clave)
+            desconocidas = [c for c in clave if c not in COLUMNAS_ENTRADA]
+            if desconocidas:
+                raise ValueError(f"Columnas de segmentación desconocidas: {desconocidas}")
+        if not callable(clave) and pipeline is not None:
+            numericas = [c for c in clave if not (pipeline.one_hot and c in pipeline.categorias)]
+            if numericas:
+                raise ValueError(f"Con pipeline, las columnas de segmentación deben ser categóricas (one-hot): {numericas}")
+        self.clave = clave
+        self.minimo_filas = minimo_filas
+        self.n_procesos = n_procesos
+        self.configuracion = {'solver': solver, 'penalizacion': penalizacion, 'lambda_reg': lambda_reg,
+                              'l1_ratio': l1_ratio, 'pipeline': pipeline}
+        self.modelo_global = None
+        self.modelos = {}
+        self.tamanos = {}
+        self.entrenado = False
+        self.version = 0
+        self.r2 = 0.0
+        self.mae = 0.0
+        self.rmse = 0.0
+        self.mse = 0.0
+
+    def sin_entrenar(self):
+        """Modelo sin entrenar con la misma configuración (lo usa ValidadorModelo)."""
+        return ModeloSegmentado(self.clave, self.minimo_filas, self.n_procesos, **self.configuracion)
+
+    def _columnas_segmento(self):
+        """Índices de las columnas de X que ven los modelos de segmento (None: todas)."""
+        if callable(self.clave) or self.configuracion['pipeline'] is not None:
+            return None
+        return [i for i, c in enumerate(COLUMNAS_ENTRADA) if c not in self.clave]
+
+    def _configuracion_segmento(self, clave):
+        """Configuración del regresor de un segmento: con pipeline, las columnas de la clave con un solo nivel."""
+        pipeline = self.configuracion['pipeline']
+        if callable(self.clave) or pipeline is None:
+            return self.configuracion
+        parametros = pipeline.configuracion()
+        for columna, valor in zip(self.clave, clave):
+            parametros['categorias'][columna] = [valor]
+        return dict(self.configuracion, pipeline=PipelineCaracteristicas.desde_configuracion(parametros))
+
+    def _x_segmento(self, X):
+        columnas = self._columnas_segmento()
+        return X if columnas is None else X[:, columnas]
+
+    def _parametros_segmento(self, clave):
+        pipeline = self._configuracion_segmento(clave)['pipeline']
+        if pipeline is not None:
+            return 1 + len(pipeline.nombres_columnas())
+        columnas = self._columnas_segmento()
+        return 1 + (len(COLUMNAS_ENTRADA) if columnas is None else len(columnas))
+
+    def _agrupar(self, X):
+        """
+        Returns:
+            (claves, orden, cortes): claves únicas, permutación que ordena las filas por
+            segmento y límites de cada grupo en esa permutación (orden[cortes[i]:cortes[i+1]])
+        """
+        if callable(self.clave):
+            unicas, inverso = np.unique(np.asarray(self.clave(X)), return_inverse=True)
+            claves = [u.item() if hasattr(u, 'item') else u for u in unicas]
+        else:
+            # np.unique(axis=0) ordena filas completas y es lento con millones de filas:
+            # se codifica cada columna por separado y se combinan los códigos en base mixta
+            valores, codigo = [], np.zeros(len(X), dtype=np.int64)
+            for c in self.clave:
+                unicos, inverso_columna = np.unique(X[:, COLUMNAS_ENTRADA.index(c)], return_inverse=True)
+                valores.append(unicos)
+                codigo = codigo * len(unicos) + np.asarray(inverso_columna).ravel()
+            presentes, inverso = np.unique(codigo, return_inverse=True)
+            claves = []
+            for combinado in presentes:
+                indices = []
+                for unicos in reversed(valores):
+                    combinado, indice = divmod(int(combinado), len(unicos))
+                    indices.append(float(unicos[indice]))
+                claves.append(tuple(int(v) if v.is_integer() else v for v in reversed(indices)))
+        inverso = np.asarray(inverso).ravel()
+        # Con pocas claves el argsort estable sobre int16 usa radix sort (lineal)
+        if len(claves) < 2 ** 15:
+            inverso = inverso.astype(np.int16)
+        orden = np.argsort(inverso, kind='stable')
+        cortes = np.concatenate([[0], np.cumsum(np.bincount(inverso, minlength=len(claves)))])
+        return claves, orden, cortes
+
+    @medir('modelo_segmentado_entrenar')
+    def entrenar(self, X, Y, verbose=True):
+        try:
+            X = np.asarray(X, dtype=float)
+            Y = np.asarray(Y, dtype=float).ravel()
+
+            self.modelo_global = RegresorLinealMultiple(**self.configuracion)
+            if not self.modelo_global.entrenar(X, Y, verbose=False):
+                return False
+            claves, orden, cortes = self._agrupar(X)
+            self.tamanos = {clave: int(cortes[i + 1] - cortes[i]) for i, clave in enumerate(claves)}
+            X_segmento = self._x_segmento(X)
+            tareas = []
+            for i, clave in enumerate(claves):
+                # Sin un mínimo explícito se piden 10 filas por coeficiente del modelo de segmento
+                minimo = self.minimo_filas or 10 * self._parametros_segmento(clave)
+                if self.tamanos[clave] >= minimo:
+                    filas = orden[cortes[i]:cortes[i + 1]]
+                    tareas.append((clave, X_segmento[filas], Y[filas], self._configuracion_segmento(clave)))
+
+            if self.n_procesos and self.n_procesos > 1 and len(tareas) > 1:
+                with ProcessPoolExecutor(max_workers=min(self.n_procesos, len(tareas))) as pool:
+                    salidas = list(pool.map(_entrenar_segmento, *zip(*tareas)))
+            else:
+                salidas = [_entrenar_segmento(*tarea) for tarea in tareas]
+            self.modelos = {clave: modelo for clave, modelo in salidas if modelo is not None}
+
+            self.entrenado = True
+            self.version += 1
+            Y_pred = self.predecir(X)
+            self.mse = float(np.mean((Y - Y_pred) ** 2))
+            self.rmse = float(np.sqrt(self.mse))
+            self.mae = float(np.mean(np.abs(Y - Y_pred)))
+            ss_tot = float(np.sum((Y - Y.mean()) ** 2))
+            self.r2 = max(0.0, 1 - self.mse * len(Y) / ss_tot) if ss_tot > 0 else 0.0
+
+            if verbose:
+                print(f"✅ Modelo segmentado entrenado: {len(self.modelos)} segmentos propios, "
+                      f"{len(claves) - len(self.modelos)} con el modelo global")
+                print(f"📊 R²: {self.r2:.4f} | RMSE: ${self.rmse:,.0f} USD")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error entrenando modelo segmentado: {e}")
+            registrar_error('modelo', 'entrenar_segmentado', e)
+            return False
+
+    def modelo_para(self, clave):
+        """Regresor que atiende un segmento (el global si el segmento no tiene modelo propio)."""
+        return self.modelos.get(clave, self.modelo_global)
+
+    @medir('modelo_segmentado_predecir')
+    def predecir(self, X):
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if not self.entrenado:
+            return np.zeros(len(X))
+
+        resultado = np.empty(len(X))
+        claves, orden, cortes = self._agrupar(X)
+        for i, clave in enumerate(claves):
+            filas = orden[cortes[i]:cortes[i + 1]]
+            if clave in self.modelos:
+                resultado[filas] = self.modelos[clave].predecir(self._x_segmento(X[filas]))
+            else:
+                resultado[filas] = self.modelo_global.predecir(X[filas])
+        return resultado
+
+    def predecir_instancia(self, m2, habitaciones, antiguedad, zona, tipo_propiedad):
+        return self.predecir([[m2, habitaciones, antiguedad, zona, tipo_propiedad]])[0]
+
+    def obtener_segmentos(self):
+        """Resumen por segmento: filas de entrenamiento, modelo usado y R² de ese modelo."""
+        segmentos = []
+        for clave, tamano in sorted(self.tamanos.items(), key=lambda item: str(item[0])):
+            propio = clave in self.modelos
+            segmentos.append({
+                'segmento': clave,
+                'filas': tamano,
+                'modelo': 'propio' if propio else 'global',
+                'r2': round(float(self.modelo_para(clave).r2), 4)
+            })
+        return segmentos
@@ -0,0 +1,221 @@
+# modelo/pipeline_caracteristicas.py
+import numpy as np
+
+COLUMNAS_ENTRADA = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
+CATEGORIAS_POR_DEFECTO = {'zona_categoria': [1, 2, 3, 4, 5], 'tipo_propiedad': [1, 2]}
+INTERACCIONES_POR_DEFECTO = [('m2', 'zona_categoria'), ('m2', 'tipo_propiedad')]
+
+
+class MatrizDisenoCompacta:
+    """
+    Matriz de diseño (con intercepto) guardada sin expandir las categorías
+
+    densa:   bloque numérico float32 (n, q): variables continuas y términos polinómicos
+    grupos:  por cada variable one-hot o interacción, (codigos int8, niveles, columna_peso)
+             donde la columna j del grupo vale peso·[codigo == j] (el nivel 0 es la referencia)
+
+    Las ecuaciones normales (XᵀX, XᵀY) y el producto X·β se calculan por bloques de
+    filas con np.bincount, sin formar nunca la matriz float64 completa.
+    """
+
+    def __init__(self, densa, grupos, tamano_bloque=100000):
+        self.densa = densa
+        self.grupos = grupos
+        self.tamano_bloque = tamano_bloque
+        self.p = 1 + densa.shape[1] + sum(niveles - 1 for _, niveles, _ in grupos)
+
+    @property
+    def shape(self):
+        return (len(self.densa), self.p)
+
+    def __len__(self):
+        return len(self.densa)
+
+    def _bloques(self):
+        for inicio in range(0, len(self.densa), self.tamano_bloque):
+            fin = inicio + self.tamano_bloque
+            D = np.column_stack([np.ones(len(self.densa[inicio:fin])), self.densa[inicio:fin]])
+            # Un mismo arreglo de códigos (p. ej. zona y m2×zona) se corta una sola vez
+            # para que gram() pueda reconocer grupos de la misma variable
+            cortes = {}
+            grupos = []
+            for codigos, niveles, peso in self.grupos:
+                corte = cortes.setdefault(id(codigos), codigos[inicio:fin])
+                grupos.append((corte, niveles, np.ones(len(D)) if peso is None else D[:, 1 + peso]))
+            yield inicio, fin, D, grupos
+
+    def gram(self):
+        """XᵀX (p, p) en float64."""
+        q = 1 + self.densa.shape[1]
+        # Posición de la primera columna de cada grupo en la matriz expandida
+        inicios = np.cumsum([q] + [niveles - 1 for _, niveles, _ in self.grupos])
+        XTX = np.zeros((self.p, self.p))
+        for _, _, D, grupos in self._bloques():
+            XTX[:q, :q] += D.T @ D
+            for g, (codigos, niveles, peso) in enumerate(grupos):
+                a = inicios[g]
+                # Denso × grupo: sumas por nivel de cada columna densa ponderada
+                for j in range(q):
+                    XTX[j, a:a + niveles - 1] += np.bincount(codigos, D[:, j] * peso, niveles)[1:]
+                for h in range(g, len(grupos)):
+                    codigos_h, niveles_h, peso_h = grupos[h]
+                    b = inicios[h]
+                    if codigos_h is codigos:
+                        # Misma variable: los indicadores son excluyentes, sólo hay diagonal
+                        bloque = np.diag(np.bincount(codigos, peso * peso_h, niveles)[1:])
+                    else:
+                        cruzado = np.bincount(codigos.astype(np.int64) * niveles_h + codigos_h,
+                                              peso * peso_h, niveles * niveles_h)
+                        bloque = cruzado.reshape(niveles, niveles_h)[1:, 1:]
+                    XTX[a:a + niveles - 1, b:b + niveles_h - 1] += bloque
+        # Se completó el triángulo superior
+        return np.triu(XTX) + np.triu(XTX, 1).T
+
+    def transpuesta_por(self, Y):
+        """XᵀY (p,) en float64."""
+        Y = np.asarray(Y, dtype=float).ravel()
+        partes = [np.zeros(1 + self.densa.shape[1])] + [np.zeros(niveles - 1) for _, niveles, _ in self.grupos]
+        for inicio, fin, D, grupos in self._bloques():
+            y = Y[inicio:fin]
+            partes[0] += D.T @ y
+            for g, (codigos, niveles, peso) in enumerate(grupos):
+                partes[g + 1] += np.bincount(codigos, peso * y, niveles)[1:]
+        return np.concatenate(partes)
+
+    def __matmul__(self, beta):
+        beta = np.asarray(beta, dtype=float)
+        q = 1 + self.densa.shape[1]
+        resultado = np.empty(len(self.densa))
+        for inicio, fin, D, grupos in self._bloques():
+            resultado[inicio:fin] = D @ beta[:q]
+            a = q
+            for codigos, niveles, peso in grupos:
+                efectos = np.concatenate([[0.0], beta[a:a + niveles - 1]])
+                resultado[inicio:fin] += peso * efectos[codigos]
+                a += niveles - 1
+        return resultado
+
+    def a_densa(self):
+        """Expansión completa en float64 (sólo para pocas filas o para depurar)."""
+        columnas = [np.ones((len(self.densa), 1)), self.densa.astype(float)]
+        for codigos, niveles, peso in self.grupos:
+            indicadores = (codigos[:, None] == np.arange(1, niveles)).astype(float)
+            columnas.append(indicadores if peso is None else indicadores * self.densa[:, [peso]])
+        return np.hstack(columnas)
+
+    def a_dispersa(self):
+        """Expansión CSR (requiere scipy): el bloque denso más un no cero por fila y grupo."""
+        try:
+            from scipy import sparse
+        except ImportError:
+            raise ImportError("a_dispersa requiere scipy (pip install scipy)")
+        n = len(self.densa)
+        filas = np.arange(n)
+        bloques = [sparse.csr_matrix(np.column_stack([np.ones(n), self.densa]))]
+        for codigos, niveles, peso in self.grupos:
+            valores = np.ones(n, dtype=np.float32) if peso is None else self.densa[:, peso]
+            presentes = codigos > 0
+            bloques.append(sparse.csr_matrix(
+                (valores[presentes], (filas[presentes], codigos[presentes].astype(np.int64) - 1)),
+                shape=(n, niveles - 1)))
+        return sparse.hstack(bloques, format='csr')
+
+
+class PipelineCaracteristicas:
+    """
+    Transforma las 5 columnas crudas (m2, habitaciones, antiguedad, zona_categoria,
+    tipo_propiedad) en el diseño del modelo:
+
+    - variables categóricas en one-hot (el primer nivel queda como referencia)
+    - términos polinómicos (m2², antigüedad², ...)
+    - interacciones numérica × categórica (m2×zona, m2×tipo)
+
+    El resultado es una MatrizDisenoCompacta: float32 para lo numérico e int8 para
+    los códigos de categoría, en lugar de una matriz float64 con una columna por nivel.
+    """
+
+    def __init__(self, one_hot=True, grado_polinomio=2, columnas_polinomio=('m2', 'antiguedad'),
+                 interacciones=True, categorias=None, tamano_bloque=100000):
+        self.one_hot = one_hot
+        self.grado_polinomio = grado_polinomio
+        self.columnas_polinomio = list(columnas_polinomio)
+        if interacciones is True:
+            interacciones = INTERACCIONES_POR_DEFECTO
+        self.interacciones = [tuple(par) for par in (interacciones or [])] if one_hot else []
+        self.categorias = {k: list(v) for k, v in (categorias or CATEGORIAS_POR_DEFECTO).items()}
+        self.tamano_bloque = tamano_bloque
+
+        self.columnas_numericas = [c for c in COLUMNAS_ENTRADA if not (one_hot and c in self.categorias)]
+        self.columnas_densas = list(self.columnas_numericas)
+        for columna in self.columnas_polinomio:
+            for grado in range(2, grado_polinomio + 1):
+                self.columnas_densas.append(f"{columna}^{grado}")
+
+    def configuracion(self):
+        """Parámetros serializables en JSON (se guardan con el artefacto del modelo)."""
+        return {
+            'one_hot': self.one_hot,
+            'grado_polinomio': self.grado_polinomio,
+            'columnas_polinomio': self.columnas_polinomio,
+            'interacciones': [list(par) for par in self.interacciones],
+            'categorias': self.categorias
+        }
+
+    @classmethod
+    def desde_configuracion(cls, configuracion):
+        return cls(**configuracion)
+
+    def nombres_columnas(self):
+        """Nombres de las columnas del diseño, sin el intercepto."""
+        nombres = list(self.columnas_densas)
+        if self.one_hot:
+            for variable, niveles in self.categorias.items():
+                nombres += [f"{variable}={nivel}" for nivel in niveles[1:]]
+            for numerica, variable in self.interacciones:
+                nombres += [f"{numerica}×{variable}={nivel}" for nivel in self.categorias[variable][1:]]
+        return nombres
+
+    def _codificar(self, valores, variable):
+        niveles = np.asarray(self.categorias[variable])
+        orden = np.argsort(niveles)
+        posiciones = np.searchsorted(niveles[orden], valores)
+        posiciones = np.clip(posiciones, 0, len(niveles) - 1)
+        codigos = orden[posiciones]
+        desconocidos = niveles[codigos] != valores
+        if desconocidos.any():
+            raise ValueError(f"Valores desconocidos en {variable}: {sorted(set(valores[desconocidos].tolist()))}")
+        return codigos.astype(np.int8)
+
+    def transformar(self, X):
+        """
+        Args:
+            X: Matriz (n, 5) con las columnas de COLUMNAS_ENTRADA
+
+        Returns:
+            MatrizDisenoCompacta con intercepto
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(COLUMNAS_ENTRADA):
+            raise ValueError(f"Se esperaban {len(COLUMNAS_ENTRADA)} columnas y llegaron {X.shape[1]}")
+
+        indice = {columna: i for i, columna in enumerate(COLUMNAS_ENTRADA)}
+        densa = np.empty((len(X), len(self.columnas_densas)), dtype=np.float32)
+        for j, columna in enumerate(self.columnas_numericas):
+            densa[:, j] = X[:, indice[columna]]
+        j = len(self.columnas_numericas)
+        for columna in self.columnas_polinomio:
+            for grado in range(2, self.grado_polinomio + 1):
+                densa[:, j] = X[:, indice[columna]] ** grado
+                j += 1
+
+        grupos = []
+        if self.one_hot:
+            codigos = {variable: self._codificar(X[:, indice[variable]], variable) for variable in self.categorias}
+            for variable, niveles in self.categorias.items():
+                grupos.append((codigos[variable], len(niveles), None))
+            for numerica, variable in self.interacciones:
+                grupos.append((codigos[variable], len(self.categorias[variable]),
+                               self.columnas_densas.index(numerica)))
+        return MatrizDisenoCompacta(densa, grupos, self.tamano_bloque)
@@ -0,0 +1,312 @@
+# modelo/registro_modelos.py
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+from .estadisticas_suficientes import EstadisticasSuficientes
+from .regresor_lineal import RegresorLinealMultiple
+from .pipeline_caracteristicas import PipelineCaracteristicas
+
+FORMATO_ARTEFACTO = 1
+CARACTERISTICAS = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
+# Versiones que se conservan por defecto (además de la fijada)
+MAX_VERSIONES = 20
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Un lock por directorio de registro y proceso; entre procesos, un lock de archivo
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def _lock_directorio(directorio):
+    clave = os.path.abspath(directorio)
+    with _locks_lock:
+        return _locks.setdefault(clave, threading.Lock())
+
+
+def guardar_modelo(modelo, ruta, huella_datos=None, validacion=None, origen_datos=None):
+    """
+    Guarda un RegresorLinealMultiple entrenado en un .npz binario sin comprimir
+
+    Incluye coeficientes, estadísticas suficientes, métricas, esquema de
+    características, información del solver y la huella y el origen (ruta
+    absoluta de la base) de los datos de entrenamiento.
+    """
+    if not modelo.entrenado:
+        raise ValueError("Solo se pueden guardar modelos entrenados")
+
+    metadatos = {
+        'formato': FORMATO_ARTEFACTO,
+        'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'caracteristicas': CARACTERISTICAS,
+        'pipeline': modelo.pipeline.configuracion() if getattr(modelo, 'pipeline', None) is not None else None,
+        'huella_datos': list(huella_datos) if huella_datos is not None else None,
+        'origen_datos': origen_datos,
+        'solver': modelo.obtener_info_solver(),
+        'version_modelo': modelo.version,
+        'metricas': {
+            'r2': float(modelo.r2),
+            'mse': float(modelo.mse),
+            'rmse': float(modelo.rmse),
+            'mae': float(modelo.mae),
+            'mae_requiere_recalculo': bool(modelo.mae_requiere_recalculo)
+        },
+        'validacion': validacion
+    }
+    arreglos = {'coeficientes': np.asarray(modelo.coeficientes, dtype=float),
+                'metadatos': np.array(json.dumps(metadatos, ensure_ascii=False))}
+    stats = modelo.estadisticas
+    if stats is not None:
+        arreglos['XTX'] = stats.XTX
+        arreglos['XTY'] = stats.XTY
+        arreglos['sumas'] = np.array([stats.suma_y, stats.suma_y2, stats.n], dtype=float)
+
+    # Escritura atómica: un lector nunca ve un artefacto a medio escribir
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    fd, ruta_tmp = tempfile.mkstemp(suffix='.npz', dir=directorio)
+    try:
+        with os.fdopen(fd, 'wb') as archivo:
+            np.savez(archivo, **arreglos)
+        os.replace(ruta_tmp, ruta)
+    except BaseException:
+        if os.path.exists(ruta_tmp):
+            os.remove(ruta_tmp)
+        raise
+    return metadatos
+
+
+def leer_metadatos(ruta):
+    with np.load(ruta, allow_pickle=False) as datos:
+        return json.loads(str(datos['metadatos']))
+
+
+def cargar_modelo(ruta):
+    """Reconstruye un RegresorLinealMultiple listo para predecir, sin reentrenar."""
+    with np.load(ruta, allow_pickle=False) as datos:
+        metadatos = json.loads(str(datos['metadatos']))
+        if metadatos.get('formato') != FORMATO_ARTEFACTO:
+            raise ValueError(f"Formato de artefacto no soportado: {metadatos.get('formato')}")
+
+        solver = metadatos['solver']
+        modelo = RegresorLinealMultiple(solver=solver['solver_solicitado'],
+                                        penalizacion=solver.get('penalizacion'),
+                                        lambda_reg=solver.get('lambda_reg', 0.0),
+                                        l1_ratio=solver.get('l1_ratio', 0.5),
+                                        pipeline=(PipelineCaracteristicas.desde_configuracion(metadatos['pipeline'])
+                                                  if metadatos.get('pipeline') else None))
+        modelo.coeficientes = datos['coeficientes']
+        modelo.solver_usado = solver['solver_usado']
+        modelo.numero_condicion = solver['numero_condicion']
+
+        if 'XTX' in datos:
+            stats = EstadisticasSuficientes(len(modelo.coeficientes))
+            stats.XTX = datos['XTX']
+            stats.XTY = datos['XTY']
+            suma_y, suma_y2, n = datos['sumas']
+            stats.suma_y, stats.suma_y2, stats.n = float(suma_y), float(suma_y2), int(n)
+            modelo.estadisticas = stats
+
+    metricas = metadatos['metricas']
+    modelo.r2 = metricas['r2']
+    modelo.mse = metricas['mse']
+    modelo.rmse = metricas['rmse']
+    modelo.mae = metricas['mae']
+    modelo.mae_requiere_recalculo = metricas['mae_requiere_recalculo']
+    modelo.version = metadatos['version_modelo']
+    modelo.entrenado = True
+    modelo.metadatos_artefacto = metadatos
+    return modelo
+
+
+class RegistroModelos:
+    """
+    Registro local y versionado de artefactos de modelo
+
+    directorio/
+        v0001.npz, v0002.npz, ...
+        registro.json   -> versiones, última y fijada
+
+    La versión vigente es la fijada si existe y, si no, la última registrada. Se
+    conservan las últimas max_versiones versiones más la fijada; los artefactos más
+    viejos se borran al registrar una nueva. Toda modificación del índice relee el
+    índice dentro de un lock (de hilo y de archivo, registro.lock) y lo reescribe
+    de forma atómica, así que varios procesos pueden registrar a la vez.
+    """
+
+    def __init__(self, directorio="modelos_registrados", max_versiones=MAX_VERSIONES):
+        if max_versiones < 1:
+            raise ValueError("max_versiones debe ser al menos 1")
+        self.directorio = directorio
+        self.max_versiones = max_versiones
+        self.ruta_indice = os.path.join(directorio, "registro.json")
+        self.ruta_lock = os.path.join(directorio, "registro.lock")
+
+    @contextmanager
+    def _bloqueo(self):
+        """Exclusión mutua sobre el índice entre hilos y entre procesos."""
+        os.makedirs(self.directorio, exist_ok=True)
+        with _lock_directorio(self.directorio):
+            with open(self.ruta_lock, 'a+b') as archivo:
+                if fcntl is not None:
+                    fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+                else:
+                    archivo.seek(0)
+                    msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+                    else:
+                        archivo.seek(0)
+                        msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _leer_indice(self):
+        if not os.path.exists(self.ruta_indice):
+            return {'versiones': [], 'ultima': None, 'fijada': None}
+        with open(self.ruta_indice, encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    def _escribir_indice(self, indice):
+        """Reemplazo atómico: se llama con self._bloqueo() tomado."""
+        os.makedirs(self.directorio, exist_ok=True)
+        fd, ruta_tmp = tempfile.mkstemp(suffix='.json', dir=self.directorio)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as archivo:
+                json.dump(indice, archivo, ensure_ascii=False, indent=2)
+            os.replace(ruta_tmp, self.ruta_indice)
+        except BaseException:
+            if os.path.exists(ruta_tmp):
+                os.remove(ruta_tmp)
+            raise
+
+    def _podar(self, indice):
+        """Quita del índice las versiones fuera de retención y devuelve sus archivos."""
+        versiones = sorted(v['version'] for v in indice['versiones'])
+        conservar = set(versiones[-self.max_versiones:]) | {indice['fijada']}
+        podadas = [v for v in indice['versiones'] if v['version'] not in conservar]
+        indice['versiones'] = [v for v in indice['versiones'] if v['version'] in conservar]
+        return [os.path.join(self.directorio, v['archivo']) for v in podadas]
+
+    def _ruta_version(self, version):
+        return os.path.join(self.directorio, f"v{version:04d}.npz")
+
+    def registrar(self, modelo, huella_datos=None, validacion=None, origen_datos=None):
+        """Guarda el modelo como nueva versión y la marca como última. Devuelve el número de versión."""
+        with self._bloqueo():
+            indice = self._leer_indice()
+            # Las versiones podadas no se reutilizan: un número siempre nombra el mismo artefacto
+            version = max([v['version'] for v in indice['versiones']] + [indice['ultima'] or 0]) + 1
+            metadatos = guardar_modelo(modelo, self._ruta_version(version), huella_datos, validacion, origen_datos)
+            modelo.metadatos_artefacto = metadatos
+            indice['versiones'].append({
+                'version': version,
+                'archivo': os.path.basename(self._ruta_version(version)),
+                'fecha': metadatos['fecha'],
+                'huella_datos': metadatos['huella_datos'],
+                'origen_datos': origen_datos,
+                'r2': metadatos['metricas']['r2'],
+                'solver': metadatos['solver']['solver_usado']
+            })
+            indice['ultima'] = version
+            podados = self._podar(indice)
+            self._escribir_indice(indice)
+            # Después del índice: nunca queda una versión listada sin su artefacto
+            for ruta in podados:
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+        return version
+
+    def listar_versiones(self):
+        indice = self._leer_indice()
+        vigente = self.version_vigente()
+        return [dict(v, vigente=(v['version'] == vigente), fijada=(v['version'] == indice['fijada']))
+                for v in indice['versiones']]
+
+    def version_vigente(self):
+        indice = self._leer_indice()
+        return indice['fijada'] if indice['fijada'] is not None else indice['ultima']
+
+    def cargar(self, version=None):
+        """Carga la versión pedida o, por defecto, la vigente. Devuelve None si el registro está vacío."""
+        version = self.version_vigente() if version is None else version
+        if version is None:
+            return None
+        ruta = self._ruta_version(version)
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No existe la versión {version} en {self.directorio}")
+        return cargar_modelo(ruta)
+
+    def version_fijada(self):
+        return self._leer_indice()['fijada']
+
+    def fijar(self, version):
+        with self._bloqueo():
+            indice = self._leer_indice()
+            if version not in [v['version'] for v in indice['versiones']]:
+                raise ValueError(f"No existe la versión {version}")
+            indice['fijada'] = version
+            self._escribir_indice(indice)
+        return version
+
+    def desfijar(self):
+        with self._bloqueo():
+            indice = self._leer_indice()
+            indice['fijada'] = None
+            self._escribir_indice(indice)
+
+    def rollback(self, pasos=1):
+        """Fija la versión registrada `pasos` lugares antes de la vigente (p. ej. tras una mala carga de datos)."""
+        with self._bloqueo():
+            indice = self._leer_indice()
+            versiones = sorted(v['version'] for v in indice['versiones'])
+            vigente = indice['fijada'] if indice['fijada'] is not None else indice['ultima']
+            if vigente not in versiones:
+                raise ValueError("El registro está vacío")
+            posicion = versiones.index(vigente) - pasos
+            if posicion < 0:
+                raise ValueError("No hay una versión anterior a la cual volver")
+            indice['fijada'] = versiones[posicion]
+            self._escribir_indice(indice)
+        return indice['fijada']
+
+    def obtener_o_entrenar(self, huella_datos, entrenar, origen_datos=None):
+        """
+        Modelo para servir: la versión fijada si la hay; si no, la última (de esa
+        base) cuando coincide con la huella de los datos actuales; si no, entrena con
+        `entrenar()` (que devuelve (modelo, validacion)) y registra el resultado.
+
+        Con origen_datos (ruta de la base), sólo se reutilizan artefactos entrenados
+        sobre esa misma base: un registro compartido entre varias bases (p. ej.
+        `valuar --db otra.db`) nunca sirve el modelo de otra, ni siquiera el fijado.
+        """
+        origen = os.path.abspath(origen_datos) if origen_datos is not None else None
+        indice = self._leer_indice()
+        entradas = {entrada['version']: entrada for entrada in indice['versiones']}
+
+        def mismo_origen(version):
+            return origen is None or entradas[version].get('origen_datos') == origen
+
+        if indice['fijada'] is not None:
+            if mismo_origen(indice['fijada']):
+                return self.cargar(indice['fijada'])
+            print(f"⚠️ La versión fijada v{indice['fijada']:04d} se entrenó sobre otra base; se ignora para {origen}")
+
+        # La última versión entrenada sobre esta base (la última a secas si no hay origen)
+        huella = list(huella_datos) if huella_datos is not None else None
+        ultima = max((version for version in entradas if mismo_origen(version)), default=None)
+        if ultima is not None and huella is not None and entradas[ultima]['huella_datos'] == huella:
+            return self.cargar(ultima)
+
+        modelo, validacion = entrenar()
+        if modelo is not None and modelo.entrenado:
+            self.registrar(modelo, huella_datos, validacion, origen)
+        return modelo
@@ -1,33 +1,102 @@
 # modelo/regresor_lineal.py
+import copy
 import numpy as np
+from .estadisticas_suficientes import EstadisticasSuficientes
+from .resolutores import SOLVERS_DISPONIBLES, resolver_con_factorizacion, numero_condicion
+from .regularizacion import PENALIZACIONES, resolver_regularizado
+from .inferencia import InferenciaMinimosCuadrados, cuantil_t
+from utils.instrumentacion import medir, registrar_error
 
 class RegresorLinealMultiple:
-    def __init__(self):
+    def __init__(self, solver="auto", penalizacion=None, lambda_reg=0.0, l1_ratio=0.5, pipeline=None):
+        if solver not in SOLVERS_DISPONIBLES:
+            raise ValueError(f"Solver desconocido: {solver}. Opciones: {', '.join(SOLVERS_DISPONIBLES)}")
+        if penalizacion not in PENALIZACIONES:
+            raise ValueError(f"Penalización desconocida: {penalizacion}. Opciones: ridge, lasso, elastic_net")
+        self.solver = solver
+        # Regularización opcional (el intercepto no se penaliza; λ sobre variables estandarizadas)
+        self.penalizacion = penalizacion
+        self.lambda_reg = lambda_reg
+        self.l1_ratio = l1_ratio
+        # PipelineCaracteristicas opcional (one-hot, polinomios, interacciones); sin él se usan las 5 columnas crudas
+        self.pipeline = pipeline
+        self.solver_usado = None
+        self.numero_condicion = None
         self.coeficientes = None
         self.entrenado = False
+        # Se incrementa en cada ajuste o actualización; sirve de clave para cachés derivadas
+        self.version = 0
         self.r2 = 0.0
         self.mae = 0.0
         self.rmse = 0.0
         self.mse = 0.0
+        # Modo incremental: XᵀX, XᵀY, ΣY y ΣY² acumulados de las filas de entrenamiento
+        self.estadisticas = None
+        self.mae_requiere_recalculo = False
+        # (versión, InferenciaMinimosCuadrados): factor de (XᵀX)⁻¹ del último ajuste
+        self._inferencia = None
+        # (versión, factorización de XᵀX del solver): la inferencia la reutiliza
+        self._factorizacion = None
+        # (versión, número de condición exacto), calculado sólo cuando se pide
+        self._condicion = None
     
+    def _con_intercepto(self, X):
+        if self.pipeline is not None:
+            return self.pipeline.transformar(X)
+        X = np.array(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return np.column_stack([np.ones(len(X)), X])
+    
+    def matriz_diseno(self, X, densa=False):
+        """Matriz de diseño con intercepto para las columnas crudas X (compacta si hay pipeline, salvo densa=True)."""
+        diseno = self._con_intercepto(X)
+        if densa and not isinstance(diseno, np.ndarray):
+            return diseno.a_densa()
+        return diseno
+    
+    def _resolver(self, X_con_intercepto=None, Y=None):
+        if self.penalizacion is not None and self.lambda_reg > 0:
+            self.coeficientes = resolver_regularizado(self.estadisticas, self.penalizacion,
+                                                      self.lambda_reg, self.l1_ratio)
+            self.solver_usado = self.penalizacion
+            self.numero_condicion = None  # Se calcula a pedido en obtener_info_solver
+            factorizacion = None
+        else:
+            self.coeficientes, self.solver_usado, self.numero_condicion, factorizacion = resolver_con_factorizacion(
+                self.estadisticas.XTX, self.estadisticas.XTY, self.solver, X_con_intercepto, Y
+            )
+        self.entrenado = True
+        self.version += 1
+        self._factorizacion = (self.version, factorizacion)
+    
+    def _actualizar_metricas_desde_estadisticas(self):
+        metricas = self.estadisticas.metricas(self.coeficientes)
+        self.r2 = metricas['r2']
+        self.mse = metricas['mse']
+        self.rmse = metricas['rmse']
+        # El MAE no se puede actualizar con sumas; queda marcado hasta un recálculo completo
+        self.mae_requiere_recalculo = True
+    
+    @medir('modelo_entrenar')
     def entrenar(self, X, Y, verbose=True):
         try:
             X = np.array(X)
             Y = np.array(Y).flatten()
             
-            X_con_intercepto = np.column_stack([np.ones(len(X)), X])
+            X_con_intercepto = self._con_intercepto(X)
             
-            # Calcular coeficientes
-            XT = X_con_intercepto.T
-            XTX = XT @ X_con_intercepto
-            XTX_inv = np.linalg.pinv(XTX)  # Usar pseudoinversa para estabilidad
-            XTY = XT @ Y
-            self.coeficientes = XTX_inv @ XTY
-            self.entrenado = True
+            # Calcular coeficientes (con el diseño compacto se resuelve sólo sobre XᵀX)
+            self.estadisticas = EstadisticasSuficientes.desde_datos(X_con_intercepto, Y)
+            if isinstance(X_con_intercepto, np.ndarray):
+                self._resolver(X_con_intercepto, Y)
+            else:
+                self._resolver()
             
             # Calcular métricas
             Y_pred = X_con_intercepto @ self.coeficientes
             self.mae = np.mean(np.abs(Y - Y_pred))
+            self.mae_requiere_recalculo = False
             self.mse = np.mean((Y - Y_pred) ** 2)
             self.rmse = np.sqrt(self.mse)
             
@@ -45,17 +114,174 @@ class RegresorLinealMultiple:
             return True
         except Exception as e:
             print(f"❌ Error: {e}")
+            registrar_error('modelo', 'entrenar', e)
+            return False
+    
+    @medir('modelo_entrenar_por_lotes')
+    def entrenar_por_lotes(self, lotes, verbose=True):
+        """Entrena acumulando XᵀX/XᵀY lote a lote; nunca mantiene más de un lote en memoria.
+        
+        Args:
+            lotes: iterable de tuplas (X, Y), por ejemplo DatasetInmobiliario.iterar_matrices_entrenamiento()
+        """
+        try:
+            self.estadisticas = None
+            for X_lote, Y_lote in lotes:
+                X_con_intercepto = self._con_intercepto(X_lote)
+                if self.estadisticas is None:
+                    self.estadisticas = EstadisticasSuficientes(X_con_intercepto.shape[1])
+                self.estadisticas.agregar(X_con_intercepto, Y_lote)
+            
+            if self.estadisticas is None or self.estadisticas.n == 0:
+                print("❌ Error: no se recibieron filas para entrenar")
+                return False
+            
+            self._resolver()
+            self._actualizar_metricas_desde_estadisticas()
+            
+            if verbose:
+                print(f"✅ Modelo entrenado por lotes ({self.estadisticas.n} filas) - R²: {self.r2:.4f}")
+                print(f"📈 RMSE: ${self.rmse:,.0f} USD")
+            
+            return True
+        except Exception as e:
+            print(f"❌ Error: {e}")
+            registrar_error('modelo', 'entrenar_por_lotes', e)
+            return False
+    
+    def actualizar(self, X_nuevo, Y_nuevo):
+        """Incorpora filas nuevas con una actualización de rango k en O(k·p²), sin reentrenar."""
+        try:
+            X_con_intercepto = self._con_intercepto(X_nuevo)
+            if self.estadisticas is None:
+                self.estadisticas = EstadisticasSuficientes(X_con_intercepto.shape[1])
+            self.estadisticas.agregar(X_con_intercepto, Y_nuevo)
+            self._resolver()
+            self._actualizar_metricas_desde_estadisticas()
+            return True
+        except Exception as e:
+            print(f"❌ Error actualizando modelo: {e}")
+            registrar_error('modelo', 'actualizar', e)
+            return False
+    
+    def copiar(self):
+        """Copia independiente del modelo: actualizar/retirar sobre ella no tocan las estadísticas del original."""
+        copia = copy.copy(self)
+        if self.estadisticas is not None:
+            copia.estadisticas = self.estadisticas.copiar()
+        return copia
+    
+    def retirar(self, X, Y):
+        """Quita del modelo filas que ya formaban parte del entrenamiento (baja lógica)."""
+        try:
+            if self.estadisticas is None:
+                return False
+            self.estadisticas.retirar(self._con_intercepto(X), Y)
+            if self.estadisticas.n <= 0:
+                self.estadisticas = None
+                self.coeficientes = None
+                self.entrenado = False
+                self.version += 1
+                return True
+            self._resolver()
+            self._actualizar_metricas_desde_estadisticas()
+            return True
+        except Exception as e:
+            print(f"❌ Error retirando filas del modelo: {e}")
+            registrar_error('modelo', 'retirar', e)
+            return False
+    
+    def recalcular_mae(self, X, Y):
+        """Recalcula el MAE con una pasada completa sobre las filas activas."""
+        if not self.entrenado:
+            return False
+        Y = np.array(Y).flatten()
+        self.mae = np.mean(np.abs(Y - self.predecir(X)))
+        self.mae_requiere_recalculo = False
+        return True
+    
+    def recalcular_mae_por_lotes(self, lotes):
+        """Segunda pasada por lotes para obtener el MAE sin cargar toda la tabla."""
+        if not self.entrenado:
+            return False
+        suma_abs = 0.0
+        n = 0
+        for X_lote, Y_lote in lotes:
+            Y_lote = np.array(Y_lote).flatten()
+            suma_abs += float(np.sum(np.abs(Y_lote - self.predecir(X_lote))))
+            n += len(Y_lote)
+        if n == 0:
             return False
+        self.mae = suma_abs / n
+        self.mae_requiere_recalculo = False
+        return True
     
+    @medir('modelo_predecir')
     def predecir(self, X):
         if not self.entrenado:
             return np.zeros(len(X))
         
-        X = np.array(X)
+        if self.pipeline is not None:
+            return self.pipeline.transformar(X) @ self.coeficientes
+        
+        X = np.asarray(X, dtype=float)
         if X.ndim == 1:
             X = X.reshape(1, -1)
-        X_con_intercepto = np.column_stack([np.ones(len(X)), X])
-        return X_con_intercepto @ self.coeficientes
+        # β₀ + X·β[1:] evita copiar X para agregar la columna de unos
+        return X @ self.coeficientes[1:] + self.coeficientes[0]
+    
+    def inferencia(self):
+        """Factor de (XᵀX)⁻¹ y s² del ajuste vigente, construido sobre la factorización del solver; una vez por versión."""
+        if not self.entrenado or self.estadisticas is None:
+            raise ValueError("La inferencia requiere un modelo entrenado con estadísticas suficientes")
+        if self.penalizacion is not None and self.lambda_reg > 0:
+            raise ValueError("Errores estándar e intervalos sólo están definidos para mínimos cuadrados sin penalización")
+        if self._inferencia is None or self._inferencia[0] != self.version:
+            factorizacion = None
+            if self._factorizacion is not None and self._factorizacion[0] == self.version:
+                factorizacion = self._factorizacion[1]
+            self._inferencia = (self.version, InferenciaMinimosCuadrados(self.estadisticas, self.coeficientes,
+                                                                         factorizacion))
+        return self._inferencia[1]
+    
+    def predecir_con_intervalos(self, X, nivel=0.95, tamano_bloque=100000):
+        """
+        Predicción puntual con intervalos de confianza (precio medio) y de predicción
+        (una propiedad concreta) al nivel dado, en una pasada vectorizada por bloques
+        
+        Returns:
+            Diccionario de arreglos: prediccion, error_estandar_media,
+            confianza_inferior/superior y prediccion_inferior/superior
+        """
+        inferencia = self.inferencia()
+        t = cuantil_t(0.5 + nivel / 2, inferencia.gl)
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n = len(X)
+        prediccion = np.empty(n)
+        apalancamiento = np.empty(n)
+        for inicio in range(0, n, tamano_bloque):
+            fin = min(inicio + tamano_bloque, n)
+            if self.pipeline is not None:
+                diseno = self.pipeline.transformar(X[inicio:fin]).a_densa()
+                prediccion[inicio:fin] = diseno @ self.coeficientes
+                apalancamiento[inicio:fin] = inferencia.apalancamiento(diseno)
+            else:
+                prediccion[inicio:fin] = X[inicio:fin] @ self.coeficientes[1:] + self.coeficientes[0]
+                apalancamiento[inicio:fin] = inferencia.apalancamiento(X[inicio:fin], incluye_intercepto=False)
+        
+        error_media = np.sqrt(inferencia.s2 * apalancamiento)
+        error_prediccion = np.sqrt(inferencia.s2 * (1 + apalancamiento))
+        return {
+            'prediccion': prediccion,
+            'error_estandar_media': error_media,
+            'confianza_inferior': prediccion - t * error_media,
+            'confianza_superior': prediccion + t * error_media,
+            'prediccion_inferior': prediccion - t * error_prediccion,
+            'prediccion_superior': prediccion + t * error_prediccion,
+            'nivel': nivel
+        }
     
     def predecir_instancia(self, m2, habitaciones, antiguedad, zona, tipo_propiedad):
         return self.predecir([[m2, habitaciones, antiguedad, zona, tipo_propiedad]])[0]
@@ -66,23 +292,69 @@ class RegresorLinealMultiple:
             "MSE": round(self.mse, 2),
             "MAE (USD)": round(self.mae, 2),
             "RMSE (USD)": round(self.rmse, 2),
-            "precision_porcentaje": round(self.r2 * 100, 2)
+            "precision_porcentaje": round(self.r2 * 100, 2),
+            "mae_requiere_recalculo": self.mae_requiere_recalculo
         }
     
+    def _numero_condicion_exacto(self):
+        """SVD de XᵀX equilibrada, una vez por versión; los ajustes sólo guardan la estimación."""
+        if self.estadisticas is None:
+            return self.numero_condicion
+        if self._condicion is None or self._condicion[0] != self.version:
+            self._condicion = (self.version, numero_condicion(self.estadisticas.XTX))
+        return self._condicion[1]
+    
+    def obtener_info_solver(self):
+        return {
+            "solver_solicitado": self.solver,
+            "solver_usado": self.solver_usado,
+            "numero_condicion": self._numero_condicion_exacto(),
+            "penalizacion": self.penalizacion,
+            "lambda_reg": self.lambda_reg,
+            "l1_ratio": self.l1_ratio
+        }
+    
+    def _nombres_coeficientes(self):
+        if self.pipeline is not None:
+            return ["Intercepto (β₀)"] + [f"{nombre} (β{i})" for i, nombre in
+                                          enumerate(self.pipeline.nombres_columnas(), start=1)]
+        return ["Intercepto (β₀)", "m² (β₁)", "Habitaciones (β₂)", "Antigüedad (β₃)", "Zona (β₄)", "Tipo (β₅)"]
+    
     def obtener_coeficientes(self):
         if not self.entrenado:
             return {"error": "Modelo no entrenado"}
         
         if self.coeficientes is None:
             return {"error": "Coeficientes no calculados"}
-            
-        # Solo los coeficientes que necesitamos
-        coef_dict = {
-            "Intercepto (β₀)": round(self.coeficientes[0], 4),
-            "m² (β₁)": round(self.coeficientes[1], 4),
-            "Habitaciones (β₂)": round(self.coeficientes[2], 4),
-            "Antigüedad (β₃)": round(self.coeficientes[3], 4),
-            "Zona (β₄)": round(self.coeficientes[4], 4),
-            "Tipo (β₅)": round(self.coeficientes[5], 4) if len(self.coeficientes) > 5 else 0
-        }
-        return coef_dict
\ No newline at end of file
+        
+        coef_dict = {nombre: round(valor, 4) for nombre, valor in zip(self._nombres_coeficientes(), self.coeficientes)}
+        # Sin pipeline siempre se informan los 6 coeficientes
+        for nombre in self._nombres_coeficientes()[len(coef_dict):]:
+            coef_dict[nombre] = 0
+        return coef_dict
+    
+    def obtener_inferencia_coeficientes(self, nivel=0.95):
+        """
+        Error estándar, estadístico t e intervalo de confianza de cada coeficiente
+        
+        Returns:
+            Diccionario {nombre: {coeficiente, error_estandar, t, inferior, superior}}
+            o {'error': ...} si el modelo no admite inferencia (sin entrenar, penalizado)
+        """
+        try:
+            inferencia = self.inferencia()
+        except ValueError as e:
+            return {"error": str(e)}
+        
+        errores = inferencia.errores_estandar()
+        t = cuantil_t(0.5 + nivel / 2, inferencia.gl)
+        resultado = {}
+        for nombre, beta, error in zip(self._nombres_coeficientes(), self.coeficientes, errores):
+            resultado[nombre] = {
+                'coeficiente': round(float(beta), 4),
+                'error_estandar': round(float(error), 4),
+                't': round(float(beta / error), 3) if error > 0 else float('inf'),
+                'inferior': round(float(beta - t * error), 4),
+                'superior': round(float(beta + t * error), 4)
+            }
+        return resultado
\ No newline at end of file
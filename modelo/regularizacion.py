@@ -0,0 +1,127 @@
+# modelo/regularizacion.py
+import numpy as np
+
+PENALIZACIONES = (None, "ridge", "lasso", "elastic_net")
+
+
+def preparar_gram(stats):
+    """
+    Matriz de Gram estandarizada a partir de las estadísticas suficientes
+
+    Con μ y σ de cada columna (sin intercepto) se obtiene G = ZᵀZ/n y c = ZᵀY/n
+    para Z e Y estandarizadas, sin volver a recorrer las filas. Así λ no depende de
+    las unidades (USD, m²) y la misma grilla sirve para ridge, lasso y elastic net.
+    El intercepto no se penaliza.
+    """
+    n = stats.n
+    mu_x = stats.XTX[0, 1:] / n
+    mu_y = stats.suma_y / n
+    Sxx = stats.XTX[1:, 1:] - n * np.outer(mu_x, mu_x)
+    Sxy = stats.XTY[1:] - n * mu_x * mu_y
+    sigma = np.sqrt(np.clip(np.diag(Sxx), 0, None) / n)
+    constante = sigma <= 1e-12
+    sigma[constante] = 1.0
+    sigma_y = np.sqrt(max(stats.suma_y2 - n * mu_y ** 2, 0.0) / n) or 1.0
+
+    G = Sxx / (n * np.outer(sigma, sigma))
+    c = Sxy / (n * sigma * sigma_y)
+    G[constante, :] = 0.0
+    G[:, constante] = 0.0
+    c[constante] = 0.0
+    return {'G': G, 'c': c, 'mu_x': mu_x, 'mu_y': mu_y, 'sigma': sigma, 'sigma_y': sigma_y, 'n': n}
+
+
+def _a_coeficientes(gram, b):
+    """Lleva coeficientes estandarizados b a la escala original, con intercepto en la posición 0."""
+    beta = b * gram['sigma_y'] / gram['sigma']
+    return np.concatenate([[gram['mu_y'] - gram['mu_x'] @ beta], beta])
+
+
+def lambda_maximo(stats, l1_ratio=1.0, gram=None):
+    """Menor λ con todos los coeficientes en cero (lasso / elastic net)."""
+    gram = gram or preparar_gram(stats)
+    return float(np.max(np.abs(gram['c'])) / max(l1_ratio, 1e-3))
+
+
+def grilla_lambdas(stats, penalizacion="ridge", l1_ratio=0.5, n_lambdas=50, proporcion_min=1e-4):
+    """Grilla logarítmica decreciente de λ adecuada para la penalización."""
+    gram = preparar_gram(stats)
+    if penalizacion == "ridge":
+        # Escala de los autovalores de G (≈ número de columnas como máximo)
+        maximo = max(float(np.trace(gram['G'])), 1.0) * 10
+    else:
+        maximo = lambda_maximo(stats, 1.0 if penalizacion == "lasso" else l1_ratio, gram)
+    return np.geomspace(maximo, maximo * proporcion_min, n_lambdas)
+
+
+def camino_ridge(stats, lambdas, gram=None):
+    """
+    Ridge para toda la grilla con una sola descomposición de G = V·diag(d)·Vᵀ:
+    b(λ) = V·diag(1/(d + λ))·Vᵀ·c
+
+    Returns:
+        Arreglo (len(lambdas), p) con los coeficientes en escala original
+    """
+    gram = gram or preparar_gram(stats)
+    d, V = np.linalg.eigh(gram['G'])
+    d = np.clip(d, 0, None)
+    Vc = V.T @ gram['c']
+    return np.array([_a_coeficientes(gram, V @ (Vc / (d + lam))) for lam in lambdas])
+
+
+def _descenso_coordenado(G, c, lam, l1_ratio, b, tol, max_iter):
+    # tol es relativa al mayor coeficiente (estandarizado)
+    # Minimiza ½·bᵀGb - cᵀb + λ·(α·||b||₁ + (1-α)/2·||b||²) actualizando una coordenada por vez
+    penal_l1 = lam * l1_ratio
+    penal_l2 = lam * (1 - l1_ratio)
+    diagonal = np.diag(G)
+    gradiente = G @ b  # se mantiene actualizado para que cada paso cueste O(p)
+    for _ in range(max_iter):
+        cambio_max = 0.0
+        for j in range(len(b)):
+            if diagonal[j] == 0:
+                continue
+            rho = c[j] - gradiente[j] + diagonal[j] * b[j]
+            nuevo = np.sign(rho) * max(abs(rho) - penal_l1, 0.0) / (diagonal[j] + penal_l2)
+            delta = nuevo - b[j]
+            if delta != 0.0:
+                gradiente += G[:, j] * delta
+                b[j] = nuevo
+                cambio_max = max(cambio_max, abs(delta))
+        if cambio_max <= tol * max(np.max(np.abs(b)), 1e-12):
+            break
+    return b
+
+
+def camino_elastic_net(stats, lambdas, l1_ratio=1.0, tol=1e-7, max_iter=1000, gram=None):
+    """
+    Lasso (l1_ratio=1) o elastic net por descenso coordenado sobre la Gram estandarizada,
+    recorriendo λ de mayor a menor con arranque en caliente (warm start) desde la solución anterior.
+
+    Returns:
+        Arreglo (len(lambdas), p) con los coeficientes en escala original, en el orden de lambdas
+    """
+    gram = gram or preparar_gram(stats)
+    lambdas = np.asarray(lambdas, dtype=float)
+    orden = np.argsort(-lambdas)
+    b = np.zeros(len(gram['c']))
+    coeficientes = np.zeros((len(lambdas), len(b) + 1))
+    for i in orden:
+        b = _descenso_coordenado(gram['G'], gram['c'], lambdas[i], l1_ratio, b, tol, max_iter)
+        coeficientes[i] = _a_coeficientes(gram, b)
+    return coeficientes
+
+
+def camino_regularizado(stats, penalizacion, lambdas, l1_ratio=0.5, gram=None):
+    if penalizacion == "ridge":
+        return camino_ridge(stats, lambdas, gram)
+    if penalizacion == "lasso":
+        return camino_elastic_net(stats, lambdas, 1.0, gram=gram)
+    if penalizacion == "elastic_net":
+        return camino_elastic_net(stats, lambdas, l1_ratio, gram=gram)
+    raise ValueError(f"Penalización desconocida: {penalizacion}")
+
+
+def resolver_regularizado(stats, penalizacion, lambda_reg, l1_ratio=0.5):
+    """Coeficientes (con intercepto) para un único λ."""
+    return camino_regularizado(stats, penalizacion, [lambda_reg], l1_ratio)[0]
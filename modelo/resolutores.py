@@ -0,0 +1,125 @@
+# modelo/resolutores.py
+import numpy as np
+from utils.instrumentacion import registrar_aviso
+
+SOLVERS_DISPONIBLES = ("auto", "cholesky", "qr", "lstsq", "pinv")
+
+# Umbrales sobre el número de condición de XᵀX ya equilibrada (cond(XᵀX) = cond(X)²)
+UMBRAL_CHOLESKY = 1e8
+UMBRAL_QR = 1e14
+
+
+def _equilibrar(XTX):
+    """Escala de Jacobi: D·XᵀX·D con diagonal unitaria, para que el número de
+    condición refleje la colinealidad y no las unidades (m² vs. intercepto)."""
+    diagonal = np.diag(XTX).copy()
+    diagonal[diagonal <= 0] = 1.0
+    escala = 1.0 / np.sqrt(diagonal)
+    return XTX * np.outer(escala, escala), escala
+
+
+def factorizar_cholesky(XTX):
+    """Cholesky de XᵀX equilibrada y estimación barata de su número de condición.
+
+    (max Lᵢᵢ / min Lᵢᵢ)² acota por debajo a cond(XᵀX): un cociente de pivotes grande
+    delata la colinealidad sin calcular la SVD. Lanza LinAlgError si no es definida positiva.
+    """
+    XTX_eq, escala = _equilibrar(XTX)
+    L = np.linalg.cholesky(XTX_eq)
+    pivotes = np.diag(L)
+    return L, escala, float((pivotes.max() / pivotes.min()) ** 2)
+
+
+def _resolver_cholesky(XTX, XTY, factorizacion=None):
+    L, escala, _ = factorizar_cholesky(XTX) if factorizacion is None else factorizacion
+    z = np.linalg.solve(L, escala * XTY)
+    return escala * np.linalg.solve(L.T, z)
+
+
+def _resolver_qr(X, Y):
+    Q, R = np.linalg.qr(X)
+    return np.linalg.solve(R, Q.T @ Y), R
+
+
+def _resolver_lstsq(XTX, XTY, X=None, Y=None):
+    if X is not None and Y is not None:
+        return np.linalg.lstsq(X, Y, rcond=None)[0]
+    return np.linalg.lstsq(XTX, XTY, rcond=None)[0]
+
+
+def _resolver_pinv(XTX, XTY):
+    return np.linalg.pinv(XTX) @ XTY
+
+
+def numero_condicion(XTX):
+    """Número de condición exacto de XᵀX equilibrada (SVD): sólo a pedido, no en cada ajuste."""
+    XTX_eq, _ = _equilibrar(XTX)
+    return float(np.linalg.cond(XTX_eq))
+
+
+def resolver_ecuaciones_normales(XTX, XTY, solver="auto", X=None, Y=None):
+    """Resuelve XᵀX·β = XᵀY con el método pedido.
+
+    QR y lstsq trabajan sobre X directamente cuando está disponible (no elevan
+    al cuadrado el número de condición); si sólo hay sumas acumuladas
+    (modo incremental) se resuelve sobre XᵀX; solver="qr" cae entonces en lstsq y lo
+    registra como aviso (`valuacion_avisos_total`, log WARNING).
+
+    En 'auto' se intenta primero Cholesky y su cociente de pivotes sirve de
+    estimación del número de condición; la SVD sólo se calcula si Cholesky falla
+    o la estimación supera UMBRAL_CHOLESKY.
+
+    Returns:
+        (coeficientes, solver_usado, numero_condicion): el número de condición es la
+        estimación de Cholesky, el exacto si hizo falta calcularlo, o None si el
+        solver pedido no lo necesitó (ver numero_condicion para calcularlo a pedido)
+    """
+    return resolver_con_factorizacion(XTX, XTY, solver, X, Y)[:3]
+
+
+def resolver_con_factorizacion(XTX, XTY, solver="auto", X=None, Y=None):
+    """Como resolver_ecuaciones_normales, devolviendo además la factorización usada.
+
+    La factorización es ('cholesky', L, escala) con D·XᵀX·D = L·Lᵀ y D = diag(escala),
+    ('qr', R) con XᵀX = RᵀR, o ('svd',) si el ajuste pasó por lstsq/pinv. La
+    inferencia la reutiliza para no volver a factorizar XᵀX.
+
+    Returns:
+        (coeficientes, solver_usado, numero_condicion, factorizacion)
+    """
+    if solver not in SOLVERS_DISPONIBLES:
+        raise ValueError(f"Solver desconocido: {solver}. Opciones: {', '.join(SOLVERS_DISPONIBLES)}")
+
+    hay_datos = X is not None and Y is not None
+    svd = ("svd",)
+
+    if solver == "pinv":
+        return _resolver_pinv(XTX, XTY), "pinv", None, svd
+    if solver == "lstsq":
+        return _resolver_lstsq(XTX, XTY, X, Y), "lstsq", None, svd
+    if solver == "cholesky":
+        L, escala, cond = factorizar_cholesky(XTX)
+        return _resolver_cholesky(XTX, XTY, (L, escala, cond)), "cholesky", cond, ("cholesky", L, escala)
+    if solver == "qr":
+        if hay_datos:
+            beta, R = _resolver_qr(X, Y)
+            return beta, "qr", None, ("qr", R)
+        # QR necesita X: con sólo las sumas (modo incremental, k-fold, bootstrap) se usa lstsq
+        registrar_aviso("resolutores", "solver_qr",
+                        "solver='qr' sin la matriz X: se resuelve con lstsq sobre XᵀX")
+        return _resolver_lstsq(XTX, XTY), "lstsq", None, svd
+
+    # auto: Cholesky si está bien condicionada, QR si es de rango completo, SVD si no
+    try:
+        L, escala, cond = factorizar_cholesky(XTX)
+        if cond < UMBRAL_CHOLESKY:
+            return _resolver_cholesky(XTX, XTY, (L, escala, cond)), "cholesky", cond, ("cholesky", L, escala)
+    except np.linalg.LinAlgError:
+        pass
+    # Cholesky no sirvió (la estimación es cota inferior, así que el exacto también supera
+    # el umbral): sólo en este caso, raro, se paga la SVD para elegir entre QR y lstsq
+    cond = numero_condicion(XTX)
+    if hay_datos and cond < UMBRAL_QR:
+        beta, R = _resolver_qr(X, Y)
+        return beta, "qr", cond, ("qr", R)
+    return _resolver_lstsq(XTX, XTY, X, Y), "lstsq", cond, svd
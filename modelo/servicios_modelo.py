@@ -1,59 +1,109 @@
 # modelo/servicios_modelo.py
 import numpy as np
+from utils.validaciones import COLUMNAS_CARACTERISTICAS, validar_inmueble
 
 def preparar_entrada_prediccion(m2, habitaciones, antiguedad, zona, tipo_propiedad):
     return np.array([[m2, habitaciones, antiguedad, zona, tipo_propiedad]])
 
+def obtener_diagnosticos(modelo, X, Y):
+    """
+    Predicciones, residuos, métricas y coeficientes del modelo sobre (X, Y),
+    memorizados por versión del modelo: mientras no se reentrene ni cambien
+    las matrices, los reruns de Streamlit no vuelven a predecir todo el dataset.
+    """
+    cache = getattr(modelo, '_cache_diagnosticos', None)
+    if (cache is not None and cache['version'] == modelo.version
+            and cache['X'] is X and cache['Y'] is Y):
+        return cache
+    
+    Y_pred = modelo.predecir(X)
+    cache = {
+        'version': modelo.version,
+        'X': X,
+        'Y': Y,
+        'predicciones': Y_pred,
+        'residuos': Y - Y_pred,
+        'metricas': _calcular_metricas(Y, Y_pred),
+        'coeficientes': modelo.obtener_coeficientes()
+    }
+    modelo._cache_diagnosticos = cache
+    return cache
+
+def obtener_diagnosticos_influencia(modelo, X, Y):
+    """Leverage, residuos LOO, PRESS y distancia de Cook, memorizados junto con los diagnósticos"""
+    from .diagnosticos_influencia import calcular_diagnosticos_influencia
+    
+    cache = obtener_diagnosticos(modelo, X, Y)
+    if 'influencia' not in cache:
+        cache['influencia'] = calcular_diagnosticos_influencia(X, Y, modelo=modelo)
+    return cache['influencia']
+
+def obtener_grilla_valuacion(modelo):
+    """Grilla de valuaciones precalculada del modelo, reconstruida sólo cuando cambia su versión"""
+    from .grilla_valuacion import GrillaValuacion
+    
+    grilla = getattr(modelo, '_grilla_valuacion', None)
+    if grilla is None or grilla.version_modelo != modelo.version or not grilla.vigente_para(modelo):
+        grilla = GrillaValuacion.construir(modelo)
+        modelo._grilla_valuacion = grilla
+    return grilla
+
+def predecir_con_grilla(modelo, m2, habitaciones, antiguedad, zona, tipo_propiedad):
+    """Valuación por consulta a la grilla; fuera de sus rangos se predice con el modelo"""
+    precio = obtener_grilla_valuacion(modelo).consultar(m2, habitaciones, antiguedad, zona, tipo_propiedad)
+    if precio is None:
+        precio = modelo.predecir(preparar_entrada_prediccion(m2, habitaciones, antiguedad, zona, tipo_propiedad))[0]
+    return precio
+
+def intervalo_prediccion(modelo, m2, habitaciones, antiguedad, zona, tipo_propiedad, nivel=0.95):
+    """Rango (mínimo, máximo) de precio al nivel dado, o None si el modelo no admite intervalos"""
+    try:
+        resultado = modelo.predecir_con_intervalos(
+            preparar_entrada_prediccion(m2, habitaciones, antiguedad, zona, tipo_propiedad), nivel=nivel)
+    except ValueError:
+        return None
+    return float(resultado['prediccion_inferior'][0]), float(resultado['prediccion_superior'][0])
+
 def obtener_metricas_modelo(modelo, X, Y):
     try:
         if not hasattr(modelo, 'entrenado') or not modelo.entrenado:
             return {'error': 'Modelo no entrenado'}
-
-        Y_pred = modelo.predecir(X)
-        mae = np.mean(np.abs(Y - Y_pred))
-        rmse = np.sqrt(np.mean((Y - Y_pred)**2))
         
-        # Cálculo simple y robusto de R²
-        ss_res = np.sum((Y - Y_pred) ** 2)
-        ss_tot = np.sum((Y - np.mean(Y)) ** 2)
-        r2 = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
-        
-        return {
-            'R²': max(0.0, r2),  # R² nunca negativo
-            'MAE (USD)': mae,
-            'RMSE (USD)': rmse,
-            'precision_porcentaje': max(0.0, r2) * 100
-        }
+        return dict(obtener_diagnosticos(modelo, X, Y)['metricas'])
         
     except Exception as e:
         return {'error': str(e)}
 
+def _calcular_metricas(Y, Y_pred):
+    mae = np.mean(np.abs(Y - Y_pred))
+    rmse = np.sqrt(np.mean((Y - Y_pred)**2))
+    
+    # Cálculo simple y robusto de R²
+    ss_res = np.sum((Y - Y_pred) ** 2)
+    ss_tot = np.sum((Y - np.mean(Y)) ** 2)
+    r2 = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+    
+    return {
+        'R²': max(0.0, r2),  # R² nunca negativo
+        'MAE (USD)': mae,
+        'RMSE (USD)': rmse,
+        'precision_porcentaje': max(0.0, r2) * 100
+    }
+
 def obtener_coeficientes(modelo, dataset=None):
     try:
         if not hasattr(modelo, 'entrenado') or not modelo.entrenado:
             return {'error': 'Modelo no entrenado'}
         
+        cache = getattr(modelo, '_cache_diagnosticos', None)
+        if cache is not None and cache['version'] == modelo.version:
+            return cache['coeficientes']
         return modelo.obtener_coeficientes()
             
     except Exception as e:
         return {'error': str(e)}
 
 def validar_datos_entrada(m2, habitaciones, antiguedad, zona, tipo_propiedad):
-    errores = []
-    
-    if m2 <= 0 or m2 > 1000:
-        errores.append("Metros cuadrados deben ser entre 1 y 1000")
-    
-    if habitaciones <= 0 or habitaciones > 10:
-        errores.append("Habitaciones deben ser entre 1 y 10")
-    
-    if antiguedad < 0 or antiguedad > 100:
-        errores.append("Antigüedad debe ser entre 0 y 100 años")
-    
-    if zona < 1 or zona > 5:
-        errores.append("Zona debe ser entre 1 y 5")
-    
-    if tipo_propiedad not in [1, 2]:
-        errores.append("Tipo de propiedad debe ser 1 (Casa) o 2 (Departamento)")
-    
-    return errores
\ No newline at end of file
+    # Las reglas viven en utils.validaciones: la carga y la valuación masivas usan las mismas
+    valores = dict(zip(COLUMNAS_CARACTERISTICAS, (m2, habitaciones, antiguedad, zona, tipo_propiedad)))
+    return validar_inmueble(valores)
\ No newline at end of file
@@ -1,21 +1,119 @@
 # modelo/validador_modelo.py
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_absolute_error
+from concurrent.futures import ProcessPoolExecutor
 from .regresor_lineal import RegresorLinealMultiple
+from .estadisticas_suficientes import EstadisticasSuficientes
+from .resolutores import resolver_ecuaciones_normales
+from .diagnosticos_influencia import calcular_diagnosticos_influencia
+from .regularizacion import camino_regularizado, grilla_lambdas, preparar_gram, resolver_regularizado
+from .bootstrap import bootstrap_estadisticas, resumir_distribucion, METRICAS_BOOTSTRAP
+from utils.instrumentacion import medir
+
+def _dividir_train_test(X, Y, test_size=0.2, random_state=42):
+    """Partición aleatoria train/test (misma permutación y tamaños que sklearn con un random_state entero)."""
+    X = np.asarray(X)
+    Y = np.asarray(Y)
+    n = len(Y)
+    n_prueba = int(np.ceil(test_size * n)) if isinstance(test_size, float) else int(test_size)
+    permutacion = np.random.RandomState(random_state).permutation(n)
+    prueba, entrenamiento = permutacion[:n_prueba], permutacion[n_prueba:]
+    return X[entrenamiento], X[prueba], Y[entrenamiento], Y[prueba]
+
+def _r2(Y, Y_pred):
+    Y = np.asarray(Y, dtype=float).ravel()
+    ss_res = float(np.sum((Y - np.asarray(Y_pred, dtype=float).ravel()) ** 2))
+    ss_tot = float(np.sum((Y - Y.mean()) ** 2))
+    if ss_tot == 0:
+        return 1.0 if ss_res == 0 else 0.0
+    return 1 - ss_res / ss_tot
+
+def _error_absoluto_medio(Y, Y_pred):
+    return float(np.mean(np.abs(np.asarray(Y, dtype=float).ravel() - np.asarray(Y_pred, dtype=float).ravel())))
+
+def _evaluar_fold(stats_total, X_fold, Y_fold, configuracion):
+    """Ajusta con (total - fold) y evalúa sobre el fold: ninguna fila se vuelve a recorrer para entrenar.
+    
+    configuracion lleva solver, penalizacion, lambda_reg y l1_ratio del modelo validado."""
+    stats_fold = EstadisticasSuficientes.desde_datos(X_fold, Y_fold)
+    stats_train = stats_total - stats_fold
+    if configuracion['penalizacion'] is not None and configuracion['lambda_reg'] > 0:
+        beta = resolver_regularizado(stats_train, configuracion['penalizacion'],
+                                     configuracion['lambda_reg'], configuracion['l1_ratio'])
+    else:
+        beta, _, _ = resolver_ecuaciones_normales(stats_train.XTX, stats_train.XTY, configuracion['solver'])
+    
+    Y_pred = X_fold @ beta
+    metricas_prueba = stats_fold.metricas(beta)
+    return {
+        'r2_entrenamiento': stats_train.metricas(beta)['r2'],
+        'r2_prueba': metricas_prueba['r2'],
+        'rmse_prueba': metricas_prueba['rmse'],
+        'mae_prueba': float(np.mean(np.abs(Y_fold - Y_pred))),
+        'tamano_entrenamiento': stats_train.n,
+        'tamano_prueba': stats_fold.n
+    }, Y_pred
+
+def _evaluar_fold_reentrenando(modelo, X_train, Y_train, X_fold, Y_fold):
+    """Para modelos sin estadísticas suficientes únicas (p. ej. ModeloSegmentado): entrena el clon con el resto."""
+    if not modelo.entrenar(X_train, Y_train, verbose=False):
+        raise RuntimeError("El entrenamiento de un fold falló")
+    Y_pred = modelo.predecir(X_fold)
+    return {
+        'r2_entrenamiento': _r2(Y_train, modelo.predecir(X_train)),
+        'r2_prueba': _r2(Y_fold, Y_pred),
+        'rmse_prueba': float(np.sqrt(np.mean((Y_fold - Y_pred) ** 2))),
+        'mae_prueba': _error_absoluto_medio(Y_fold, Y_pred),
+        'tamano_entrenamiento': len(Y_train),
+        'tamano_prueba': len(Y_fold)
+    }, Y_pred
+
+def _resumir_folds(folds, claves):
+    media = {clave: round(float(np.mean([f[clave] for f in folds])), 4) for clave in claves}
+    desvio = {clave: round(float(np.std([f[clave] for f in folds], ddof=1)) if len(folds) > 1 else 0.0, 4)
+              for clave in claves}
+    return media, desvio
 
 class ValidadorModelo:
     def __init__(self, regresor):
         self.regresor = regresor
         self.resultados = []
     
+    def _nuevo_modelo(self):
+        """Modelo sin entrenar con la misma configuración (solver, penalización, pipeline) que el validado."""
+        if hasattr(self.regresor, 'sin_entrenar'):
+            # Modelos compuestos (p. ej. ModeloSegmentado) saben clonarse
+            return self.regresor.sin_entrenar()
+        return RegresorLinealMultiple(
+            solver=getattr(self.regresor, 'solver', 'auto'),
+            penalizacion=getattr(self.regresor, 'penalizacion', None),
+            lambda_reg=getattr(self.regresor, 'lambda_reg', 0.0),
+            l1_ratio=getattr(self.regresor, 'l1_ratio', 0.5),
+            pipeline=getattr(self.regresor, 'pipeline', None)
+        )
+    
+    def _configuracion(self):
+        """solver y regularización del modelo validado, para los ajustes que no pasan por un clon."""
+        return {
+            'solver': getattr(self.regresor, 'solver', 'auto'),
+            'penalizacion': getattr(self.regresor, 'penalizacion', None),
+            'lambda_reg': getattr(self.regresor, 'lambda_reg', 0.0),
+            'l1_ratio': getattr(self.regresor, 'l1_ratio', 0.5)
+        }
+    
+    def _disenar(self, X):
+        """Matriz de diseño con intercepto, compacta si el modelo usa un pipeline de características."""
+        if getattr(self.regresor, 'pipeline', None) is not None:
+            return self.regresor.pipeline.transformar(X)
+        return np.column_stack([np.ones(len(X)), np.asarray(X, dtype=float)])
+    
+    @medir('validacion', tipo='train_test')
     def validacion_train_test(self, X, Y, test_size=0.2, random_state=42):
         try:
-            X_train, X_test, Y_train, Y_test = train_test_split(
+            X_train, X_test, Y_train, Y_test = _dividir_train_test(
                 X, Y, test_size=test_size, random_state=random_state
             )
             
-            modelo_temp = RegresorLinealMultiple()
+            modelo_temp = self._nuevo_modelo()
             success = modelo_temp.entrenar(X_train, Y_train, verbose=False)
             
             if not success:
@@ -25,12 +123,12 @@ class ValidadorModelo:
             Y_pred_train = modelo_temp.predecir(X_train)
             
             # ✅ LÍNEAS CORREGIDAS:
-            r2_test = r2_score(Y_test, Y_pred_test)
-            r2_train = r2_score(Y_train, Y_pred_train)
+            r2_test = _r2(Y_test, Y_pred_test)
+            r2_train = _r2(Y_train, Y_pred_train)
             r2_test = max(0, r2_test)   # Solo si es negativo
             r2_train = max(0, r2_train) # Solo si es negativo
             
-            mae_test = mean_absolute_error(Y_test, Y_pred_test)
+            mae_test = _error_absoluto_medio(Y_test, Y_pred_test)
             
             resultado = {
                 'r2_entrenamiento': round(r2_train, 4),
@@ -46,6 +144,246 @@ class ValidadorModelo:
         except Exception as e:
             return {'error': f'Validación falló: {str(e)}'}
     
+    @medir('validacion', tipo='k_fold')
+    def validacion_k_fold(self, X, Y, k=5, repeticiones=1, random_state=42, n_procesos=None):
+        """
+        Validación cruzada k-fold (repetida si repeticiones > 1) sobre estadísticas suficientes.
+        
+        XᵀX y XᵀY se calculan una sola vez sobre todos los datos; cada fold se entrena
+        con el total menos la contribución del fold retenido, así que ningún fold se
+        reajusta desde las filas crudas. Cada fold usa el solver, la regularización y
+        el pipeline del modelo validado; los modelos compuestos (con sin_entrenar, como
+        ModeloSegmentado) se reentrenan por fold con un clon. Con n_procesos > 1 los
+        folds se evalúan en un pool de procesos.
+        
+        Returns:
+            Diccionario con las métricas por fold, su media y desvío estándar y
+            las métricas agregadas de las predicciones fuera de muestra.
+        """
+        try:
+            X = np.asarray(X, dtype=float)
+            Y = np.asarray(Y, dtype=float).ravel()
+            n = len(Y)
+            if k < 2 or k > n:
+                return {'error': f'k debe estar entre 2 y {n}'}
+            
+            particiones = []
+            for repeticion in range(repeticiones):
+                rng = np.random.RandomState(random_state + repeticion)
+                for indices in np.array_split(rng.permutation(n), k):
+                    particiones.append((repeticion, indices))
+            
+            if hasattr(self.regresor, 'sin_entrenar'):
+                evaluar = _evaluar_fold_reentrenando
+                argumentos = []
+                for _, idx in particiones:
+                    entrenamiento = np.ones(n, dtype=bool)
+                    entrenamiento[idx] = False
+                    argumentos.append((self._nuevo_modelo(), X[entrenamiento], Y[entrenamiento], X[idx], Y[idx]))
+            else:
+                evaluar = _evaluar_fold
+                configuracion = self._configuracion()
+                stats_total = EstadisticasSuficientes.desde_datos(self._disenar(X), Y)
+                argumentos = [(stats_total, self._disenar(X[idx]), Y[idx], configuracion) for _, idx in particiones]
+            if n_procesos and n_procesos > 1:
+                with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+                    salidas = list(pool.map(evaluar, *zip(*argumentos)))
+            else:
+                salidas = [evaluar(*args) for args in argumentos]
+            
+            folds = []
+            Y_fuera_muestra = np.zeros((repeticiones, n))
+            for (repeticion, indices), (metricas, Y_pred) in zip(particiones, salidas):
+                folds.append(dict(metricas, repeticion=repeticion))
+                Y_fuera_muestra[repeticion, indices] = Y_pred
+            
+            claves = ['r2_entrenamiento', 'r2_prueba', 'rmse_prueba', 'mae_prueba']
+            media, desvio = _resumir_folds(folds, claves)
+            
+            # Métricas sobre todas las predicciones fuera de muestra (útil con folds chicos o LOO)
+            errores = Y_fuera_muestra - Y
+            ss_tot = np.sum((Y - Y.mean()) ** 2)
+            press = float(np.mean(np.sum(errores ** 2, axis=1)))
+            agregado = {
+                'r2_prueba': round(float(max(0.0, 1 - press / ss_tot)) if ss_tot > 0 else 0.0, 4),
+                'mae_prueba': round(float(np.mean(np.abs(errores))), 2),
+                'rmse_prueba': round(float(np.sqrt(press / n)), 2)
+            }
+            
+            tipo = 'leave-one-out' if k == n else (f'{repeticiones}x{k}-fold' if repeticiones > 1 else f'{k}-fold')
+            resultado = {
+                'tipo': tipo,
+                'k': k,
+                'repeticiones': repeticiones,
+                'folds': folds,
+                'media': media,
+                'desvio': desvio,
+                'agregado': agregado,
+                # Claves comunes con validacion_train_test para el resumen
+                'r2_entrenamiento': media['r2_entrenamiento'],
+                'r2_prueba': agregado['r2_prueba'] if k == n else media['r2_prueba'],
+                'mae_prueba': agregado['mae_prueba'] if k == n else media['mae_prueba']
+            }
+            if k < n:
+                resultado['r2_prueba_desvio'] = desvio['r2_prueba']
+            
+            self.resultados.append(resultado)
+            return resultado
+            
+        except Exception as e:
+            return {'error': f'Validación cruzada falló: {str(e)}'}
+    
+    @medir('validacion', tipo='leave_one_out')
+    def validacion_leave_one_out(self, X, Y, n_procesos=None, forma_cerrada=True):
+        """
+        Leave-one-out. Por defecto en forma cerrada con la matriz sombrero (sin
+        reajustes, O(n·p²)); con forma_cerrada=False se hace como k-fold con k = n.
+        """
+        if not forma_cerrada:
+            return self.validacion_k_fold(X, Y, k=len(Y), repeticiones=1, n_procesos=n_procesos)
+        
+        try:
+            modelo = self.regresor if getattr(self.regresor, 'entrenado', False) else None
+            diag = calcular_diagnosticos_influencia(X, Y, modelo=modelo)
+            Y = np.asarray(Y, dtype=float).ravel()
+            ss_tot = np.sum((Y - Y.mean()) ** 2)
+            ss_res = float(diag['residuos'] @ diag['residuos'])
+            
+            resultado = {
+                'tipo': 'leave-one-out (forma cerrada)',
+                'r2_entrenamiento': round(float(max(0.0, 1 - ss_res / ss_tot)) if ss_tot > 0 else 0.0, 4),
+                'r2_prueba': round(diag['r2_prediccion'], 4),
+                'mae_prueba': round(diag['mae_loo'], 2),
+                'rmse_prueba': round(diag['rmse_loo'], 2),
+                'press': round(diag['press'], 2),
+                'observaciones_influyentes': int(len(diag['indices_influyentes'])),
+                'tamano_entrenamiento': len(Y) - 1,
+                'tamano_prueba': 1
+            }
+            
+            self.resultados.append(resultado)
+            return resultado
+            
+        except Exception as e:
+            return {'error': f'Validación LOO falló: {str(e)}'}
+    
+    @medir('validacion', tipo='bootstrap')
+    def validacion_bootstrap(self, X, Y, replicas=1000, nivel=0.95, semilla=42, n_procesos=None):
+        """
+        Bootstrap de filas: distribución de coeficientes y métricas en `replicas` remuestreos.
+        
+        Cada réplica se ajusta con estadísticas suficientes ponderadas por los conteos
+        multinomiales del remuestreo (ver modelo/bootstrap.py); las métricas de prueba
+        se miden sobre las filas que quedaron fuera de la bolsa. El resultado sólo
+        depende de la semilla, no de n_procesos.
+        
+        Returns:
+            Diccionario con media, desvío e intervalo percentil de cada coeficiente y
+            métrica, y las claves comunes con las demás validaciones
+        """
+        try:
+            X = np.asarray(X, dtype=float)
+            Y = np.asarray(Y, dtype=float).ravel()
+            diseno = self._disenar(X)
+            if not isinstance(diseno, np.ndarray):
+                diseno = diseno.a_densa()
+            
+            coeficientes, metricas = bootstrap_estadisticas(
+                diseno, Y, replicas=replicas, semilla=semilla, n_procesos=n_procesos, **self._configuracion()
+            )
+            
+            if hasattr(self.regresor, '_nombres_coeficientes'):
+                nombres = self.regresor._nombres_coeficientes()
+            else:
+                nombres = [f"β{i}" for i in range(coeficientes.shape[1])]
+            resumen_coeficientes = {nombre: resumir_distribucion(coeficientes[:, i], nivel)
+                                    for i, nombre in enumerate(nombres[:coeficientes.shape[1]])}
+            resumen_metricas = {nombre: resumir_distribucion(metricas[nombre], nivel)
+                                for nombre in METRICAS_BOOTSTRAP}
+            
+            resultado = {
+                'tipo': f'bootstrap ({replicas} réplicas)',
+                'replicas': replicas,
+                'nivel': nivel,
+                'semilla': semilla,
+                'coeficientes': resumen_coeficientes,
+                'metricas': resumen_metricas,
+                'distribucion_coeficientes': coeficientes,
+                'distribucion_metricas': metricas,
+                # Claves comunes con validacion_train_test para el resumen
+                'r2_entrenamiento': round(resumen_metricas['r2']['media'], 4),
+                'r2_prueba': round(resumen_metricas['r2_fuera_bolsa']['media'], 4),
+                'r2_prueba_desvio': round(resumen_metricas['r2_fuera_bolsa']['desvio'], 4),
+                'mae_prueba': round(resumen_metricas['mae_fuera_bolsa']['media'], 2)
+            }
+            
+            self.resultados.append(resultado)
+            return resultado
+            
+        except Exception as e:
+            return {'error': f'Bootstrap falló: {str(e)}'}
+    
+    @medir('validacion', tipo='regularizacion')
+    def buscar_regularizacion(self, X, Y, penalizacion="ridge", lambdas=None, k=5, l1_ratio=0.5,
+                              random_state=42):
+        """
+        Búsqueda de λ por validación cruzada k-fold para ridge, lasso o elastic net.
+        
+        Cada fold se entrena con las estadísticas (total - fold): ridge recorre toda la
+        grilla con una sola descomposición espectral de la Gram del fold, y lasso /
+        elastic net usan descenso coordenado con arranque en caliente a lo largo del
+        camino de λ. El error de cada λ sobre el fold retenido también se obtiene de
+        sus estadísticas (ΣY² - 2βᵀXᵀY + βᵀXᵀXβ), sin predecir fila por fila.
+        
+        Returns:
+            Diccionario con la grilla, el MSE medio y su desvío por λ, el λ óptimo,
+            el λ de "un error estándar" y los coeficientes ajustados con el λ óptimo
+        """
+        try:
+            X = np.asarray(X, dtype=float)
+            Y = np.asarray(Y, dtype=float).ravel()
+            n = len(Y)
+            if k < 2 or k > n:
+                return {'error': f'k debe estar entre 2 y {n}'}
+            
+            stats_total = EstadisticasSuficientes.desde_datos(self._disenar(X), Y)
+            if lambdas is None:
+                lambdas = grilla_lambdas(stats_total, penalizacion, l1_ratio)
+            lambdas = np.asarray(lambdas, dtype=float)
+            
+            rng = np.random.RandomState(random_state)
+            mse = np.zeros((k, len(lambdas)))
+            for i, indices in enumerate(np.array_split(rng.permutation(n), k)):
+                stats_fold = EstadisticasSuficientes.desde_datos(self._disenar(X[indices]), Y[indices])
+                stats_train = stats_total - stats_fold
+                camino = camino_regularizado(stats_train, penalizacion, lambdas, l1_ratio)
+                mse[i] = [stats_fold.suma_cuadrados_residuos(beta) / stats_fold.n for beta in camino]
+            
+            mse_medio = mse.mean(axis=0)
+            mse_error = mse.std(axis=0, ddof=1) / np.sqrt(k)
+            mejor = int(np.argmin(mse_medio))
+            # Regla de un error estándar: el λ más grande cuyo error no supera mínimo + 1 EE
+            candidatos = np.where(mse_medio <= mse_medio[mejor] + mse_error[mejor])[0]
+            uno_se = int(candidatos[np.argmax(lambdas[candidatos])])
+            
+            coeficientes = camino_regularizado(stats_total, penalizacion, [lambdas[mejor]], l1_ratio,
+                                               gram=preparar_gram(stats_total))[0]
+            return {
+                'penalizacion': penalizacion,
+                'l1_ratio': l1_ratio if penalizacion == 'elastic_net' else None,
+                'k': k,
+                'lambdas': lambdas,
+                'mse_medio': mse_medio,
+                'mse_desvio': mse.std(axis=0, ddof=1),
+                'mejor_lambda': float(lambdas[mejor]),
+                'lambda_1se': float(lambdas[uno_se]),
+                'rmse_mejor': round(float(np.sqrt(mse_medio[mejor])), 2),
+                'coeficientes': coeficientes
+            }
+            
+        except Exception as e:
+            return {'error': f'Búsqueda de regularización falló: {str(e)}'}
+    
     def obtener_resumen_validacion(self):
         if not self.resultados:
             return "No hay validaciones"
@@ -55,8 +393,17 @@ class ValidadorModelo:
             if 'error' in res:
                 resumen += f"{i}. Error: {res['error']}\n"
             else:
-                resumen += f"{i}. R² Entrenamiento: {res['r2_entrenamiento']}\n"
-                resumen += f"   R² Prueba: {res['r2_prueba']}\n"
+                if 'tipo' in res:
+                    # El bootstrap no es validación cruzada: se informa sólo con su tipo
+                    prefijo = "Validación" if 'replicas' in res else "Validación cruzada"
+                    resumen += f"{i}. {prefijo} {res['tipo']}\n"
+                    resumen += f"   R² Entrenamiento: {res['r2_entrenamiento']}\n"
+                else:
+                    resumen += f"{i}. R² Entrenamiento: {res['r2_entrenamiento']}\n"
+                if 'r2_prueba_desvio' in res:
+                    resumen += f"   R² Prueba: {res['r2_prueba']} ± {res['r2_prueba_desvio']}\n"
+                else:
+                    resumen += f"   R² Prueba: {res['r2_prueba']}\n"
                 resumen += f"   MAE Prueba: ${res['mae_prueba']:,.0f} USD\n"
         
         return resumen
\ No newline at end of file
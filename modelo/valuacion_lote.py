@@ -0,0 +1,106 @@
+# modelo/valuacion_lote.py
+import os
+import numpy as np
+import pandas as pd
+from utils.validaciones import COLUMNAS_CARACTERISTICAS, validar_lote_inmuebles
+
+
+def valuar_lote(modelo, df, nivel_intervalo=None):
+    """
+    Valúa un bloque de propiedades con una sola multiplicación matriz-vector
+
+    Args:
+        modelo: RegresorLinealMultiple entrenado
+        df: DataFrame con las columnas de COLUMNAS_CARACTERISTICAS
+        nivel_intervalo: Si se indica (p. ej. 0.95), agrega el intervalo de predicción
+
+    Returns:
+        Copia de df con precio_estimado_usd, precio_m2_usd y error_validacion
+        (las filas inválidas quedan con precio NaN y el motivo del rechazo), más
+        precio_minimo_usd y precio_maximo_usd si se pidió el intervalo
+    """
+    convertido, motivos = validar_lote_inmuebles(df, incluir_precio=False)
+    validas = motivos.isna().to_numpy()
+
+    precios = np.full(len(df), np.nan)
+    minimos = np.full(len(df), np.nan)
+    maximos = np.full(len(df), np.nan)
+    if validas.any():
+        X = convertido[COLUMNAS_CARACTERISTICAS].to_numpy(dtype=float)[validas]
+        if nivel_intervalo is None:
+            precios[validas] = modelo.predecir(X)
+        else:
+            intervalos = modelo.predecir_con_intervalos(X, nivel=nivel_intervalo)
+            precios[validas] = intervalos['prediccion']
+            minimos[validas] = intervalos['prediccion_inferior']
+            maximos[validas] = intervalos['prediccion_superior']
+
+    resultado = df.copy()
+    resultado['precio_estimado_usd'] = np.round(precios, 2)
+    if nivel_intervalo is not None:
+        resultado['precio_minimo_usd'] = np.round(minimos, 2)
+        resultado['precio_maximo_usd'] = np.round(maximos, 2)
+    resultado['precio_m2_usd'] = np.round(precios / convertido['m2'].to_numpy(dtype=float), 2)
+    resultado['error_validacion'] = motivos.to_numpy()
+    return resultado
+
+
+def _leer_por_bloques(ruta, tamano_bloque):
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension == ".csv":
+        yield from pd.read_csv(ruta, chunksize=tamano_bloque)
+    elif extension in (".parquet", ".pq"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            df = pd.read_parquet(ruta)
+            for inicio in range(0, len(df), tamano_bloque):
+                yield df.iloc[inicio:inicio + tamano_bloque]
+            return
+        for batch in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Formato no soportado: {extension} (usar .csv o .parquet)")
+
+
+def valuar_archivo(modelo, ruta_entrada, ruta_salida, tamano_bloque=100000, nivel_intervalo=None):
+    """
+    Valúa una cartera completa leyendo y escribiendo por bloques (CSV o Parquet)
+
+    Returns:
+        Diccionario con la cantidad de filas procesadas, valuadas y rechazadas
+    """
+    if not modelo.entrenado:
+        return {'error': 'Modelo no entrenado'}
+
+    extension_salida = os.path.splitext(ruta_salida)[1].lower()
+    if extension_salida not in (".csv", ".parquet", ".pq"):
+        raise ValueError(f"Formato de salida no soportado: {extension_salida} (usar .csv o .parquet)")
+
+    resumen = {'procesadas': 0, 'valuadas': 0, 'rechazadas': 0}
+    escritor_parquet = None
+    try:
+        for i, bloque in enumerate(_leer_por_bloques(ruta_entrada, tamano_bloque)):
+            resultado = valuar_lote(modelo, bloque, nivel_intervalo)
+            rechazadas = int(resultado['error_validacion'].notna().sum())
+            resumen['procesadas'] += len(resultado)
+            resumen['rechazadas'] += rechazadas
+            resumen['valuadas'] += len(resultado) - rechazadas
+
+            if extension_salida == ".csv":
+                resultado.to_csv(ruta_salida, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                tabla = pa.Table.from_pandas(resultado, preserve_index=False)
+                if escritor_parquet is None:
+                    # Un primer bloque sin rechazos deja error_validacion como columna nula
+                    esquema = pa.schema([pa.field(c.name, pa.string()) if pa.types.is_null(c.type) else c
+                                         for c in tabla.schema])
+                    escritor_parquet = pq.ParquetWriter(ruta_salida, esquema)
+                escritor_parquet.write_table(tabla.cast(escritor_parquet.schema))
+    finally:
+        if escritor_parquet is not None:
+            escritor_parquet.close()
+
+    return resumen
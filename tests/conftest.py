@@ -0,0 +1,34 @@
+# tests/conftest.py
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datos.generador_datos import generar_inmuebles  # noqa: E402
+from datos.pool_conexiones import cerrar_pool  # noqa: E402
+
+COLUMNAS_X = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
+
+
+@pytest.fixture
+def datos():
+    """(X, Y) sintéticos con el esquema de inmuebles, siempre las mismas filas."""
+    df = generar_inmuebles(400, semilla=7)
+    return df[COLUMNAS_X].to_numpy(dtype=float), df['precio_usd'].to_numpy(dtype=float)
+
+
+@pytest.fixture
+def ruta_db(tmp_path):
+    """Ruta de una base SQLite temporal; su pool se cierra al terminar la prueba."""
+    ruta = str(tmp_path / "inmuebles.db")
+    yield ruta
+    cerrar_pool(ruta)
+
+
+def ajuste_denso(X, Y):
+    """Referencia: mínimos cuadrados con lstsq sobre [1 | X]."""
+    X_con_intercepto = np.column_stack([np.ones(len(X)), X])
+    return np.linalg.lstsq(X_con_intercepto, Y, rcond=None)[0]
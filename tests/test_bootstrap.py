@@ -0,0 +1,70 @@
+# tests/test_bootstrap.py
+import numpy as np
+import pytest
+
+from modelo import bootstrap
+from modelo.bootstrap import bootstrap_estadisticas
+from modelo.regresor_lineal import RegresorLinealMultiple
+from modelo.validador_modelo import ValidadorModelo
+
+
+@pytest.fixture
+def diseno_y(datos):
+    X, Y = datos
+    return np.column_stack([np.ones(150), X[:150]]), Y[:150]
+
+
+def test_replicas_coinciden_con_remuestreo_explicito(diseno_y):
+    diseno, Y = diseno_y
+    n = len(Y)
+    coeficientes, metricas = bootstrap_estadisticas(diseno, Y, replicas=20, semilla=5)
+    for i, semilla in enumerate(np.random.SeedSequence(5).spawn(20)):
+        filas = np.random.default_rng(semilla).integers(0, n, n)
+        beta = np.linalg.lstsq(diseno[filas], Y[filas], rcond=None)[0]
+        np.testing.assert_allclose(coeficientes[i], beta, rtol=1e-6)
+        residuos = Y[filas] - diseno[filas] @ beta
+        np.testing.assert_allclose(metricas['mae'][i], np.mean(np.abs(residuos)), rtol=1e-6)
+        np.testing.assert_allclose(metricas['rmse'][i], np.sqrt(np.mean(residuos ** 2)), rtol=1e-6)
+        fuera = np.setdiff1d(np.arange(n), filas)
+        residuos_fuera = Y[fuera] - diseno[fuera] @ beta
+        np.testing.assert_allclose(metricas['rmse_fuera_bolsa'][i], np.sqrt(np.mean(residuos_fuera ** 2)), rtol=1e-6)
+        np.testing.assert_allclose(metricas['mae_fuera_bolsa'][i], np.mean(np.abs(residuos_fuera)), rtol=1e-6)
+
+
+def test_misma_semilla_mismo_resultado(diseno_y):
+    diseno, Y = diseno_y
+    primero = bootstrap_estadisticas(diseno, Y, replicas=30, semilla=9)
+    segundo = bootstrap_estadisticas(diseno, Y, replicas=30, semilla=9)
+    np.testing.assert_array_equal(primero[0], segundo[0])
+    for nombre in bootstrap.METRICAS_BOOTSTRAP:
+        np.testing.assert_array_equal(primero[1][nombre], segundo[1][nombre])
+    otro = bootstrap_estadisticas(diseno, Y, replicas=30, semilla=10)
+    assert not np.allclose(primero[0], otro[0])
+
+
+def test_resultado_no_depende_de_bloques_ni_procesos(diseno_y, monkeypatch):
+    diseno, Y = diseno_y
+    referencia = bootstrap_estadisticas(diseno, Y, replicas=24, semilla=3)
+    paralelo = bootstrap_estadisticas(diseno, Y, replicas=24, semilla=3, n_procesos=2)
+    # Bloques chicos de réplicas y productos calculados por bloques de filas
+    monkeypatch.setattr(bootstrap, 'MAX_ELEMENTOS_PESOS', 5 * len(Y))
+    monkeypatch.setattr(bootstrap, 'MAX_ELEMENTOS_PRODUCTOS', 10 * len(Y))
+    por_bloques = bootstrap_estadisticas(diseno, Y, replicas=24, semilla=3)
+    for otro in (paralelo, por_bloques):
+        np.testing.assert_allclose(otro[0], referencia[0], rtol=1e-9)
+        for nombre in bootstrap.METRICAS_BOOTSTRAP:
+            np.testing.assert_allclose(otro[1][nombre], referencia[1][nombre], rtol=1e-9)
+
+
+def test_validacion_bootstrap_reproducible(datos):
+    X, Y = datos
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar(X, Y, verbose=False)
+    primero = ValidadorModelo(modelo).validacion_bootstrap(X, Y, replicas=40, semilla=1)
+    segundo = ValidadorModelo(modelo).validacion_bootstrap(X, Y, replicas=40, semilla=1)
+    assert 'error' not in primero
+    np.testing.assert_array_equal(primero['distribucion_coeficientes'], segundo['distribucion_coeficientes'])
+    assert primero['coeficientes'] == segundo['coeficientes']
+    # El intervalo percentil de cada coeficiente contiene a la estimación puntual
+    for beta, resumen in zip(modelo.coeficientes, primero['coeficientes'].values()):
+        assert resumen['inferior'] <= beta <= resumen['superior']
@@ -0,0 +1,75 @@
+# tests/test_diagnosticos_influencia.py
+import numpy as np
+import pytest
+
+from modelo.diagnosticos_influencia import calcular_diagnosticos_influencia
+from modelo.pipeline_caracteristicas import PipelineCaracteristicas
+from modelo.regresor_lineal import RegresorLinealMultiple
+from modelo.validador_modelo import ValidadorModelo
+
+
+def _loo_explicito(diseno, Y):
+    """Referencia: n reajustes, cada uno sin una fila."""
+    n, p = diseno.shape
+    beta = np.linalg.lstsq(diseno, Y, rcond=None)[0]
+    residuos = Y - diseno @ beta
+    s2 = residuos @ residuos / (n - p)
+    residuos_loo, cook = np.empty(n), np.empty(n)
+    for i in range(n):
+        resto = np.arange(n) != i
+        beta_i = np.linalg.lstsq(diseno[resto], Y[resto], rcond=None)[0]
+        residuos_loo[i] = Y[i] - diseno[i] @ beta_i
+        cook[i] = np.sum((diseno @ (beta - beta_i)) ** 2) / (p * s2)
+    return residuos_loo, cook
+
+
+@pytest.fixture
+def pocas_filas(datos):
+    X, Y = datos
+    return X[:80], Y[:80]
+
+
+def test_loo_y_press_coinciden_con_reajustes(pocas_filas):
+    X, Y = pocas_filas
+    diseno = np.column_stack([np.ones(len(X)), X])
+    residuos_loo, cook = _loo_explicito(diseno, Y)
+    diag = calcular_diagnosticos_influencia(X, Y)
+    np.testing.assert_allclose(diag['residuos_loo'], residuos_loo, rtol=1e-6)
+    np.testing.assert_allclose(diag['press'], np.sum(residuos_loo ** 2), rtol=1e-8)
+    np.testing.assert_allclose(diag['distancia_cook'], cook, rtol=1e-6)
+    H = diseno @ np.linalg.pinv(diseno)
+    np.testing.assert_allclose(diag['apalancamiento'], np.diag(H), atol=1e-10)
+
+
+def test_reutiliza_el_modelo_sin_cambiar_el_resultado(pocas_filas):
+    X, Y = pocas_filas
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar(X, Y, verbose=False)
+    con_modelo = calcular_diagnosticos_influencia(X, Y, modelo=modelo, tamano_bloque=7)
+    sin_modelo = calcular_diagnosticos_influencia(X, Y)
+    for clave in ('apalancamiento', 'residuos_loo', 'distancia_cook'):
+        np.testing.assert_allclose(con_modelo[clave], sin_modelo[clave], rtol=1e-7)
+
+
+def test_loo_con_pipeline_categorico(pocas_filas):
+    X, Y = pocas_filas
+    modelo = RegresorLinealMultiple(pipeline=PipelineCaracteristicas(grado_polinomio=1, interacciones=False))
+    assert modelo.entrenar(X, Y, verbose=False)
+    diseno = modelo.matriz_diseno(X, densa=True)
+    # Las categorías ausentes de la muestra dejan columnas nulas: se comparan sobre el rango real
+    diseno = diseno[:, np.abs(diseno).sum(axis=0) > 0]
+    residuos_loo, _ = _loo_explicito(diseno, Y)
+    diag = calcular_diagnosticos_influencia(X, Y, modelo=modelo)
+    np.testing.assert_allclose(diag['residuos_loo'], residuos_loo, rtol=1e-6)
+
+
+def test_validacion_loo_cerrada_igual_a_k_fold_con_k_n(pocas_filas):
+    X, Y = pocas_filas
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar(X, Y, verbose=False)
+    cerrada = ValidadorModelo(modelo).validacion_leave_one_out(X, Y)
+    explicita = ValidadorModelo(modelo).validacion_leave_one_out(X, Y, n_procesos=1, forma_cerrada=False)
+    agregado = explicita['agregado']
+    assert cerrada['r2_prueba'] == pytest.approx(agregado['r2_prueba'], abs=1e-4)
+    assert cerrada['rmse_prueba'] == pytest.approx(agregado['rmse_prueba'], abs=0.01)
+    assert cerrada['mae_prueba'] == pytest.approx(agregado['mae_prueba'], abs=0.01)
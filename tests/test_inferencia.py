@@ -0,0 +1,108 @@
+# tests/test_inferencia.py
+import numpy as np
+import pytest
+
+from modelo.inferencia import cuantil_t
+from modelo.pipeline_caracteristicas import PipelineCaracteristicas
+from modelo.regresor_lineal import RegresorLinealMultiple
+
+
+def _referencia_densa(diseno, Y):
+    """β, s² y (XᵀX)⁻¹ con la inversa explícita."""
+    n, p = diseno.shape
+    beta = np.linalg.lstsq(diseno, Y, rcond=None)[0]
+    residuos = Y - diseno @ beta
+    return beta, residuos @ residuos / (n - p), np.linalg.inv(diseno.T @ diseno)
+
+
+@pytest.mark.parametrize("solver,factorizacion", [("auto", "cholesky"), ("cholesky", "cholesky"),
+                                                  ("qr", "qr"), ("lstsq", "svd")])
+def test_errores_e_intervalos_coinciden_con_la_inversa_densa(datos, solver, factorizacion):
+    X, Y = datos
+    modelo = RegresorLinealMultiple(solver=solver)
+    assert modelo.entrenar(X, Y, verbose=False)
+    assert modelo._factorizacion[1][0] == factorizacion
+
+    diseno = np.column_stack([np.ones(len(X)), X])
+    _, s2, inversa = _referencia_densa(diseno, Y)
+    np.testing.assert_allclose(modelo.inferencia().errores_estandar(), np.sqrt(s2 * np.diag(inversa)), rtol=1e-6)
+
+    nuevos = X[:25] * 1.1
+    intervalos = modelo.predecir_con_intervalos(nuevos, nivel=0.9, tamano_bloque=7)
+    diseno_nuevo = np.column_stack([np.ones(len(nuevos)), nuevos])
+    h = np.einsum('ij,jk,ik->i', diseno_nuevo, inversa, diseno_nuevo)
+    t = cuantil_t(0.95, len(Y) - diseno.shape[1])
+    np.testing.assert_allclose(intervalos['error_estandar_media'], np.sqrt(s2 * h), rtol=1e-6)
+    np.testing.assert_allclose(intervalos['prediccion_superior'] - intervalos['prediccion'],
+                               t * np.sqrt(s2 * (1 + h)), rtol=1e-6)
+
+
+def test_inferencia_sigue_a_la_version_del_modelo(datos):
+    X, Y = datos
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar(X[:300], Y[:300], verbose=False)
+    antes = modelo.inferencia()
+    assert modelo.inferencia() is antes
+    assert modelo.actualizar(X[300:], Y[300:])
+    _, s2, inversa = _referencia_densa(np.column_stack([np.ones(len(X)), X]), Y)
+    assert modelo.inferencia() is not antes
+    np.testing.assert_allclose(modelo.inferencia().errores_estandar(), np.sqrt(s2 * np.diag(inversa)), rtol=1e-6)
+
+
+def test_intervalos_con_pipeline(datos):
+    X, Y = datos
+    modelo = RegresorLinealMultiple(pipeline=PipelineCaracteristicas(grado_polinomio=2))
+    assert modelo.entrenar(X, Y, verbose=False)
+    diseno = modelo.matriz_diseno(X, densa=True)
+    _, s2, _ = _referencia_densa(diseno, Y)
+    pseudo = np.linalg.pinv(diseno.T @ diseno)
+    intervalos = modelo.predecir_con_intervalos(X[:30])
+    h = np.einsum('ij,jk,ik->i', diseno[:30], pseudo, diseno[:30])
+    np.testing.assert_allclose(intervalos['error_estandar_media'] ** 2, modelo.inferencia().s2 * h, rtol=1e-5)
+    np.testing.assert_allclose(modelo.inferencia().s2, s2, rtol=1e-6)
+
+
+def test_cobertura_de_los_intervalos():
+    """Con errores normales, los intervalos al 90 % cubren al valor verdadero ~90 % de las veces."""
+    rng = np.random.default_rng(11)
+    n, replicas, nivel = 40, 500, 0.9
+    X = np.column_stack([rng.uniform(40, 300, n), rng.integers(1, 6, n), rng.uniform(0, 40, n)])
+    beta = np.array([20000.0, 2500.0, 8000.0, -900.0])
+    X_nuevo = np.column_stack([rng.uniform(40, 300, 10), rng.integers(1, 6, 10), rng.uniform(0, 40, 10)])
+    media_nueva = beta[0] + X_nuevo @ beta[1:]
+    sigma = 30000.0
+
+    cubre_media = cubre_prediccion = cubre_coeficiente = 0
+    for _ in range(replicas):
+        modelo = RegresorLinealMultiple()
+        assert modelo.entrenar(X, beta[0] + X @ beta[1:] + rng.normal(0, sigma, n), verbose=False)
+        intervalos = modelo.predecir_con_intervalos(X_nuevo, nivel=nivel)
+        observado = media_nueva + rng.normal(0, sigma, len(X_nuevo))
+        cubre_media += np.sum((intervalos['confianza_inferior'] <= media_nueva)
+                              & (media_nueva <= intervalos['confianza_superior']))
+        cubre_prediccion += np.sum((intervalos['prediccion_inferior'] <= observado)
+                                   & (observado <= intervalos['prediccion_superior']))
+        coeficientes = modelo.obtener_inferencia_coeficientes(nivel=nivel)
+        cubre_coeficiente += sum(c['inferior'] <= b <= c['superior'] for c, b in zip(coeficientes.values(), beta))
+
+    # 5000 intervalos por tipo (2000 de coeficientes): ±0,02 son más de 4 errores estándar
+    assert cubre_media / (replicas * 10) == pytest.approx(nivel, abs=0.02)
+    assert cubre_prediccion / (replicas * 10) == pytest.approx(nivel, abs=0.02)
+    assert cubre_coeficiente / (replicas * 4) == pytest.approx(nivel, abs=0.03)
+
+
+def test_cuantil_t_sin_scipy(monkeypatch):
+    import builtins
+    importar = builtins.__import__
+
+    def sin_scipy(nombre, *args, **kwargs):
+        if nombre == 'scipy' or nombre.startswith('scipy.'):
+            raise ImportError(nombre)
+        return importar(nombre, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, '__import__', sin_scipy)
+    # Valores de tabla de la t de Student
+    assert cuantil_t(0.975, 1) == pytest.approx(12.7062, rel=1e-4)
+    assert cuantil_t(0.975, 2) == pytest.approx(4.3027, rel=1e-4)
+    assert cuantil_t(0.975, 10) == pytest.approx(2.2281, rel=1e-3)
+    assert cuantil_t(0.95, 100) == pytest.approx(1.6602, rel=1e-4)
@@ -0,0 +1,107 @@
+# tests/test_log_cambios.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import COLUMNAS_X, ajuste_denso
+from datos.database_manager import MINIMO_LOG_CONJUNTO, DatabaseManager
+from datos.dataset_inmobiliario import DatasetInmobiliario
+from datos.generador_datos import generar_inmuebles
+from interfaz.cache_modelo import CacheModeloCompartido
+from modelo.regresor_lineal import RegresorLinealMultiple
+
+
+@pytest.fixture
+def base(ruta_db):
+    db = DatabaseManager(ruta_db)
+    assert db.insertar_lote(generar_inmuebles(300, semilla=3))['insertados'] == 300
+    return db
+
+
+@pytest.fixture
+def dataset_y_modelo(base, ruta_db):
+    dataset = DatasetInmobiliario(ruta_db)
+    dataset.crear_dataset()
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar(*dataset.obtener_matrices_entrenamiento(), verbose=False)
+    return dataset, modelo
+
+
+def _escrituras_mixtas(db):
+    """Alta, edición y baja lógica desde otra conexión, como otra sesión de la app."""
+    db.insertar_inmueble(120, 3, 5, 2, 1, 250000)
+    db.insertar_inmueble(80, 2, 10, 4, 2, 130000)
+    with db.conexion() as conn:
+        conn.execute("UPDATE inmuebles SET precio_usd = precio_usd * 1.1, m2 = m2 + 5 WHERE id IN (4, 9, 16)")
+        conn.execute("UPDATE inmuebles SET activo = 0 WHERE id IN (2, 30, 301)")
+
+
+def _comparar_con_base(dataset, modelo, db):
+    referencia = db.obtener_inmuebles()
+    pd.testing.assert_frame_equal(dataset.df.reset_index(drop=True), referencia, check_dtype=False)
+    X = referencia[COLUMNAS_X].to_numpy(dtype=float)
+    Y = referencia['precio_usd'].to_numpy(dtype=float)
+    np.testing.assert_allclose(modelo.coeficientes, ajuste_denso(X, Y), rtol=1e-7)
+    assert modelo.estadisticas.n == len(referencia)
+
+
+def test_refresco_incremental_equivale_a_recargar(dataset_y_modelo, base):
+    dataset, modelo = dataset_y_modelo
+    _escrituras_mixtas(base)
+    resumen = dataset.refrescar_cambios(modelo)
+    assert resumen['modelo_actualizado'] and not resumen['recarga_completa']
+    assert resumen['agregadas'] == 5 and resumen['retiradas'] == 6
+    assert dataset.ultimo_cambio == base.ultimo_cambio()
+    _comparar_con_base(dataset, modelo, base)
+    # Sin cambios nuevos el refresco no hace nada
+    assert dataset.refrescar_cambios(modelo)['cambios'] == 0
+
+
+def test_carga_masiva_queda_en_el_log(dataset_y_modelo, base):
+    dataset, modelo = dataset_y_modelo
+    n = MINIMO_LOG_CONJUNTO + 50
+    assert base.insertar_lote(generar_inmuebles(n, semilla=4))['insertados'] == n
+    resumen = dataset.refrescar_cambios(modelo)
+    assert resumen['cambios'] == n and resumen['agregadas'] == n
+    assert resumen['modelo_actualizado'] and resumen['recarga_completa']
+    _comparar_con_base(dataset, modelo, base)
+
+
+def test_hueco_en_el_log_fuerza_la_recarga(dataset_y_modelo, base):
+    dataset, modelo = dataset_y_modelo
+    _escrituras_mixtas(base)
+    base.purgar_cambios(dataset.ultimo_cambio + 2)
+    version = modelo.version
+    resumen = dataset.refrescar_cambios(modelo)
+    assert resumen['recarga_completa'] and not resumen['modelo_actualizado']
+    assert modelo.version == version  # Con deltas incompletos el modelo no se toca
+    pd.testing.assert_frame_equal(dataset.df, base.obtener_inmuebles(), check_dtype=False)
+
+
+def test_cache_refresca_sin_reentrenar_y_reentrena_ante_un_hueco(base, ruta_db):
+    cache = CacheModeloCompartido(ruta_db)
+    modelo, _, _, _ = cache.obtener()
+    coeficientes = modelo.coeficientes.copy()
+    _escrituras_mixtas(base)
+
+    nuevo, dataset, df, validador = cache.obtener()
+    assert (cache.entrenamientos, cache.refrescos) == (1, 1)
+    assert nuevo is not modelo and validador.regresor is nuevo and df is dataset.df
+    np.testing.assert_array_equal(modelo.coeficientes, coeficientes)  # La entrada vieja no cambia
+    _comparar_con_base(dataset, nuevo, base)
+
+    base.insertar_inmueble(150, 3, 2, 1, 2, 400000)
+    base.purgar_cambios(base.ultimo_cambio())
+    base.insertar_inmueble(60, 1, 30, 5, 2, 70000)
+    cache.obtener()
+    assert (cache.entrenamientos, cache.refrescos) == (2, 1)
+
+
+def test_aplicar_cambio_publica_la_escritura(base, ruta_db):
+    cache = CacheModeloCompartido(ruta_db)
+    modelo, _, df, _ = cache.obtener()
+    assert cache.aplicar_cambio('actualizar_propiedad', 5, precio_usd=999000)
+    assert cache.aplicar_cambio('eliminar_propiedad', 6)
+    nuevo, dataset, _, _ = cache.obtener()
+    assert cache.entrenamientos == 1 and nuevo is not modelo and len(df) == 300
+    _comparar_con_base(dataset, nuevo, base)
@@ -0,0 +1,92 @@
+# tests/test_paginacion.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from datos.database_manager import COLUMNAS_INMUEBLE, DatabaseManager
+
+FILTROS = [None, {'zonas': [1, 3], 'precio_min': 150000}, {'tipos': [2], 'm2_max': 100}]
+
+
+@pytest.fixture
+def base_con_empates(ruta_db):
+    """Pocos valores distintos de precio y m²: casi todas las filas empatan con otras."""
+    rng = np.random.default_rng(2)
+    n = 230
+    datos = pd.DataFrame({
+        'm2': rng.choice([60.0, 80.0, 120.0], n),
+        'habitaciones': rng.integers(1, 5, n),
+        'antiguedad': rng.integers(0, 40, n),
+        'zona_categoria': rng.integers(1, 6, n),
+        'tipo_propiedad': rng.integers(1, 3, n),
+        'precio_usd': rng.choice([100000.0, 150000.0, 200000.0, 250000.0], n)
+    })
+    db = DatabaseManager(ruta_db)
+    assert db.insertar_lote(datos)['insertados'] == n
+    with db.conexion() as conn:
+        conn.execute("UPDATE inmuebles SET activo = 0 WHERE id % 9 = 0")
+    return db
+
+
+def _recorrer(db, tamano_pagina, **kwargs):
+    paginas, cursor = [], None
+    while True:
+        pagina = db.obtener_pagina(tamano_pagina=tamano_pagina, despues_de=cursor, **kwargs)
+        paginas.append(pagina['filas'])
+        if not pagina['hay_mas']:
+            assert pagina['siguiente'] is None
+            return pd.concat(paginas, ignore_index=True), len(paginas)
+        cursor = pagina['siguiente']
+
+
+def _referencia(db, filtros, orden, descendente):
+    """Filtro y orden (orden, id) hechos en pandas sobre la tabla completa."""
+    df = db.obtener_inmuebles()[COLUMNAS_INMUEBLE]
+    filtros = filtros or {}
+    if filtros.get('zonas'):
+        df = df[df['zona_categoria'].isin(filtros['zonas'])]
+    if filtros.get('tipos'):
+        df = df[df['tipo_propiedad'].isin(filtros['tipos'])]
+    if filtros.get('precio_min') is not None:
+        df = df[df['precio_usd'] >= filtros['precio_min']]
+    if filtros.get('m2_max') is not None:
+        df = df[df['m2'] <= filtros['m2_max']]
+    claves = [orden, 'id'] if orden != 'id' else ['id']
+    return df.sort_values(claves, ascending=not descendente).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("orden", ['id', 'precio_usd', 'm2'])
+@pytest.mark.parametrize("descendente", [False, True])
+@pytest.mark.parametrize("filtros", FILTROS)
+def test_paginas_recorren_todo_sin_repetir_ni_saltear(base_con_empates, orden, descendente, filtros):
+    recorrido, paginas = _recorrer(base_con_empates, 17, filtros=filtros, orden=orden, descendente=descendente)
+    referencia = _referencia(base_con_empates, filtros, orden, descendente)
+    assert recorrido['id'].is_unique
+    pd.testing.assert_frame_equal(recorrido, referencia, check_dtype=False)
+    assert base_con_empates.contar_inmuebles(filtros) == len(referencia)
+    assert paginas == max(1, -(-len(referencia) // 17))
+
+
+def test_escrituras_entre_paginas_no_desplazan_el_cursor(base_con_empates):
+    db = base_con_empates
+    antes = _referencia(db, None, 'precio_usd', False)
+    primera = db.obtener_pagina(orden='precio_usd', tamano_pagina=40)
+    # Altas con el mismo precio que la primera página ya vista: con OFFSET correrían las filas siguientes
+    precio_visto = float(primera['filas']['precio_usd'].iloc[0])
+    for _ in range(5):
+        db.insertar_inmueble(70, 2, 5, 2, 1, precio_visto)
+    cursor, filas = primera['siguiente'], [primera['filas']]
+    while cursor is not None:
+        pagina = db.obtener_pagina(orden='precio_usd', tamano_pagina=40, despues_de=cursor)
+        filas.append(pagina['filas'])
+        cursor = pagina['siguiente']
+    recorrido = pd.concat(filas, ignore_index=True)
+    assert recorrido['id'].is_unique
+    # Todas las filas que existían antes aparecen, en su orden
+    vistas = recorrido[recorrido['id'].isin(antes['id'])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(vistas, antes, check_dtype=False)
+
+
+def test_orden_no_permitido(base_con_empates):
+    with pytest.raises(ValueError):
+        base_con_empates.obtener_pagina(orden='precio_usd; DROP TABLE inmuebles')
@@ -0,0 +1,124 @@
+# tests/test_registro_modelos.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+from modelo.regresor_lineal import RegresorLinealMultiple
+from modelo.registro_modelos import RegistroModelos
+
+
+def _modelo(X, Y, filas=400):
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar(X[:filas], Y[:filas], verbose=False)
+    return modelo
+
+
+def _registrar_en_proceso(directorio, veces):
+    rng = np.random.default_rng(os.getpid())
+    X = rng.normal(size=(50, 5))
+    registro = RegistroModelos(directorio, max_versiones=1000)
+    return [registro.registrar(_modelo(X, X @ np.arange(1, 6) + rng.normal(size=50))) for _ in range(veces)]
+
+
+def test_cargar_reproduce_el_modelo(datos, tmp_path):
+    X, Y = datos
+    modelo = _modelo(X, Y)
+    registro = RegistroModelos(str(tmp_path))
+    version = registro.registrar(modelo, huella_datos=("base", 7))
+    cargado = registro.cargar(version)
+    np.testing.assert_array_equal(cargado.coeficientes, modelo.coeficientes)
+    np.testing.assert_array_equal(cargado.predecir(X), modelo.predecir(X))
+    np.testing.assert_allclose(cargado.inferencia().errores_estandar(), modelo.inferencia().errores_estandar(),
+                               rtol=1e-10)
+    assert registro.listar_versiones()[0]['huella_datos'] == ["base", 7]
+
+
+def test_retencion_conserva_las_ultimas_y_la_fijada(datos, tmp_path):
+    X, Y = datos
+    registro = RegistroModelos(str(tmp_path), max_versiones=3)
+    registro.registrar(_modelo(X, Y, 100))
+    registro.fijar(1)
+    for filas in range(150, 400, 50):
+        registro.registrar(_modelo(X, Y, filas))
+    versiones = [v['version'] for v in registro.listar_versiones()]
+    assert versiones == [1, 4, 5, 6]
+    assert sorted(f for f in os.listdir(tmp_path) if f.endswith('.npz')) == [
+        'v0001.npz', 'v0004.npz', 'v0005.npz', 'v0006.npz']
+    # Los números podados no se reutilizan
+    registro.desfijar()
+    assert registro.registrar(_modelo(X, Y)) == 7
+    assert [v['version'] for v in registro.listar_versiones()] == [5, 6, 7]
+
+
+def test_rollback_fija_la_version_anterior(datos, tmp_path):
+    X, Y = datos
+    registro = RegistroModelos(str(tmp_path))
+    modelos = [_modelo(X, Y, filas) for filas in (200, 300, 400)]
+    for modelo in modelos:
+        registro.registrar(modelo)
+    assert registro.rollback() == 2
+    assert registro.rollback() == 1
+    with pytest.raises(ValueError):
+        registro.rollback()
+    np.testing.assert_array_equal(registro.cargar().coeficientes, modelos[0].coeficientes)
+    registro.desfijar()
+    assert registro.version_vigente() == 3
+
+
+def test_obtener_o_entrenar_respeta_huella_y_origen(datos, tmp_path):
+    X, Y = datos
+    registro = RegistroModelos(str(tmp_path))
+    entrenamientos = []
+
+    def entrenar():
+        entrenamientos.append(1)
+        return _modelo(X, Y), None
+
+    registro.obtener_o_entrenar(("a", 5), entrenar, "base_a.db")
+    registro.obtener_o_entrenar(("a", 5), entrenar, "base_a.db")
+    assert len(entrenamientos) == 1
+    registro.obtener_o_entrenar(("a", 6), entrenar, "base_a.db")
+    assert len(entrenamientos) == 2
+    # Misma huella pero otra base: no se reutiliza, ni siquiera fijada
+    registro.fijar(1)
+    registro.obtener_o_entrenar(("a", 5), entrenar, "base_b.db")
+    assert len(entrenamientos) == 3
+    assert registro.listar_versiones()[-1]['origen_datos'] == os.path.abspath("base_b.db")
+
+
+def test_registro_concurrente_entre_hilos(datos, tmp_path):
+    X, Y = datos
+    registro = RegistroModelos(str(tmp_path), max_versiones=1000)
+    versiones, errores = [], []
+
+    def trabajar():
+        try:
+            for _ in range(3):
+                versiones.append(registro.registrar(_modelo(X, Y, 100)))
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=trabajar) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert not errores
+    assert sorted(versiones) == list(range(1, 25))
+    assert [v['version'] for v in registro.listar_versiones()] == list(range(1, 25))
+
+
+@pytest.mark.skipif("fork" not in multiprocessing.get_all_start_methods(), reason="requiere fork")
+def test_registro_concurrente_entre_procesos(tmp_path):
+    contexto = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=4, mp_context=contexto) as ejecutor:
+        resultados = list(ejecutor.map(_registrar_en_proceso, [str(tmp_path)] * 4, [5] * 4))
+    versiones = sorted(v for lista in resultados for v in lista)
+    assert versiones == list(range(1, 21))
+    registro = RegistroModelos(str(tmp_path))
+    assert [v['version'] for v in registro.listar_versiones()] == list(range(1, 21))
+    assert all(os.path.exists(os.path.join(tmp_path, v['archivo'])) for v in registro.listar_versiones())
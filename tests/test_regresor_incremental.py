@@ -0,0 +1,65 @@
+# tests/test_regresor_incremental.py
+import numpy as np
+
+from conftest import ajuste_denso
+from modelo.regresor_lineal import RegresorLinealMultiple
+
+
+def _entrenado(X, Y):
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar(X, Y, verbose=False)
+    return modelo
+
+
+def test_actualizar_equivale_a_reentrenar(datos):
+    X, Y = datos
+    modelo = _entrenado(X[:300], Y[:300])
+    assert modelo.actualizar(X[300:], Y[300:])
+    np.testing.assert_allclose(modelo.coeficientes, ajuste_denso(X, Y), rtol=1e-7)
+    referencia = _entrenado(X, Y)
+    np.testing.assert_allclose(modelo.r2, referencia.r2, atol=1e-10)
+    np.testing.assert_allclose(modelo.rmse, referencia.rmse, rtol=1e-9)
+    assert modelo.mae_requiere_recalculo
+
+
+def test_actualizar_de_a_una_fila(datos):
+    X, Y = datos
+    modelo = _entrenado(X[:350], Y[:350])
+    for fila in range(350, 400):
+        assert modelo.actualizar(X[fila], Y[fila:fila + 1])
+    np.testing.assert_allclose(modelo.coeficientes, ajuste_denso(X, Y), rtol=1e-7)
+    assert modelo.estadisticas.n == 400
+
+
+def test_retirar_equivale_a_reentrenar_sin_las_filas(datos):
+    X, Y = datos
+    modelo = _entrenado(X, Y)
+    retiradas = np.arange(0, 400, 7)
+    assert modelo.retirar(X[retiradas], Y[retiradas])
+    quedan = np.setdiff1d(np.arange(400), retiradas)
+    np.testing.assert_allclose(modelo.coeficientes, ajuste_denso(X[quedan], Y[quedan]), rtol=1e-7)
+    assert modelo.estadisticas.n == len(quedan)
+
+
+def test_retirar_todo_deja_el_modelo_sin_entrenar(datos):
+    X, Y = datos
+    modelo = _entrenado(X[:20], Y[:20])
+    assert modelo.retirar(X[:20], Y[:20])
+    assert not modelo.entrenado and modelo.estadisticas is None
+
+
+def test_entrenar_por_lotes_equivale_al_ajuste_completo(datos):
+    X, Y = datos
+    modelo = RegresorLinealMultiple()
+    assert modelo.entrenar_por_lotes(((X[i:i + 64], Y[i:i + 64]) for i in range(0, 400, 64)), verbose=False)
+    np.testing.assert_allclose(modelo.coeficientes, ajuste_denso(X, Y), rtol=1e-7)
+
+
+def test_copiar_no_comparte_estadisticas(datos):
+    X, Y = datos
+    modelo = _entrenado(X[:300], Y[:300])
+    coeficientes = modelo.coeficientes.copy()
+    copia = modelo.copiar()
+    assert copia.actualizar(X[300:], Y[300:])
+    np.testing.assert_array_equal(modelo.coeficientes, coeficientes)
+    assert modelo.estadisticas.n == 300 and copia.estadisticas.n == 400
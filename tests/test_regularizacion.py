@@ -0,0 +1,99 @@
+# tests/test_regularizacion.py
+import numpy as np
+import pytest
+
+from conftest import ajuste_denso
+from modelo.estadisticas_suficientes import EstadisticasSuficientes
+from modelo.regresor_lineal import RegresorLinealMultiple
+from modelo.regularizacion import (camino_elastic_net, camino_ridge, grilla_lambdas, lambda_maximo,
+                                   resolver_regularizado)
+from modelo.validador_modelo import ValidadorModelo
+
+
+def _estadisticas(X, Y):
+    return EstadisticasSuficientes.desde_datos(np.column_stack([np.ones(len(X)), X]), Y)
+
+
+def _estandarizar(X, Y):
+    """Z e y estandarizadas explícitamente (desvío poblacional), como referencia densa."""
+    mu, sigma = X.mean(axis=0), X.std(axis=0)
+    return (X - mu) / sigma, (Y - Y.mean()) / Y.std(), sigma, Y.std()
+
+
+def _ridge_denso(X, Y, lam):
+    Z, y, sigma, sigma_y = _estandarizar(X, Y)
+    n, p = Z.shape
+    b = np.linalg.solve(Z.T @ Z / n + lam * np.eye(p), Z.T @ y / n)
+    beta = b * sigma_y / sigma
+    return np.concatenate([[Y.mean() - X.mean(axis=0) @ beta], beta])
+
+
+def _violacion_kkt(X, Y, coeficientes, lam, l1_ratio):
+    """Máxima violación de las condiciones de optimalidad de elastic net sobre los datos densos."""
+    Z, y, sigma, sigma_y = _estandarizar(X, Y)
+    b = coeficientes[1:] * sigma / sigma_y
+    gradiente = Z.T @ (Z @ b - y) / len(y) + lam * (1 - l1_ratio) * b
+    activo = b != 0
+    return max(np.max(np.abs(gradiente[activo] + lam * l1_ratio * np.sign(b[activo])), initial=0.0),
+               np.max(np.abs(gradiente[~activo]) - lam * l1_ratio, initial=0.0))
+
+
+def test_camino_ridge_coincide_con_la_solucion_densa(datos):
+    X, Y = datos
+    lambdas = grilla_lambdas(_estadisticas(X, Y), "ridge", n_lambdas=8)
+    camino = camino_ridge(_estadisticas(X, Y), lambdas)
+    for lam, coeficientes in zip(lambdas, camino):
+        np.testing.assert_allclose(coeficientes, _ridge_denso(X, Y, lam), rtol=1e-8)
+
+
+@pytest.mark.parametrize("l1_ratio", [1.0, 0.5, 0.1])
+def test_camino_elastic_net_cumple_kkt(datos, l1_ratio):
+    X, Y = datos
+    stats = _estadisticas(X, Y)
+    lambdas = grilla_lambdas(stats, "elastic_net", l1_ratio, n_lambdas=15)
+    camino = camino_elastic_net(stats, lambdas, l1_ratio, tol=1e-10, max_iter=10000)
+    for lam, coeficientes in zip(lambdas, camino):
+        assert _violacion_kkt(X, Y, coeficientes, lam, l1_ratio) < 1e-6
+    # De λ máximo hacia abajo las variables entran al modelo
+    activas = [(np.abs(c[1:]) > 0).sum() for c in camino]
+    assert activas[0] == 0 and activas[-1] == X.shape[1]
+
+
+def test_arranque_en_caliente_no_cambia_la_solucion(datos):
+    X, Y = datos
+    stats = _estadisticas(X, Y)
+    lambdas = grilla_lambdas(stats, "lasso", n_lambdas=10)
+    camino = camino_elastic_net(stats, lambdas, 1.0)
+    # Grilla desordenada: el camino se recorre de mayor a menor pero se devuelve en el orden pedido
+    desordenadas = lambdas[::-1].copy()
+    np.testing.assert_allclose(camino_elastic_net(stats, desordenadas, 1.0)[::-1], camino, rtol=1e-5, atol=1e-6)
+    for lam, coeficientes in zip(lambdas, camino):
+        np.testing.assert_allclose(resolver_regularizado(stats, "lasso", lam), coeficientes, rtol=1e-5, atol=1e-6)
+
+
+def test_extremos_del_camino(datos):
+    X, Y = datos
+    stats = _estadisticas(X, Y)
+    nulo = resolver_regularizado(stats, "lasso", lambda_maximo(stats) * 1.001)
+    np.testing.assert_allclose(nulo, np.concatenate([[Y.mean()], np.zeros(X.shape[1])]), atol=1e-8)
+    np.testing.assert_allclose(resolver_regularizado(stats, "ridge", 1e-12), ajuste_denso(X, Y), rtol=1e-6)
+    np.testing.assert_allclose(resolver_regularizado(stats, "elastic_net", 1e-10, 0.5), ajuste_denso(X, Y),
+                               rtol=1e-4)
+
+
+def test_busqueda_cv_coincide_con_k_fold_denso(datos):
+    X, Y = datos
+    lambdas = np.geomspace(10, 1e-4, 6)
+    modelo = RegresorLinealMultiple()
+    resultado = ValidadorModelo(modelo).buscar_regularizacion(X, Y, "ridge", lambdas, k=4, random_state=3)
+    assert 'error' not in resultado
+
+    mse = np.zeros((4, len(lambdas)))
+    for i, prueba in enumerate(np.array_split(np.random.RandomState(3).permutation(len(Y)), 4)):
+        entrenamiento = np.setdiff1d(np.arange(len(Y)), prueba)
+        for j, lam in enumerate(lambdas):
+            beta = _ridge_denso(X[entrenamiento], Y[entrenamiento], lam)
+            mse[i, j] = np.mean((Y[prueba] - beta[0] - X[prueba] @ beta[1:]) ** 2)
+    np.testing.assert_allclose(resultado['mse_medio'], mse.mean(axis=0), rtol=1e-7)
+    assert resultado['mejor_lambda'] == lambdas[np.argmin(mse.mean(axis=0))]
+    np.testing.assert_allclose(resultado['coeficientes'], _ridge_denso(X, Y, resultado['mejor_lambda']), rtol=1e-8)
@@ -0,0 +1,70 @@
+# tests/test_resolutores.py
+import numpy as np
+import pytest
+
+from conftest import ajuste_denso
+from modelo.regresor_lineal import RegresorLinealMultiple
+from modelo.resolutores import UMBRAL_CHOLESKY, numero_condicion, resolver_ecuaciones_normales
+from utils.instrumentacion import registro
+
+
+def _sistema(X, Y):
+    X_con_intercepto = np.column_stack([np.ones(len(X)), X])
+    return X_con_intercepto, X_con_intercepto.T @ X_con_intercepto, X_con_intercepto.T @ Y
+
+
+@pytest.mark.parametrize("solver", ["auto", "cholesky", "qr", "lstsq", "pinv"])
+def test_todos_los_solvers_coinciden_con_lstsq(datos, solver):
+    X, Y = datos
+    X_con_intercepto, XTX, XTY = _sistema(X, Y)
+    beta, usado, _ = resolver_ecuaciones_normales(XTX, XTY, solver, X_con_intercepto, Y)
+    np.testing.assert_allclose(beta, ajuste_denso(X, Y), rtol=1e-6)
+    assert usado == ("cholesky" if solver == "auto" else solver)
+
+
+def test_auto_cae_en_qr_con_colinealidad_fuerte(datos):
+    X, Y = datos
+    rng = np.random.default_rng(0)
+    casi_copia = X[:, :1] + rng.normal(scale=1e-4 * X[:, 0].std(), size=(len(X), 1))
+    X_mal = np.column_stack([X, casi_copia])
+    X_con_intercepto, XTX, XTY = _sistema(X_mal, Y)
+    assert numero_condicion(XTX) > UMBRAL_CHOLESKY
+    beta, usado, cond = resolver_ecuaciones_normales(XTX, XTY, "auto", X_con_intercepto, Y)
+    assert usado == "qr" and cond > UMBRAL_CHOLESKY
+    np.testing.assert_allclose(X_con_intercepto @ beta, X_con_intercepto @ ajuste_denso(X_mal, Y), rtol=1e-6)
+
+
+def test_auto_cae_en_lstsq_con_columnas_duplicadas(datos):
+    X, Y = datos
+    X_singular = np.column_stack([X, 2 * X[:, 0]])
+    X_con_intercepto, XTX, XTY = _sistema(X_singular, Y)
+    beta, usado, _ = resolver_ecuaciones_normales(XTX, XTY, "auto", X_con_intercepto, Y)
+    assert usado == "lstsq"
+    np.testing.assert_allclose(X_con_intercepto @ beta, X_con_intercepto @ ajuste_denso(X_singular, Y), rtol=1e-6)
+    # Sin X (modo incremental) la SVD sobre XᵀX también da la solución de norma mínima
+    beta, usado, _ = resolver_ecuaciones_normales(XTX, XTY, "auto")
+    assert usado == "lstsq"
+    np.testing.assert_allclose(X_con_intercepto @ beta, X_con_intercepto @ ajuste_denso(X_singular, Y), rtol=1e-6)
+
+
+def _avisos_qr():
+    return sum(c['valor'] for c in registro.instantanea()['contadores']
+               if c['nombre'] == 'avisos_total' and c['etiquetas'].get('operacion') == 'solver_qr')
+
+
+def test_qr_sin_X_usa_lstsq_y_lo_avisa(datos):
+    X, Y = datos
+    _, XTX, XTY = _sistema(X, Y)
+    antes = _avisos_qr()
+    beta, usado, _ = resolver_ecuaciones_normales(XTX, XTY, "qr")
+    assert usado == "lstsq"
+    if registro.activo:
+        assert _avisos_qr() == antes + 1
+    np.testing.assert_allclose(beta, ajuste_denso(X, Y), rtol=1e-6)
+
+
+def test_solver_desconocido():
+    with pytest.raises(ValueError):
+        resolver_ecuaciones_normales(np.eye(2), np.ones(2), "gauss")
+    with pytest.raises(ValueError):
+        RegresorLinealMultiple(solver="gauss")
@@ -0,0 +1,384 @@
+# utils/instrumentacion.py
+"""
+Instrumentación liviana del sistema: tiempos, contadores, Prometheus y logs JSON
+
+- span(nombre, **etiquetas) / @medir(...): duración de un bloque en un histograma
+  `valuacion_<nombre>_segundos` y, si el bloque lanza una excepción, un contador
+  `valuacion_<nombre>_errores_total`.
+- registrar_error(componente, operacion, error): errores que el código atrapa y
+  sólo imprime (p. ej. DatabaseManager) quedan contados y en el log JSON.
+- registrar_aviso(componente, operacion, mensaje): lo mismo para degradaciones que no
+  son errores (p. ej. un solver pedido que no se pudo usar).
+- registro.exportar_prometheus() / volcar_metricas(ruta): formato de texto de Prometheus.
+- configurar_logs_json(destino): un evento JSON por línea (spans, errores, perfiles).
+- perfilar(nombre, cprofile=..., memoria=...): cProfile y/o tracemalloc opt-in por solicitud.
+
+Variables de entorno: VALUACION_INSTRUMENTACION=0 apaga spans y contadores;
+VALUACION_LOG_JSON=<archivo|-> activa los logs JSON; VALUACION_METRICAS_ARCHIVO=<archivo>
+es el destino por defecto de volcar_metricas; VALUACION_PERFIL=cprofile,tracemalloc
+activa perfilar en todos los bloques que lo usan; VALUACION_PERFIL_DIR guarda los .prof.
+Sólo usa la biblioteca estándar: importarlo no agrega dependencias ni tiempo de arranque.
+"""
+import functools
+import inspect
+import io
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIJO = "valuacion"
+# Límites superiores de los buckets de duración en segundos (el último es +inf)
+LIMITES_DURACION_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+logger = logging.getLogger("valuacion.instrumentacion")
+logger.addHandler(logging.NullHandler())
+
+
+class Histograma:
+    """Histograma acumulativo de buckets fijos (mismo esquema que los histogramas de Prometheus)."""
+
+    def __init__(self, limites):
+        self.limites = tuple(limites)
+        self.conteos = [0] * (len(self.limites) + 1)
+        self.total = 0
+        self.suma = 0.0
+
+    def observar(self, valor):
+        # Pocos buckets: una búsqueda lineal es más rápida que bisect con la sobrecarga de la llamada
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.conteos[i] += 1
+                break
+        else:
+            self.conteos[-1] += 1
+        self.total += 1
+        self.suma += valor
+
+    def percentil(self, q):
+        """Estimación del percentil q (0-100): límite superior del bucket que lo contiene."""
+        if self.total == 0:
+            return 0.0
+        objetivo = q / 100 * self.total
+        acumulado = 0
+        for i, conteo in enumerate(self.conteos):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return float(self.limites[i]) if i < len(self.limites) else float('inf')
+        return float('inf')
+
+    def resumen(self):
+        return {
+            'total': self.total,
+            'promedio': round(self.suma / self.total, 4) if self.total else 0.0,
+            'p50': self.percentil(50),
+            'p95': self.percentil(95),
+            'p99': self.percentil(99),
+            'buckets': {('+inf' if i == len(self.limites) else str(self.limites[i])): conteo
+                        for i, conteo in enumerate(self.conteos)}
+        }
+
+
+def _etiquetas_prometheus(etiquetas, extra=None):
+    pares = list(etiquetas) + ([extra] if extra else [])
+    if not pares:
+        return ""
+    escapar = lambda valor: str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{clave}="{escapar(valor)}"' for clave, valor in pares) + "}"
+
+
+class RegistroMetricas:
+    """Contadores e histogramas del proceso, indexados por (nombre, etiquetas)."""
+
+    def __init__(self, limites=LIMITES_DURACION_S):
+        self.limites = tuple(limites)
+        self.activo = os.environ.get("VALUACION_INSTRUMENTACION", "1") != "0"
+        self._lock = threading.Lock()
+        self._contadores = {}
+        self._histogramas = {}
+
+    def incrementar(self, nombre, valor=1, **etiquetas):
+        self._incrementar((nombre, tuple(sorted(etiquetas.items()))), valor)
+
+    def observar(self, nombre, valor, **etiquetas):
+        self._observar((nombre, tuple(sorted(etiquetas.items()))), valor)
+
+    # Versiones con la clave (nombre, etiquetas ordenadas) ya armada: los spans la calculan una vez
+    def _incrementar(self, clave, valor=1):
+        if not self.activo:
+            return
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def _observar(self, clave, valor):
+        if not self.activo:
+            return
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = Histograma(self.limites)
+            histograma.observar(valor)
+
+    def limpiar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def instantanea(self):
+        """Copia de contadores e histogramas: {'contadores': [...], 'histogramas': [...]}."""
+        with self._lock:
+            return {
+                'contadores': [{'nombre': nombre, 'etiquetas': dict(etiquetas), 'valor': valor}
+                               for (nombre, etiquetas), valor in sorted(self._contadores.items())],
+                'histogramas': [dict(h.resumen(), nombre=nombre, etiquetas=dict(etiquetas), suma=h.suma)
+                                for (nombre, etiquetas), h in sorted(self._histogramas.items())]
+            }
+
+    def exportar_prometheus(self):
+        """Métricas en el formato de texto de exposición de Prometheus."""
+        lineas = []
+        with self._lock:
+            contadores = sorted(self._contadores.items())
+            histogramas = sorted((clave, (list(h.conteos), h.total, h.suma))
+                                 for clave, h in self._histogramas.items())
+        anterior = None
+        for (nombre, etiquetas), valor in contadores:
+            metrica = f"{PREFIJO}_{nombre}"
+            if metrica != anterior:
+                lineas.append(f"# TYPE {metrica} counter")
+                anterior = metrica
+            lineas.append(f"{metrica}{_etiquetas_prometheus(etiquetas)} {valor}")
+        for (nombre, etiquetas), (conteos, total, suma) in histogramas:
+            metrica = f"{PREFIJO}_{nombre}"
+            if metrica != anterior:
+                lineas.append(f"# TYPE {metrica} histogram")
+                anterior = metrica
+            acumulado = 0
+            for limite, conteo in zip(list(self.limites) + ["+Inf"], conteos):
+                acumulado += conteo
+                lineas.append(f"{metrica}_bucket{_etiquetas_prometheus(etiquetas, ('le', limite))} {acumulado}")
+            lineas.append(f"{metrica}_sum{_etiquetas_prometheus(etiquetas)} {suma:.6f}")
+            lineas.append(f"{metrica}_count{_etiquetas_prometheus(etiquetas)} {total}")
+        return "\n".join(lineas) + "\n"
+
+
+registro = RegistroMetricas()
+
+
+def _registrar_evento(nivel, evento, **datos):
+    if logger.isEnabledFor(nivel):
+        logger.log(nivel, evento, extra={'datos': datos})
+
+
+class _Claves:
+    """Claves de histograma y contador de errores de un span (se arman una sola vez)."""
+    __slots__ = ('nombre', 'etiquetas', 'duracion', 'errores')
+
+    def __init__(self, nombre, etiquetas):
+        ordenadas = tuple(sorted(etiquetas.items()))
+        self.nombre = nombre
+        self.etiquetas = etiquetas
+        self.duracion = (f"{nombre}_segundos", ordenadas)
+        self.errores = (f"{nombre}_errores_total", ordenadas)
+
+
+def _cerrar_span(claves, duracion, error):
+    registro._observar(claves.duracion, duracion)
+    if error is not None:
+        registro._incrementar(claves.errores)
+    if logger.isEnabledFor(logging.INFO):
+        _registrar_evento(logging.INFO, "span", nombre=claves.nombre, duracion_ms=round(duracion * 1000, 3),
+                          error=error, **claves.etiquetas)
+
+
+class span:
+    """Mide la duración de un bloque (`with span('db_consulta', operacion='contar'):`)."""
+    __slots__ = ('claves', 'inicio')
+
+    def __init__(self, nombre, **etiquetas):
+        self.claves = _Claves(nombre, etiquetas)
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if registro.activo:
+            # GeneratorExit / KeyboardInterrupt no son errores del bloque medido
+            error = tipo.__name__ if tipo is not None and issubclass(tipo, Exception) else None
+            _cerrar_span(self.claves, time.perf_counter() - self.inicio, error)
+        return False
+
+
+def medir(nombre, **etiquetas):
+    """Decorador de span; en funciones generadoras mide la iteración completa."""
+    claves = _Claves(nombre, etiquetas)
+
+    def decorador(funcion):
+        if inspect.isgeneratorfunction(funcion):
+            @functools.wraps(funcion)
+            def envoltura_generador(*args, **kwargs):
+                with span(nombre, **etiquetas):
+                    yield from funcion(*args, **kwargs)
+            return envoltura_generador
+
+        # Sin context manager: en predecir de una fila la envoltura tiene que costar lo mínimo
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not registro.activo:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            error = None
+            try:
+                return funcion(*args, **kwargs)
+            except Exception as e:
+                error = type(e).__name__
+                raise
+            finally:
+                _cerrar_span(claves, time.perf_counter() - inicio, error)
+        return envoltura
+    return decorador
+
+
+def registrar_error(componente, operacion, error):
+    """Cuenta un error atrapado (`valuacion_errores_total`) y lo deja en el log JSON."""
+    registro.incrementar("errores_total", componente=componente, operacion=operacion, tipo=type(error).__name__)
+    _registrar_evento(logging.ERROR, "error", componente=componente, operacion=operacion,
+                      tipo=type(error).__name__, mensaje=str(error))
+
+
+def registrar_aviso(componente, operacion, mensaje):
+    """Cuenta una degradación silenciosa (`valuacion_avisos_total`) y la deja en el log como WARNING."""
+    registro.incrementar("avisos_total", componente=componente, operacion=operacion)
+    _registrar_evento(logging.WARNING, "aviso", componente=componente, operacion=operacion, mensaje=mensaje)
+
+
+def volcar_metricas(ruta=None):
+    """
+    Escribe las métricas en formato Prometheus (para el textfile collector de node_exporter)
+
+    Sin ruta usa VALUACION_METRICAS_ARCHIVO; si tampoco está definida no hace nada.
+    La escritura es atómica (archivo temporal + os.replace).
+    """
+    ruta = ruta or os.environ.get("VALUACION_METRICAS_ARCHIVO")
+    if not ruta:
+        return None
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        archivo.write(registro.exportar_prometheus())
+    os.replace(temporal, ruta)
+    return ruta
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por línea: marca de tiempo, nivel, evento y los datos del evento."""
+
+    def format(self, record):
+        evento = {
+            'ts': round(record.created, 6),
+            'nivel': record.levelname,
+            'evento': record.getMessage(),
+            'proceso': record.process,
+            'hilo': record.threadName
+        }
+        evento.update(getattr(record, 'datos', {}))
+        if record.exc_info:
+            evento['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+def configurar_logs_json(destino="-", nivel=logging.INFO):
+    """
+    Envía los eventos de instrumentación como JSON por línea
+
+    Args:
+        destino: Ruta de archivo, o "-" para stderr
+        nivel: logging.INFO incluye cada span; logging.ERROR sólo los errores
+    """
+    for manejador in list(logger.handlers):
+        if isinstance(manejador.formatter, FormatoJSON):
+            logger.removeHandler(manejador)
+            manejador.close()
+    manejador = logging.StreamHandler() if destino == "-" else logging.FileHandler(destino, encoding="utf-8")
+    manejador.setFormatter(FormatoJSON())
+    logger.addHandler(manejador)
+    logger.setLevel(nivel)
+    logger.propagate = False
+    return manejador
+
+
+def _modos_perfil():
+    return {modo.strip().lower() for modo in os.environ.get("VALUACION_PERFIL", "").split(",") if modo.strip()}
+
+
+@contextmanager
+def perfilar(nombre, cprofile=None, memoria=None, top=15, directorio=None):
+    """
+    cProfile y/o tracemalloc alrededor de un bloque (una solicitud, un render de página)
+
+    Apagado por defecto: se activa por llamada (cprofile=True / memoria=True) o para
+    todo el proceso con VALUACION_PERFIL. Entrega un diccionario que al salir del
+    bloque tiene 'cprofile' (las `top` funciones por tiempo acumulado) y/o
+    'memoria_pico_kb' y 'memoria_top'; con `directorio` (o VALUACION_PERFIL_DIR)
+    además guarda el .prof para abrirlo con snakeviz o pstats.
+    """
+    modos = _modos_perfil()
+    cprofile = 'cprofile' in modos if cprofile is None else cprofile
+    memoria = 'tracemalloc' in modos if memoria is None else memoria
+    resultado = {}
+    if not (cprofile or memoria):
+        yield resultado
+        return
+
+    perfilador = None
+    if cprofile:
+        import cProfile
+        perfilador = cProfile.Profile()
+        try:
+            perfilador.enable()
+        except ValueError:
+            # Ya hay otro perfilador activo (bloques anidados): se perfila sólo el externo
+            perfilador = None
+
+    tracemalloc = None
+    iniciado_aqui = False
+    if memoria:
+        import tracemalloc
+        iniciado_aqui = not tracemalloc.is_tracing()
+        if iniciado_aqui:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        antes = tracemalloc.take_snapshot()
+
+    try:
+        yield resultado
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            import pstats
+            salida = io.StringIO()
+            pstats.Stats(perfilador, stream=salida).sort_stats('cumulative').print_stats(top)
+            resultado['cprofile'] = salida.getvalue()
+            directorio = directorio or os.environ.get("VALUACION_PERFIL_DIR")
+            if directorio:
+                os.makedirs(directorio, exist_ok=True)
+                ruta = os.path.join(directorio, f"{nombre}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.prof")
+                perfilador.dump_stats(ruta)
+                resultado['archivo_cprofile'] = ruta
+        # Con solicitudes concurrentes otro bloque pudo haber detenido tracemalloc
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            _, pico = tracemalloc.get_traced_memory()
+            diferencias = tracemalloc.take_snapshot().compare_to(antes, 'lineno')[:top]
+            if iniciado_aqui:
+                tracemalloc.stop()
+            resultado['memoria_pico_kb'] = round(pico / 1024, 1)
+            resultado['memoria_top'] = [str(diferencia) for diferencia in diferencias]
+        _registrar_evento(logging.INFO, "perfil", nombre=nombre,
+                          memoria_pico_kb=resultado.get('memoria_pico_kb'),
+                          archivo_cprofile=resultado.get('archivo_cprofile'))
+
+
+if os.environ.get("VALUACION_LOG_JSON"):
+    configurar_logs_json(os.environ["VALUACION_LOG_JSON"])
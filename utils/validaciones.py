@@ -1,5 +1,44 @@
 ### Validaciones
 
+import numpy as np
+
+COLUMNAS_CARACTERISTICAS = ['m2', 'habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
+COLUMNAS_ENTERAS = ['habitaciones', 'antiguedad', 'zona_categoria', 'tipo_propiedad']
+
+# Única fuente de las reglas de una propiedad: cada regla vale tanto para un número
+# (validar_inmueble, validar_datos_entrada) como para una columna completa (validar_lote_inmuebles)
+REGLAS_INMUEBLE = [
+    ('m2', lambda v: (v > 0) & (v <= 1000), "Metros cuadrados deben ser entre 1 y 1000"),
+    ('habitaciones', lambda v: (v > 0) & (v <= 10), "Habitaciones deben ser entre 1 y 10"),
+    ('antiguedad', lambda v: (v >= 0) & (v <= 100), "Antigüedad debe ser entre 0 y 100 años"),
+    ('zona_categoria', lambda v: (v >= 1) & (v <= 5), "Zona debe ser entre 1 y 5"),
+    ('tipo_propiedad', lambda v: (v == 1) | (v == 2), "Tipo de propiedad debe ser 1 (Casa) o 2 (Departamento)"),
+]
+REGLA_PRECIO = ('precio_usd', lambda v: v > 0, "Precio debe ser mayor a 0")
+
+def validar_inmueble(valores, incluir_precio=False):
+    """
+    Valida una propiedad con REGLAS_INMUEBLE
+    
+    Args:
+        valores: Diccionario columna -> número (COLUMNAS_CARACTERISTICAS y precio_usd si incluir_precio)
+        
+    Returns:
+        Lista con los mensajes de las reglas que no se cumplen (vacía si es válida)
+    """
+    reglas = REGLAS_INMUEBLE + ([REGLA_PRECIO] if incluir_precio else [])
+    errores = []
+    # Mismo orden de chequeos por columna que validar_lote_inmuebles: faltante, entero, rango
+    for col, regla, mensaje in reglas:
+        valor = valores[col]
+        if valor is None or valor != valor:
+            errores.append(f"Valor faltante o no numérico en {col}")
+        elif col in COLUMNAS_ENTERAS and valor % 1 != 0:
+            errores.append(f"{col} debe ser un número entero")
+        elif not regla(valor):
+            errores.append(mensaje)
+    return errores
+
 def validar_entrada_usuario(mensaje: str, tipo=float, min_val=None, max_val=None):
     """
     Valida la entrada del usuario con manejo de errores
@@ -36,4 +75,37 @@ def validar_entrada_usuario(mensaje: str, tipo=float, min_val=None, max_val=None
             return None
         except Exception as e:
             print(f"❌ Error inesperado: {e}")
-            return None
\ No newline at end of file
+            return None
+
+def validar_lote_inmuebles(df, incluir_precio=True):
+    """
+    Valida y convierte tipos de un lote de propiedades de forma vectorizada
+    
+    Args:
+        df: DataFrame con las columnas de COLUMNAS_CARACTERISTICAS (y precio_usd si incluir_precio)
+        incluir_precio: Si se exige y valida la columna precio_usd
+        
+    Returns:
+        Tupla (df_convertido, motivos): motivos es una Serie alineada con df.index
+        con el primer error de cada fila, o None si la fila es válida
+    """
+    import pandas as pd
+    
+    columnas = COLUMNAS_CARACTERISTICAS + (['precio_usd'] if incluir_precio else [])
+    faltantes = [col for col in columnas if col not in df.columns]
+    if faltantes:
+        raise ValueError(f"Faltan columnas requeridas: {', '.join(faltantes)}")
+    
+    convertido = pd.DataFrame({col: pd.to_numeric(df[col], errors='coerce') for col in columnas}, index=df.index)
+    reglas = REGLAS_INMUEBLE + ([REGLA_PRECIO] if incluir_precio else [])
+    
+    # Se evalúan en orden inverso para que prevalezca el primer error de cada fila
+    motivos = np.full(len(convertido), None, dtype=object)
+    for col, regla, mensaje in reversed(reglas):
+        serie = convertido[col]
+        motivos = np.where(regla(serie).to_numpy(), motivos, mensaje)
+        if col in COLUMNAS_ENTERAS:
+            motivos = np.where((serie % 1 != 0).to_numpy(), f"{col} debe ser un número entero", motivos)
+        motivos = np.where(serie.isna().to_numpy(), f"Valor faltante o no numérico en {col}", motivos)
+    
+    return convertido, pd.Series(motivos, index=df.index, dtype=object)
@@ -1,78 +1,171 @@
 ## Utils Visualizador
 # utils-visualizador.py
-import matplotlib.pyplot as plt
-import seaborn as sns
+import io
+import threading
+from collections import OrderedDict
+
 import numpy as np
 
+# Por encima de esta cantidad de puntos una nube se dibuja como densidad (hexbin) o muestra
+MAX_PUNTOS_DISPERSION = 5000
+
+
+def muestra_estratificada(x, max_puntos, estratos=20, semilla=0):
+    """
+    Índices de una muestra de a lo sumo max_puntos, estratificada por cuantiles de x
+
+    Cada estrato aporta en proporción a su tamaño (al menos un punto), así que las
+    colas de la distribución (propiedades muy caras o muy baratas) siguen visibles.
+    """
+    x = np.asarray(x)
+    n = len(x)
+    if n <= max_puntos:
+        return np.arange(n)
+    rng = np.random.default_rng(semilla)
+    orden = np.argsort(x, kind='stable')
+    indices = []
+    for estrato in np.array_split(orden, estratos):
+        cantidad = max(1, int(round(len(estrato) * max_puntos / n)))
+        indices.append(rng.choice(estrato, size=min(cantidad, len(estrato)), replace=False))
+    return np.sort(np.concatenate(indices))
+
+
 class VisualizadorResultados:
-    def __init__(self, estilo='seaborn'):
-        plt.style.use(estilo)
-        self.figsize = (12, 8)
-    
-    def grafico_real_vs_predicho(self, Y_real, Y_predicho, r2):
+    """
+    Capa de renderizado de los gráficos del modelo
+
+    - Las nubes grandes se agregan: densidad hexbin (modo 'densidad') o una muestra
+      estratificada (modo 'muestra'); hasta max_puntos se dibujan todos los puntos.
+    - Cada gráfico se devuelve como PNG (bytes) y se memoriza por `clave` (p. ej.
+      firma y versión del modelo + tipo de gráfico) en una caché LRU: mientras el
+      modelo no cambie, un rerun no vuelve a dibujar.
+    - Las figuras se crean con matplotlib.figure.Figure, fuera del registro global de
+      pyplot, y se liberan apenas se exporta la imagen: no se acumulan entre reruns.
+    """
+
+    def __init__(self, estilo=None, modo='densidad', max_puntos=MAX_PUNTOS_DISPERSION,
+                 figsize=(10, 6), dpi=100, max_cache=32):
+        if modo not in ('densidad', 'muestra'):
+            raise ValueError(f"Modo desconocido: {modo} (usar 'densidad' o 'muestra')")
+        self.estilo = estilo
+        self.modo = modo
+        self.max_puntos = max_puntos
+        self.figsize = figsize
+        self.dpi = dpi
+        self.max_cache = max_cache
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.renderizados = 0
+
+    def renderizar(self, clave, dibujar, figsize=None):
+        """
+        PNG del gráfico que `dibujar(ax)` arma sobre unos ejes nuevos
+
+        Args:
+            clave: Identificador hashable del gráfico (None = sin caché)
+            dibujar: Función que recibe el Axes y lo completa
+        """
+        if clave is not None:
+            with self._lock:
+                if clave in self._cache:
+                    self._cache.move_to_end(clave)
+                    return self._cache[clave]
+
+        # Sin pyplot: la figura no queda registrada en ningún estado global
+        from matplotlib.figure import Figure
+        import matplotlib.style
+
+        with matplotlib.style.context(self.estilo or 'default'):
+            fig = Figure(figsize=figsize or self.figsize, dpi=self.dpi)
+            try:
+                dibujar(fig.subplots())
+                fig.tight_layout()
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format='png')
+            finally:
+                fig.clear()
+        imagen = buffer.getvalue()
+        self.renderizados += 1
+
+        if clave is not None:
+            with self._lock:
+                self._cache[clave] = imagen
+                while len(self._cache) > self.max_cache:
+                    self._cache.popitem(last=False)
+        return imagen
+
+    def invalidar(self):
+        with self._lock:
+            self._cache.clear()
+
+    def _nube(self, ax, x, y, color):
+        """Dispersión completa, densidad hexbin o muestra estratificada según el tamaño."""
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if len(x) <= self.max_puntos:
+            ax.scatter(x, y, alpha=0.6, s=50, color=color)
+        elif self.modo == 'densidad':
+            celdas = ax.hexbin(x, y, gridsize=80, bins='log', mincnt=1, cmap='viridis')
+            ax.figure.colorbar(celdas, ax=ax, label='Propiedades (escala log)')
+        else:
+            indices = muestra_estratificada(x, self.max_puntos)
+            ax.scatter(x[indices], y[indices], alpha=0.4, s=12, color=color,
+                       label=f'Muestra de {len(indices):,} de {len(x):,}')
+            ax.legend()
+
+    def grafico_real_vs_predicho(self, Y_real, Y_predicho, r2, clave=None):
         """Grafica valores reales vs predichos"""
-        fig, ax = plt.subplots(figsize=self.figsize)
-        
-        ax.scatter(Y_real, Y_predicho, alpha=0.7, s=60, color='blue')
-        ax.plot([Y_real.min(), Y_real.max()], [Y_real.min(), Y_real.max()], 
-                'r--', lw=2, label='Predicción Perfecta')
-        
-        ax.set_xlabel('Precio Real (USD)', fontsize=12)
-        ax.set_ylabel('Precio Predicho (USD)', fontsize=12)
-        ax.set_title(f'Validación: Real vs Predicho\n(R² = {r2:.4f})', fontsize=14)
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        return fig
-    
-    def grafico_residuos(self, Y_predicho, residuos):
+        def dibujar(ax):
+            self._nube(ax, Y_real, Y_predicho, 'blue')
+            ax.plot([np.min(Y_real), np.max(Y_real)], [np.min(Y_real), np.max(Y_real)],
+                    'r--', lw=2, label='Predicción Perfecta')
+            ax.set_xlabel('Precio Real (USD)', fontsize=12)
+            ax.set_ylabel('Precio Predicho (USD)', fontsize=12)
+            ax.set_title(f'Validación: Real vs Predicho (R² = {r2:.4f})', fontsize=14)
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+        return self.renderizar(clave, dibujar)
+
+    def grafico_residuos(self, Y_predicho, residuos, clave=None):
         """Grafica análisis de residuos"""
-        fig, ax = plt.subplots(figsize=self.figsize)
-        
-        ax.scatter(Y_predicho, residuos, alpha=0.7, s=60, color='green')
-        ax.axhline(y=0, color='red', linestyle='--', linewidth=2)
-        
-        ax.set_xlabel('Precio Predicho (USD)', fontsize=12)
-        ax.set_ylabel('Residuos (USD)', fontsize=12)
-        ax.set_title('Análisis de Residuos del Modelo', fontsize=14)
-        ax.grid(True, alpha=0.3)
-        
-        return fig
-    
-    def grafico_importancia_variables(self, coeficientes, nombres_variables):
+        def dibujar(ax):
+            self._nube(ax, Y_predicho, residuos, 'green')
+            ax.axhline(y=0, color='red', linestyle='--', linewidth=2)
+            ax.set_xlabel('Precio Predicho (USD)', fontsize=12)
+            ax.set_ylabel('Residuos (USD)', fontsize=12)
+            ax.set_title('Análisis de Residuos del Modelo', fontsize=14)
+            ax.grid(True, alpha=0.3)
+        return self.renderizar(clave, dibujar)
+
+    def grafico_importancia_variables(self, coeficientes, nombres_variables, clave=None):
         """Grafica la importancia de las variables"""
         # Excluir el intercepto
-        coef_importancia = np.abs(coeficientes[1:])
-        variables = nombres_variables[1:]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        y_pos = np.arange(len(variables))
-        ax.barh(y_pos, coef_importancia)
-        ax.set_yticks(y_pos)
-        ax.set_yticklabels(variables)
-        ax.set_xlabel('Importancia (Valor Absoluto del Coeficiente)')
-        ax.set_title('Importancia Relativa de Variables en el Modelo')
-        ax.grid(True, alpha=0.3, axis='x')
-        
-        return fig
-    
-    def grafico_error_porcentual(self, Y_real, Y_predicho):
+        coef_importancia = np.abs(np.asarray(coeficientes, dtype=float)[1:])
+        variables = list(nombres_variables)[1:]
+
+        def dibujar(ax):
+            y_pos = np.arange(len(variables))
+            ax.barh(y_pos, coef_importancia)
+            ax.set_yticks(y_pos)
+            ax.set_yticklabels(variables)
+            ax.set_xlabel('Importancia (Valor Absoluto del Coeficiente)')
+            ax.set_title('Importancia Relativa de Variables en el Modelo')
+            ax.grid(True, alpha=0.3, axis='x')
+        return self.renderizar(clave, dibujar)
+
+    def grafico_error_porcentual(self, Y_real, Y_predicho, clave=None):
         """Grafica la distribución del error porcentual"""
-        error_porcentual = np.abs((Y_real - Y_predicho) / Y_real) * 100
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        ax.hist(error_porcentual, bins=15, alpha=0.7, edgecolor='black', color='orange')
-        ax.axvline(np.mean(error_porcentual), color='red', linestyle='--', 
-                  label=f'Promedio: {np.mean(error_porcentual):.1f}%')
-        
-        ax.set_xlabel('Error Porcentual (%)')
-        ax.set_ylabel('Frecuencia')
-        ax.set_title('Distribución del Error Porcentual de Predicción')
-        ax.legend()
-        ax.grid(True, alpha=0.3)
-        
-        return fig
-    
+        Y_real = np.asarray(Y_real, dtype=float)
+        error_porcentual = np.abs((Y_real - np.asarray(Y_predicho, dtype=float)) / Y_real) * 100
 
+        def dibujar(ax):
+            # El histograma ya es una agregación: su costo no depende de cuántos puntos se dibujan
+            ax.hist(error_porcentual, bins=30, alpha=0.7, edgecolor='black', color='orange')
+            ax.axvline(np.mean(error_porcentual), color='red', linestyle='--',
+                       label=f'Promedio: {np.mean(error_porcentual):.1f}%')
+            ax.set_xlabel('Error Porcentual (%)')
+            ax.set_ylabel('Frecuencia')
+            ax.set_title('Distribución del Error Porcentual de Predicción')
+            ax.legend()
+            ax.grid(True, alpha=0.3)
+        return self.renderizar(clave, dibujar)